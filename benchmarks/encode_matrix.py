@@ -0,0 +1,244 @@
+"""
+Encodes a deterministic synthetic source across a matrix of encoders,
+presets, CRF values and scale/fps filters, using the same command
+builder as the application, and records the cost of every cell.
+
+    python -m benchmarks.encode_matrix --codecs libx264 libx265 \\
+        --presets veryfast medium --crfs 20 26 --scales source 1280x720 \\
+        --json results.json --csv results.csv
+
+    python -m benchmarks.encode_matrix --baseline results.json
+
+With ``--baseline`` every cell is compared with the same cell of a
+previous JSON report, and the exit code is 1 if any cell lost more
+encode fps than ``--tolerance``.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.segment_parallel import make_source
+from core.capabilities import get_capabilities
+from core.command_builder import CommandBuilder, ConversionParams
+from core.ffmpeg_wrapper import VideoConverter
+from core.video_utils import get_ffmpeg_path
+
+
+@dataclass
+class CellResult:
+    codec: str
+    preset: str
+    crf: str
+    scale: str
+    fps: str
+    wall_time: float = 0.0
+    encode_fps: float = 0.0
+    speed: float = 0.0
+    cpu_time: Optional[float] = None
+    peak_rss_kib: Optional[int] = None
+    output_size: int = 0
+    stream_copy: bool = False
+    error: str = ""
+
+    @property
+    def key(self) -> str:
+        return "/".join(
+            (self.codec, self.preset, self.crf, self.scale, self.fps)
+        )
+
+
+def run_cell(builder, params, info, cell, source_duration) -> CellResult:
+    command = builder.build(params, info)
+    argv = command.argv()
+
+    last = []
+    converter = VideoConverter()
+    start = time.perf_counter()
+    returncode = converter.convert_video(argv, last.append)
+    cell.wall_time = time.perf_counter() - start
+    cell.stream_copy = command.stream_copy
+
+    output = Path(command.output_path)
+    if returncode != 0:
+        cell.error = converter.stderr_tail[-1] if converter.stderr_tail else ""
+        output.unlink(missing_ok=True)
+        return cell
+
+    frames = last[-1].frame if last else 0
+    cell.encode_fps = frames / cell.wall_time
+    cell.speed = source_duration / cell.wall_time
+    # Tiempo de CPU y memoria del informe -benchmark de FFmpeg
+    stats = converter.stats
+    if stats.user_time is not None:
+        cell.cpu_time = stats.user_time + stats.sys_time
+    if stats.max_rss is not None:
+        cell.peak_rss_kib = stats.max_rss // 1024
+    cell.output_size = output.stat().st_size
+    output.unlink()  # solo interesa el tamaño
+    return cell
+
+
+def compare(results, baseline, tolerance) -> list:
+    """Prints the fps change of every cell and returns the regressions."""
+    previous = {
+        "/".join((r["codec"], r["preset"], r["crf"], r["scale"], r["fps"])): r
+        for r in baseline
+    }
+    regressions = []
+    print(f"\n{'cell':<44}{'fps':>10}{'baseline':>10}{'change':>9}")
+    for cell in results:
+        old = previous.get(cell.key)
+        if cell.error or not old or not old.get("encode_fps"):
+            continue
+        change = cell.encode_fps / old["encode_fps"] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions.append(cell)
+            flag = "  REGRESSION"
+        print(
+            f"{cell.key:<44}{cell.encode_fps:>10.1f}"
+            f"{old['encode_fps']:>10.1f}{change:>+9.1%}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--rate", type=int, default=30)
+    parser.add_argument("--duration", type=int, default=10)
+    parser.add_argument("--codecs", nargs="+", default=["libx264"])
+    parser.add_argument("--presets", nargs="+", default=["medium"])
+    parser.add_argument("--crfs", nargs="+", default=["23"])
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        default=["source"],
+        help="WIDTHxHEIGHT values, or 'source' to keep the size",
+    )
+    parser.add_argument(
+        "--fps",
+        nargs="+",
+        default=["source"],
+        help="output frame rates, or 'source' to keep the rate",
+    )
+    parser.add_argument("--json", help="write the results as JSON")
+    parser.add_argument("--csv", help="write the results as CSV")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed fps loss against the baseline (default 0.1 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    ffmpeg = str(get_ffmpeg_path())
+    capabilities = get_capabilities(ffmpeg)
+    codecs = []
+    for codec in args.codecs:
+        if capabilities and not capabilities.has_encoder(codec):
+            print(f"Skipping {codec}: not available in {ffmpeg}")
+        else:
+            codecs.append(codec)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "source.mp4"
+        make_source(ffmpeg, source, args.size, args.rate, args.duration)
+        # Se conoce la fuente, así que no hace falta ffprobe
+        info = {
+            "codec": "h264",
+            "resolution": args.size.replace(":", "x"),
+            "frame_rate": str(args.rate),
+            "duration_seconds": args.duration,
+        }
+        builder = CommandBuilder(ffmpeg)
+
+        print(
+            f"{'cell':<44}{'wall (s)':>10}{'fps':>9}{'speed':>8}"
+            f"{'cpu (s)':>9}{'rss (MiB)':>11}{'size (MiB)':>12}"
+        )
+        matrix = itertools.product(
+            codecs, args.presets, args.crfs, args.scales, args.fps
+        )
+        for codec, preset, crf, scale, fps in matrix:
+            width = height = None
+            if scale != "source":
+                width, height = scale.lower().split("x")
+            params = ConversionParams(
+                input_path=str(source),
+                output_folder=str(tmp),
+                encoder=codec,
+                preset=None if preset == "none" else preset,
+                crf=None if crf == "none" else crf,
+                width=width,
+                height=height,
+                frame_rate=None if fps == "source" else fps,
+            )
+            cell = run_cell(
+                builder,
+                params,
+                info,
+                CellResult(codec, preset, crf, scale, fps),
+                args.duration,
+            )
+            results.append(cell)
+            if cell.error:
+                print(f"{cell.key:<44}  failed: {cell.error}")
+                continue
+            cpu = f"{cell.cpu_time:.2f}" if cell.cpu_time is not None else "-"
+            rss = (
+                f"{cell.peak_rss_kib / 1024:.0f}"
+                if cell.peak_rss_kib is not None
+                else "-"
+            )
+            print(
+                f"{cell.key:<44}{cell.wall_time:>10.2f}"
+                f"{cell.encode_fps:>9.1f}{cell.speed:>7.2f}x{cpu:>9}"
+                f"{rss:>11}{cell.output_size / 2**20:>12.2f}"
+            )
+
+    rows = [asdict(cell) for cell in results]
+    report = {
+        "ffmpeg": capabilities.version if capabilities else ffmpeg,
+        "source": {
+            "size": args.size,
+            "rate": args.rate,
+            "duration": args.duration,
+        },
+        "results": rows,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(
+                f, fieldnames=list(rows[0]) if rows else []
+            )
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("source") != report["source"]:
+            print("\nWarning: the baseline used a different source")
+        if compare(results, baseline["results"], args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Summarises the local job history (core.history): throughput per group
+of jobs and, with --trend, how recent jobs compare with older ones.
+
+    python -m benchmarks.history_report
+    python -m benchmarks.history_report --group encoder resolution --since 30
+    python -m benchmarks.history_report --trend --recent 10 --threshold 0.9
+
+With --trend the exit code is 1 when a group's recent median fps fell
+below ``threshold`` times its earlier median.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from core.history import GROUPS, HISTORY_PATH, JobHistory
+
+
+def fmt(value, spec=".1f") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--db", default=HISTORY_PATH)
+    parser.add_argument(
+        "--group",
+        nargs="+",
+        choices=GROUPS,
+        default=["encoder", "preset", "resolution"],
+    )
+    parser.add_argument("--since", type=float, help="only the last N days")
+    parser.add_argument("--trend", action="store_true")
+    parser.add_argument("--recent", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    history = JobHistory(args.db)
+    filters = {}
+    if args.since:
+        filters["since"] = time.time() - args.since * 86400
+
+    if args.trend:
+        rows = history.trend(args.group, args.recent, **filters)
+        slower = [row for row in rows if row["ratio"] < args.threshold]
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            print(f"{'group':<40}{'before':>10}{'recent':>10}{'ratio':>8}")
+            for row in rows:
+                name = " / ".join(str(row[g]) or "-" for g in args.group)
+                mark = "  ⚠" if row in slower else ""
+                print(
+                    f"{name:<40}{fmt(row['baseline_fps']):>10}"
+                    f"{fmt(row['recent_fps']):>10}"
+                    f"{fmt(row['ratio'], '.2f'):>8}{mark}"
+                )
+        return 1 if slower else 0
+
+    rows = history.summary(args.group, **filters)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(
+        f"{'group':<40}{'jobs':>6}{'fps':>9}{'speed':>8}"
+        f"{'cpu ms/f':>10}{'rss MB':>9}"
+    )
+    for row in rows:
+        name = " / ".join(str(row[g]) or "-" for g in args.group)
+        cpu = row["cpu_per_frame"]
+        rss = row["max_rss"]
+        print(
+            f"{name:<40}{row['jobs']:>6}{fmt(row['median_fps']):>9}"
+            f"{fmt(row['median_speed'], '.2f'):>8}"
+            f"{fmt(cpu * 1000 if cpu is not None else None):>10}"
+            f"{fmt(rss / 2**20 if rss else None, '.0f'):>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
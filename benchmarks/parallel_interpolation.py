@@ -0,0 +1,117 @@
+"""
+Throughput of minterpolate run serially and as overlapping chunks in
+parallel (core.interpolation.InterpolatingConverter), per worker count,
+plus a frame-accurate check that the chunked output matches the serial
+one.
+
+    python -m benchmarks.parallel_interpolation --size 640x360 \\
+        --duration 10 --fps 60 --workers 1 2 4 8
+
+The check hashes every frame the -vf chain produces (before the
+encoder) serially and chunk by chunk; the exit code is 1 if any frame
+differs.
+"""
+
+import argparse
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks.segment_parallel import make_source
+from core.command_builder import CommandBuilder, ConversionParams
+from core.ffmpeg_wrapper import VideoConverter
+from core.interpolation import (
+    OVERLAP,
+    InterpolatingConverter,
+    compare_with_serial,
+)
+from core.video_utils import get_ffmpeg_path
+
+
+def timed(converter, argv) -> tuple:
+    """(wall seconds, frames written) of one conversion."""
+    returncode = converter.convert_video(argv)
+    if returncode != 0:
+        tail = converter.stderr_tail[-1] if converter.stderr_tail else ""
+        raise RuntimeError(f"FFmpeg failed ({returncode}): {tail}")
+    return converter.stats.wall_time, converter.stats.frames
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--size", default="640x360")
+    parser.add_argument("--rate", type=int, default=30)
+    parser.add_argument("--duration", type=int, default=10)
+    parser.add_argument("--fps", default="60", help="interpolated rate")
+    parser.add_argument("--mi-mode", default="mci")
+    parser.add_argument("--mc-mode", default="aobmc")
+    parser.add_argument("--me-mode", default="bidir")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--overlap", type=int, default=OVERLAP)
+    parser.add_argument("--preset", default="veryfast")
+    args = parser.parse_args(argv)
+
+    ffmpeg = str(get_ffmpeg_path())
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "source.mp4"
+        make_source(ffmpeg, source, args.size, args.rate, args.duration)
+        # Se conoce la fuente, así que no hace falta ffprobe
+        info = {
+            "codec": "h264",
+            "resolution": args.size.replace(":", "x"),
+            "frame_rate": str(args.rate),
+            "duration_seconds": float(args.duration),
+        }
+        params = ConversionParams(
+            input_path=str(source),
+            output_folder=str(tmp),
+            encoder="libx264",
+            preset=args.preset,
+            frame_rate=args.fps,
+            mi_mode=args.mi_mode,
+            mc_mode=args.mc_mode,
+            me_mode=args.me_mode,
+            remove_audio=True,
+        )
+        command = replace(
+            CommandBuilder(ffmpeg).build(params, info), overwrite=True
+        )
+
+        def output(name) -> list:
+            return replace(command, output_path=str(tmp / name)).argv()
+
+        check = compare_with_serial(
+            command.argv(), max(args.workers), args.overlap, info
+        )
+        serial_wall, frames = timed(VideoConverter(), output("serial.mp4"))
+        print(
+            f"source {args.size} {args.rate} fps {args.duration}s → "
+            f"{args.fps} fps, {args.mi_mode}"
+        )
+        print(f"{'run':<14}{'wall (s)':>10}{'fps':>9}{'speedup':>9}")
+        print(
+            f"{'serial':<14}{serial_wall:>10.2f}"
+            f"{frames / serial_wall:>9.1f}{1:>9.2f}"
+        )
+        for workers in args.workers:
+            wall, frames = timed(
+                InterpolatingConverter(workers=workers, overlap=args.overlap),
+                output(f"chunks_{workers}.mp4"),
+            )
+            print(
+                f"{f'{workers} workers':<14}{wall:>10.2f}"
+                f"{frames / wall:>9.1f}{serial_wall / wall:>9.2f}"
+            )
+    print(
+        f"frame check ({max(args.workers)} chunks, overlap "
+        f"{args.overlap}): {check.describe()}"
+    )
+    return 0 if check.identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
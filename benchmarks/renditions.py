@@ -0,0 +1,132 @@
+"""
+Compares producing several renditions of one source with one FFmpeg
+run per rendition against a single run that decodes the source once and
+splits the filter graph (ConversionParams.renditions).
+
+    python -m benchmarks.renditions --size 1920x1080 --duration 20 \\
+        --renditions 1080,720,480 --preset veryfast
+
+It also times a decode-only pass of the source, so the report shows how
+much of the saving comes from the decodes that were skipped.
+"""
+
+import argparse
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks.segment_parallel import make_source
+from core.command_builder import (
+    CommandBuilder,
+    ConversionParams,
+    parse_renditions,
+)
+from core.ffmpeg_wrapper import VideoConverter
+from core.video_utils import get_ffmpeg_path
+
+
+def run(argv) -> tuple:
+    """(wall seconds, CPU seconds or None) of one FFmpeg run."""
+    converter = VideoConverter()
+    returncode = converter.convert_video(argv)
+    if returncode != 0:
+        tail = converter.stderr_tail[-1] if converter.stderr_tail else ""
+        raise RuntimeError(f"FFmpeg failed ({returncode}): {tail}")
+    stats = converter.stats
+    cpu = None
+    if stats.user_time is not None:
+        cpu = stats.user_time + stats.sys_time
+    return stats.wall_time, cpu
+
+
+def fmt_cpu(cpu) -> str:
+    return f"{cpu:.2f}" if cpu is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--rate", type=int, default=30)
+    parser.add_argument("--duration", type=int, default=20)
+    parser.add_argument("--renditions", default="1080,720,480")
+    parser.add_argument("--codec", default="libx264")
+    parser.add_argument("--preset", default="veryfast")
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    ffmpeg = str(get_ffmpeg_path())
+    renditions = parse_renditions(args.renditions)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "source.mp4"
+        make_source(ffmpeg, source, args.size, args.rate, args.duration)
+        # Se conoce la fuente, así que no hace falta ffprobe
+        info = {
+            "codec": "h264",
+            "resolution": args.size.replace(":", "x"),
+            "frame_rate": str(args.rate),
+            "duration_seconds": args.duration,
+        }
+        builder = CommandBuilder(ffmpeg)
+        params = ConversionParams(
+            input_path=str(source),
+            output_folder=str(tmp),
+            encoder=args.codec,
+            preset=args.preset,
+            remove_audio=True,
+        )
+        decode = [ffmpeg, "-i", str(source), "-map", "0:v", "-f", "null", "-"]
+        separate = [
+            replace(
+                builder.build(
+                    replace(params, width=r.width, height=r.height), info
+                ),
+                overwrite=True,
+            ).argv()
+            for r in renditions
+        ]
+        single = replace(
+            builder.build(replace(params, renditions=args.renditions), info),
+            overwrite=True,
+        ).argv()
+
+        results = {"decode": [], "separate": [], "single": []}
+        for _ in range(args.runs):
+            results["decode"].append(run(decode))
+            walls, cpus = zip(*(run(argv) for argv in separate))
+            results["separate"].append(
+                (sum(walls), None if None in cpus else sum(cpus))
+            )
+            results["single"].append(run(single))
+            time.sleep(0.1)
+
+    def best(name) -> tuple:
+        return min(results[name], key=lambda r: r[0])
+
+    decode_wall, decode_cpu = best("decode")
+    separate_wall, separate_cpu = best("separate")
+    single_wall, single_cpu = best("single")
+    count = len(renditions)
+    print(f"source {args.size} {args.duration}s, renditions {args.renditions}")
+    print(f"{'run':<34}{'wall (s)':>10}{'cpu (s)':>10}")
+    print(f"{'decode only':<34}{decode_wall:>10.2f}{fmt_cpu(decode_cpu):>10}")
+    print(
+        f"{f'{count} separate runs':<34}{separate_wall:>10.2f}"
+        f"{fmt_cpu(separate_cpu):>10}"
+    )
+    print(
+        f"{'one run, split graph':<34}{single_wall:>10.2f}"
+        f"{fmt_cpu(single_cpu):>10}"
+    )
+    saved = separate_wall - single_wall
+    print(
+        f"saved {saved:.2f} s wall ({saved / separate_wall:.0%}); "
+        f"{count - 1} skipped decodes ≈ {(count - 1) * decode_wall:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares the wall-clock time of the single-process encode against the
+segment-parallel encode on a synthetic source.
+
+    python -m benchmarks.segment_parallel --duration 60 --workers 2 4 8
+"""
+
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from core.ffmpeg_wrapper import ParallelVideoConverter, VideoConverter
+from core.video_utils import get_ffmpeg_path
+
+
+def make_source(ffmpeg, path, size, rate, duration) -> None:
+    """Generates a deterministic test video with a keyframe every second."""
+    subprocess.run(
+        [
+            ffmpeg,
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={size}:rate={rate}",
+            "-t",
+            str(duration),
+            "-g",
+            str(rate),
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-y",
+            str(path),
+        ],
+        check=True,
+    )
+
+
+def timed(converter, cmd) -> float:
+    start = time.perf_counter()
+    returncode = converter.convert_video(cmd)
+    elapsed = time.perf_counter() - start
+    if returncode != 0:
+        raise RuntimeError("\n".join(converter.stderr_tail))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--rate", type=int, default=30)
+    parser.add_argument("--duration", type=int, default=30)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument(
+        "--encode",
+        default="-c:v libx264 -preset slow",
+        help="output options used for every run",
+    )
+    args = parser.parse_args()
+
+    ffmpeg = str(get_ffmpeg_path())
+    encode_args = args.encode.split()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "source.mp4"
+        make_source(ffmpeg, source, args.size, args.rate, args.duration)
+
+        def cmd(name):
+            return [ffmpeg, "-i", str(source), *encode_args, str(tmp / name)]
+
+        baseline = timed(VideoConverter(), cmd("single.mp4"))
+        print(f"{'mode':<12}{'wall (s)':>10}{'speedup':>10}")
+        print(f"{'single':<12}{baseline:>10.2f}{1:>10.2f}")
+        for workers in args.workers:
+            elapsed = timed(
+                ParallelVideoConverter(workers=workers),
+                cmd(f"parallel_{workers}.mp4"),
+            )
+            print(
+                f"{f'{workers} segs':<12}{elapsed:>10.2f}"
+                f"{baseline / elapsed:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
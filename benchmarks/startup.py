@@ -0,0 +1,110 @@
+"""
+Measures the cold start of the GUI up to its first paint, in a fresh
+interpreter per run, without a Flet client: the page talks to a
+connection that records what would be sent to the client.
+
+    python -m benchmarks.startup --runs 10
+
+For every run it records the time to import the application, the time
+until the first "add" reaches the client (first paint), the time until
+the cards built after the first paint have been sent, and how many
+controls the first paint carries.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Se ejecuta en un intérprete nuevo por medición
+PROBE = r"""
+import asyncio, itertools, json, sys, time
+start = time.perf_counter()
+
+import main
+imported = time.perf_counter()
+
+from flet.core.connection import Connection
+from flet.core.page import Page
+
+
+class Result:
+    def __init__(self, results=None):
+        self.results = results or []
+        self.result = None
+        self.error = None
+
+
+class RecordingConnection(Connection):
+    def __init__(self):
+        super().__init__()
+        self.ids = itertools.count()
+        self.adds = []  # (instante, controles)
+
+    def send_command(self, session_id, command):
+        return Result()
+
+    def send_commands(self, session_id, commands):
+        results = []
+        for command in commands:
+            if command.name == "add":
+                self.adds.append((time.perf_counter(), len(command.commands)))
+                results.append(
+                    " ".join(f"_{next(self.ids)}" for _ in command.commands)
+                )
+        return Result(results)
+
+
+conn = RecordingConnection()
+page = Page(conn, "bench", asyncio.new_event_loop())
+main.main(page)
+done = time.perf_counter()
+(first_paint, first_controls), *later = conn.adds
+print(json.dumps({
+    "import": imported - start,
+    "first_paint": first_paint - start,
+    "complete": (later[-1][0] if later else first_paint) - start,
+    "main": done - start,
+    "first_paint_controls": first_controls,
+    "total_controls": first_controls + sum(n for _, n in later),
+}))
+"""
+
+
+def measure() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        runs.append(measure())
+        time.sleep(0.1)
+
+    print(f"{'metric':<24}{'median':>10}{'min':>10}{'max':>10}")
+    for key in ("import", "first_paint", "complete"):
+        values = [run[key] * 1000 for run in runs]
+        print(
+            f"{key + ' (ms)':<24}{statistics.median(values):>10.1f}"
+            f"{min(values):>10.1f}{max(values):>10.1f}"
+        )
+    print(
+        f"controls in first paint: {runs[-1]['first_paint_controls']} of "
+        f"{runs[-1]['total_controls']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Runs conversions without the graphical interface (Flet is not imported).
+
+    python cli.py jobs.json --workers 4 --policy longest
+
+The manifest is JSON (or YAML, if PyYAML is installed):
+
+    {
+      "workers": 2,
+      "policy": "shortest",
+      "resumable": true,
+      "defaults": {"encoder": "libx264", "crf": 23, "output_folder": "out"},
+      "jobs": [
+        {"input": "videos/"},
+        {"input": "talk.mkv", "width": 1280, "height": 720}
+      ]
+    }
+
+Every job accepts the fields of core.command_builder.ConversionParams
+("input" is input_path); a folder expands to one job per video in it.
+Progress is written to stdout as one JSON object per line (NDJSON).
+With "resumable" (or --resumable) jobs are encoded in checkpointed
+segments, and running the same manifest again continues unfinished jobs.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from dataclasses import fields, replace
+from pathlib import Path
+
+from core.batch import BatchJob, BatchQueue, list_videos
+from core.command_builder import CommandBuilder, ConversionParams
+from core.history import get_job_history
+from core.i18n import load_config
+from core.resources import ResourceGovernor
+from core.scheduler import POLICIES
+
+PARAM_FIELDS = {f.name: f for f in fields(ConversionParams)}
+FLAGS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def load_manifest(path) -> dict:
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise SystemExit("YAML manifests need PyYAML: pip install pyyaml")
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def parse_flag(name: str, value) -> bool:
+    """A JSON/YAML boolean, or "true"/"false"/"1"/"0" as text."""
+    if isinstance(value, bool):
+        return value
+    flag = FLAGS.get(str(value).strip().lower())
+    if flag is None:
+        raise ValueError(f"{name} must be true or false, not {value!r}")
+    return flag
+
+
+def job_params(entry: dict, defaults: dict, base_dir: Path):
+    """Returns (input path, ConversionParams) for a manifest entry."""
+    values = {**defaults, **entry}
+    if "input" in values:
+        values["input_path"] = values.pop("input")
+    unknown = set(values) - set(PARAM_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+    if not values.get("input_path"):
+        raise ValueError("Every job needs an input")
+
+    for name, value in values.items():
+        if PARAM_FIELDS[name].type is bool:
+            # bool("false") es True
+            values[name] = parse_flag(name, value)
+        elif value is not None:
+            values[name] = str(value)  # la UI entrega texto
+    for name in ("input_path", "output_folder"):
+        if values.get(name):
+            values[name] = str(base_dir / values[name])
+    return Path(values["input_path"]), ConversionParams(**values)
+
+
+def manifest_jobs(manifest: dict, base_dir: Path) -> list:
+    defaults = manifest.get("defaults", {})
+    jobs = []
+    for entry in manifest.get("jobs", []):
+        if isinstance(entry, str):
+            entry = {"input": entry}
+        input_path, params = job_params(entry, defaults, base_dir)
+        paths = (
+            list_videos(input_path) if input_path.is_dir() else [input_path]
+        )
+        for path in paths:
+            jobs.append(BatchJob(path, params=params))
+    return jobs
+
+
+class EventWriter:
+    """Writes NDJSON events; progress is limited to ``rate_hz`` per job."""
+
+    def __init__(self, jobs, stream=sys.stdout, rate_hz: float = 2):
+        # Número de cada trabajo (una entrada puede repetirse)
+        self.index = {id(job): n for n, job in enumerate(jobs)}
+        self.stream = stream
+        self.interval = 1 / rate_hz if rate_hz > 0 else 0
+        self._lock = threading.Lock()
+        self._status = {}
+        self._last_progress = {}
+
+    def emit(self, event: str, **data) -> None:
+        line = json.dumps({"event": event, "time": time.time(), **data})
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def job_update(self, queue: BatchQueue, job: BatchJob) -> None:
+        key = id(job)
+        common = {"job": self.index.get(key), "input": str(job.input_path)}
+        if self._status.get(key) != job.status:
+            self._status[key] = job.status
+            if job.status == "running":
+                self.emit(
+                    "start",
+                    **common,
+                    command=job.cmd,
+                    resources=job.resources,
+                    estimate=job.estimate,
+                )
+            elif job.status != "pending":
+                self.emit(
+                    "end",
+                    **common,
+                    status=job.status,
+                    returncode=job.returncode,
+                    error=job.error,
+                )
+            return
+
+        now = time.monotonic()
+        if now - self._last_progress.get(key, 0) < self.interval:
+            return
+        self._last_progress[key] = now
+        self.emit(
+            "progress",
+            **common,
+            progress=round(job.progress, 4),
+            speed=job.speed,
+            queue_progress=round(queue.overall_progress(), 4),
+            queue_eta=queue.eta(),
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("manifest", help="JSON or YAML job manifest")
+    parser.add_argument("--workers", type=int, help="parallel jobs")
+    parser.add_argument("--policy", choices=POLICIES, help="job order")
+    parser.add_argument(
+        "--resumable",
+        action="store_true",
+        help="encode in segments that survive cancellations and crashes",
+    )
+    parser.add_argument(
+        "--progress-rate",
+        type=float,
+        default=2,
+        help="progress events per second and job (default 2)",
+    )
+    args = parser.parse_args(argv)
+
+    manifest_path = Path(args.manifest)
+    manifest = load_manifest(manifest_path)
+    try:
+        jobs = manifest_jobs(manifest, manifest_path.parent)
+        resumable = args.resumable or parse_flag(
+            "resumable", manifest.get("resumable", False)
+        )
+    except (ValueError, TypeError, OSError) as e:
+        parser.error(str(e))
+    workers = args.workers or manifest.get("workers", 1)
+    policy = args.policy or manifest.get("policy", "fifo")
+
+    builder = CommandBuilder()
+    if not resumable:
+        # Todos los nombres de salida en una sola pasada
+        builder.plan_outputs(
+            [
+                replace(job.params, input_path=str(job.input_path))
+                for job in jobs
+            ]
+        )
+    events = EventWriter(jobs, rate_hz=args.progress_rate)
+    queue = BatchQueue(
+        jobs,
+        workers=workers,
+        build_command=lambda job, info: builder.for_input(
+            job.params, job.input_path, info, resume=resumable
+        ),
+        planner=builder.planner,
+        on_update=lambda job: events.job_update(queue, job),
+        governor=ResourceGovernor.from_config(load_config(), workers),
+        policy=policy,
+        resumable=resumable,
+        history=get_job_history(),
+    )
+    events.emit("queue", jobs=len(jobs), workers=workers, policy=policy)
+    thread = queue.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        queue.cancel()
+        thread.join()
+    builder.planner.release_planned()
+    events.emit(
+        "summary",
+        done=queue.count("done"),
+        failed=queue.count("failed"),
+        cancelled=queue.count("cancelled"),
+    )
+    return 0 if queue.count("done") == len(queue.jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Vacío: pytest añade esta carpeta a sys.path y los tests importan core
@@ -0,0 +1,323 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from core.ffmpeg_wrapper import (
+    ParallelVideoConverter,
+    VideoConverter,
+    segmentable,
+)
+from core.resources import ResourceGovernor
+from core.scheduler import SpeedModel, makespan, order_jobs, remaining_time
+from core.video_utils import get_video_info, probe_many
+
+VIDEO_EXTENSIONS = {
+    ".mp4",
+    ".mkv",
+    ".mov",
+    ".avi",
+    ".webm",
+    ".m4v",
+    ".wmv",
+    ".flv",
+    ".mpg",
+    ".mpeg",
+    ".ts",
+    ".mts",
+}
+
+
+def list_videos(folder) -> list:
+    """
+    Returns the video files directly inside a folder, sorted by name.
+    """
+    return sorted(
+        path
+        for path in Path(folder).iterdir()
+        if path.is_file() and path.suffix.lower() in VIDEO_EXTENSIONS
+    )
+
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+@dataclass
+class BatchJob:
+    input_path: Path
+    cmd: object = None
+    duration: Optional[float] = None  # seconds
+    status: str = "pending"  # pending, running, done, failed, cancelled
+    progress: float = 0.0
+    returncode: Optional[int] = None
+    error: str = ""
+    resources: str = ""  # recursos asignados por el governor
+    info: Optional[dict] = None
+    estimate: Optional[float] = None  # segundos de conversión previstos
+    speed: Optional[float] = None  # último speed= de FFmpeg
+    params: object = None  # ConversionParams propios del trabajo (CLI)
+    outputs: list = field(default_factory=list)  # archivos reservados
+
+
+class BatchQueue:
+    """
+    Runs a list of conversion jobs on a bounded pool of FFmpeg workers.
+
+    Jobs without a command get one from ``build_command(job, info)``
+    (an FFmpegCommand), called in the worker thread right after the file
+    has been probed. The outputs it reserved are released in ``planner``
+    (core.output_planner) if the job fails or is cancelled.
+    ``on_update(job)`` is called from the worker threads whenever a job
+    reports progress or changes state; ``on_finish(queue)`` is called once
+    every job has ended.
+
+    Each running job gets a slot from ``governor`` (by default one slot
+    per worker), so the concurrent FFmpeg processes use separate cores.
+
+    Before starting, every file is probed and its runtime estimated with
+    ``speed_model``; the jobs are then ordered by ``policy`` (see
+    core.scheduler.POLICIES).
+
+    With ``resumable`` every job is encoded in checkpointed segments
+    (see ParallelVideoConverter), so an interrupted queue that is run
+    again continues where each job stopped.
+
+    Every finished job is recorded in ``history`` (core.history), if set.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        workers: int = 2,
+        build_command=None,
+        on_update=None,
+        on_finish=None,
+        governor=None,
+        policy: str = "fifo",
+        speed_model: SpeedModel = None,
+        resumable: bool = False,
+        history=None,
+        planner=None,
+    ):
+        self.jobs = list(jobs)
+        self.workers = max(1, int(workers))
+        self.governor = governor or ResourceGovernor(self.workers)
+        self.policy = policy
+        self.speed_model = speed_model or SpeedModel()
+        self.resumable = resumable
+        self.history = history
+        self.planner = planner
+        self.build_command = build_command
+        self.on_update = on_update
+        self.on_finish = on_finish
+        self.cancelled = False
+        self._converters = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def run(self) -> None:
+        self.plan()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self._run_job, job): job for job in self.jobs
+            }
+        # Un error inesperado no puede dejar el trabajo "running"
+        for future, job in futures.items():
+            error = future.exception()
+            if error is not None:
+                self._fail(job, str(error))
+        if self.on_finish:
+            self.on_finish(self)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def plan(self) -> None:
+        """Probes the jobs, estimates their runtime and orders the queue."""
+        unprobed = [job for job in self.jobs if job.info is None]
+        report = probe_many([job.input_path for job in unprobed])
+        for job in unprobed:
+            job.info = report["results"].get(job.input_path)
+            if job.info and job.duration is None:
+                job.duration = job.info["duration_seconds"]
+        for job in self.jobs:
+            if job.info:
+                job.estimate = self.speed_model.estimate(
+                    job.info, job.duration
+                )
+        self.jobs = order_jobs(self.jobs, self.policy)
+
+    def _run_job(self, job: BatchJob) -> None:
+        if self.cancelled:
+            job.status = "cancelled"
+            self._notify(job)
+            return
+
+        info = job.info or get_video_info(str(job.input_path))
+        if not isinstance(info, dict):
+            job.status = "failed"
+            job.error = info
+            self._notify(job)
+            return
+        job.info = info
+        if job.duration is None:
+            job.duration = info["duration_seconds"]
+        if job.cmd is None:
+            try:
+                command = self.build_command(job, info)
+                job.outputs = command.outputs()
+                job.cmd = command.argv()
+            except (ValueError, SyntaxError, ZeroDivisionError) as e:
+                self._fail(job, f"Invalid parameters: {e}")
+                return
+            except Exception as e:
+                # p. ej. KeyError de un análisis incompleto u OSError al
+                # reservar una salida
+                self._fail(job, str(e))
+                return
+
+        with self.governor.slot() as resources:
+            if self.resumable and segmentable(job.cmd):
+                converter = ParallelVideoConverter(
+                    workers=1,
+                    governor=ResourceGovernor(plans=[resources]),
+                    resumable=True,
+                    history=self.history,
+                )
+            else:
+                converter = VideoConverter(resources, history=self.history)
+            with self._lock:
+                self._converters[id(job)] = converter
+            job.status = "running"
+            job.resources = resources.describe()
+            self._notify(job)
+
+            def on_progress(progress):
+                if job.duration:
+                    job.progress = min(progress.out_time / job.duration, 1)
+                if progress.speed:
+                    job.speed = progress.speed
+                self._notify(job)
+
+            started = time.perf_counter()
+            try:
+                job.returncode = converter.convert_video(
+                    job.cmd, on_progress, info
+                )
+            except OSError as e:
+                job.returncode = -1
+                job.error = str(e)
+            finally:
+                with self._lock:
+                    self._converters.pop(id(job), None)
+
+        if converter.cancelled:
+            job.status = "cancelled"
+        elif job.returncode == 0:
+            job.status = "done"
+            job.progress = 1.0
+            if job.duration:
+                self.speed_model.observe(
+                    info, job.duration / (time.perf_counter() - started)
+                )
+        else:
+            job.status = "failed"
+            if not job.error and converter.stderr_tail:
+                job.error = converter.stderr_tail[-1]
+        if job.status != "done" and not self.resumable:
+            self._release(job)
+        self._notify(job)
+
+    def _fail(self, job: BatchJob, error: str) -> None:
+        """Marks a job failed, frees its outputs and reports it."""
+        job.status = "failed"
+        job.error = error
+        if not self.resumable:
+            self._release(job)
+        self._notify(job)
+
+    def _release(self, job: BatchJob) -> None:
+        """Frees the names reserved for a job that wrote nothing."""
+        if self.planner is not None:
+            for path in job.outputs:
+                self.planner.release(path)
+
+    def _notify(self, job: BatchJob) -> None:
+        if self.on_update:
+            self.on_update(job)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        with self._lock:
+            converters = list(self._converters.values())
+        for converter in converters:
+            converter.cancel_conversion()
+
+    def overall_progress(self) -> float:
+        """Aggregate progress, weighted by duration when it is known."""
+        if not self.jobs:
+            return 0.0
+        total = sum(job.duration or 0 for job in self.jobs)
+        if total > 0:
+            return (
+                sum((job.duration or 0) * job.progress for job in self.jobs)
+                / total
+            )
+        return sum(job.progress for job in self.jobs) / len(self.jobs)
+
+    def eta(self):
+        """
+        Seconds until the whole queue is done, or None before the plan.
+        Running jobs use their live speed; pending estimates are scaled
+        by how much faster or slower the running jobs go than predicted.
+        """
+        running, corrections = [], []
+        for job in self.jobs:
+            if job.status != "running":
+                continue
+            position = job.progress * (job.duration or 0)
+            left = remaining_time(job.duration, position, job.speed)
+            if left is None:
+                left = (job.estimate or 0) * (1 - job.progress)
+            elif job.info:
+                corrections.append(
+                    job.speed / self.speed_model.speed(job.info)
+                )
+            running.append(left)
+        correction = (
+            sum(corrections) / len(corrections) if corrections else 1.0
+        )
+        pending = [
+            job.estimate / correction
+            for job in self.jobs
+            if job.status == "pending" and job.estimate is not None
+        ]
+        if not running and not pending:
+            return None
+        return makespan(running, pending, self.workers)
+
+    def count(self, status: str) -> int:
+        return sum(1 for job in self.jobs if job.status == status)
+
+    def failures(self) -> list:
+        return [job for job in self.jobs if job.status == "failed"]
+
+    def summary(self) -> str:
+        lines = [
+            f"Done: {self.count('done')} / {len(self.jobs)}",
+            f"Failed: {self.count('failed')}",
+        ]
+        if self.cancelled:
+            lines.append(f"Cancelled: {self.count('cancelled')}")
+        for job in self.failures():
+            lines.append(f"  ❌ {job.input_path.name}: {job.error}")
+        return "\n".join(lines)
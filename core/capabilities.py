@@ -0,0 +1,190 @@
+import json
+import os
+import subprocess
+from dataclasses import asdict, dataclass, field
+
+from core.i18n import CONFIG_PATH
+from core.video_utils import get_ffmpeg_path
+
+CAPABILITIES_PATH = os.path.join(
+    os.path.dirname(CONFIG_PATH), "ffmpeg_capabilities.json"
+)
+
+# Encoders que dependen de hardware: que estén compilados no garantiza
+# que funcionen, así que se prueban con una codificación mínima.
+HARDWARE_MARKERS = ("nvenc", "qsv", "amf", "vaapi", "videotoolbox", "v4l2m2m")
+
+# Encoders por CPU preferidos para cada códec, en orden
+CPU_ENCODERS = {
+    "h264": ["libx264", "libopenh264"],
+    "hevc": ["libx265"],
+    "mpeg4": ["mpeg4", "libxvid"],
+}
+
+ENCODER_FAMILIES = {
+    "h264_nvenc": "h264",
+    "h264_qsv": "h264",
+    "h264_amf": "h264",
+    "hevc_nvenc": "hevc",
+    "hevc_qsv": "hevc",
+    "hevc_amf": "hevc",
+}
+
+# Presets NVENC (p1 más rápido ... p7 más lento) a presets x264/x265
+NVENC_TO_CPU_PRESETS = {
+    "p1": "ultrafast",
+    "p2": "superfast",
+    "p3": "veryfast",
+    "p4": "medium",
+    "p5": "slow",
+    "p6": "slower",
+    "p7": "veryslow",
+}
+NVENC_TO_CPU_TUNES = {"ll": "zerolatency", "ull": "zerolatency"}
+
+
+@dataclass
+class FFmpegCapabilities:
+    version: str = ""
+    encoders: list = field(default_factory=list)  # solo los que funcionan
+    filters: list = field(default_factory=list)
+    hwaccels: list = field(default_factory=list)
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+
+def _run(ffmpeg, *args) -> str:
+    result = subprocess.run(
+        [str(ffmpeg), "-hide_banner", *args],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout if result.returncode == 0 else ""
+
+
+def parse_encoders(output: str) -> list:
+    encoders = []
+    in_list = False
+    for line in output.splitlines():
+        if line.strip().startswith("------"):
+            in_list = True
+        elif in_list:
+            parts = line.split()
+            if len(parts) >= 2:
+                encoders.append(parts[1])
+    return encoders
+
+
+def parse_filters(output: str) -> list:
+    filters = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and "->" in parts[2]:
+            filters.append(parts[1])
+    return filters
+
+
+def parse_hwaccels(output: str) -> list:
+    lines = [line.strip() for line in output.splitlines()]
+    return [line for line in lines[1:] if line]
+
+
+def encoder_works(ffmpeg, encoder: str) -> bool:
+    """Encodes a single synthetic frame to check the encoder is usable."""
+    result = subprocess.run(
+        [
+            str(ffmpeg),
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "color=size=256x256:duration=0.1",
+            "-frames:v",
+            "1",
+            "-c:v",
+            encoder,
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def probe_capabilities(ffmpeg) -> FFmpegCapabilities:
+    version = _run(ffmpeg, "-version").split("\n", 1)[0]
+    encoders = [
+        encoder
+        for encoder in parse_encoders(_run(ffmpeg, "-encoders"))
+        if not any(marker in encoder for marker in HARDWARE_MARKERS)
+        or encoder_works(ffmpeg, encoder)
+    ]
+    return FFmpegCapabilities(
+        version=version,
+        encoders=encoders,
+        filters=parse_filters(_run(ffmpeg, "-filters")),
+        hwaccels=parse_hwaccels(_run(ffmpeg, "-hwaccels")),
+    )
+
+
+def get_capabilities(ffmpeg=None, path: str = CAPABILITIES_PATH):
+    """
+    Returns the capabilities of the FFmpeg binary. They are probed once
+    per binary (path, size and mtime) and cached on disk. Returns None if
+    the binary cannot be found.
+    """
+    # probe_cache trae sqlite3; aquí solo se usa file_key
+    from core.probe_cache import file_key
+
+    ffmpeg = ffmpeg or get_ffmpeg_path()
+    key = file_key(ffmpeg)
+    if key is None:
+        return None
+    cache_key = "|".join(str(part) for part in key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if cache_key in cache:
+        return FFmpegCapabilities(**cache[cache_key])
+
+    capabilities = probe_capabilities(ffmpeg)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({cache_key: asdict(capabilities)}, f)
+    except OSError:
+        pass
+    return capabilities
+
+
+def resolve_encoder(capabilities, encoder: str, preset=None, tune=None):
+    """
+    Returns (encoder, preset, tune, note). If the requested encoder is not
+    available, the best available CPU encoder of the same codec is used,
+    with the preset and tune mapped to their closest equivalents.
+    """
+    if capabilities is None or encoder in (None, "copy"):
+        return encoder, preset, tune, None
+    if capabilities.has_encoder(encoder):
+        return encoder, preset, tune, None
+
+    family = ENCODER_FAMILIES.get(encoder, encoder)
+    candidates = CPU_ENCODERS.get(family, []) + ["libx264", "mpeg4"]
+    fallback = next(
+        (c for c in candidates if capabilities.has_encoder(c)), None
+    )
+    if fallback is None:
+        return encoder, preset, tune, None
+    if preset in NVENC_TO_CPU_PRESETS:
+        preset = NVENC_TO_CPU_PRESETS[preset]
+    tune = NVENC_TO_CPU_TUNES.get(tune) if tune else None
+    if fallback not in ("libx264", "libx265"):
+        preset, tune = None, None  # mpeg4 no admite -preset/-tune
+    return fallback, preset, tune, f"{encoder} → {fallback}"
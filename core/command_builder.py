@@ -0,0 +1,447 @@
+import shlex
+import subprocess
+import sys
+from dataclasses import dataclass, field, fields, replace
+from pathlib import Path
+from typing import Optional
+
+from core.filter_plan import FilterPlan, plan_filters
+from core.output_planner import get_output_planner
+from core.remux import can_remux
+from core.video_utils import (
+    get_ffmpeg_path,
+    keyframe_before,
+    parse_timestamp,
+)
+
+
+@dataclass(frozen=True)
+class ConversionParams:
+    """
+    Conversion options chosen by the user. Options that are not enabled
+    are None (or False).
+    """
+
+    input_path: str = ""
+    output_folder: str = ""
+    container: str = ""  # "" = mp4 sin forzar -f
+    bitrate: Optional[str] = None
+    crf: Optional[str] = None
+    encoder: Optional[str] = None
+    preset: Optional[str] = None
+    tune: Optional[str] = None
+    width: Optional[str] = None
+    height: Optional[str] = None
+    frame_rate: Optional[str] = None
+    mi_mode: Optional[str] = None
+    mc_mode: Optional[str] = None
+    me_mode: Optional[str] = None
+    crop: Optional[str] = None
+    remove_audio: bool = False
+    extract_audio: bool = False
+    start_time: Optional[str] = None
+    duration: Optional[str] = None
+    keyframe_snap: bool = False
+    renditions: Optional[str] = None  # "1080,720,480" o "1280x720,..."
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """One scaled branch of a multi-output command."""
+
+    label: str
+    width: str
+    height: str
+
+
+def parse_renditions(text: str) -> list:
+    """
+    "1080,720,480" (heights, width keeps the aspect ratio) or
+    "1280x720,854x480". Raises ValueError on an invalid entry.
+    """
+    renditions = []
+    for item in text.replace(" ", "").split(","):
+        if not item:
+            continue
+        width, _, height = item.rpartition("x")
+        if not height.isdigit() or (width and not width.isdigit()):
+            raise ValueError(f"Invalid rendition: {item}")
+        if width:
+            renditions.append(Rendition(item, width, height))
+        else:
+            renditions.append(Rendition(f"{height}p", "-2", height))
+    if not renditions:
+        raise ValueError("No renditions given")
+    if len({r.label for r in renditions}) != len(renditions):
+        raise ValueError("Repeated rendition")
+    return renditions
+
+
+@dataclass
+class FFmpegCommand:
+    ffmpeg: str
+    input_options: list
+    input_path: str
+    output_options: list
+    filters: list
+    output_path: str
+    extra_outputs: list = field(default_factory=list)
+    stream_copy: bool = False
+    notes: list = field(default_factory=list)
+    overwrite: bool = False  # salidas reservadas: el archivo ya existe
+    # (Rendition, ruta): varias salidas de una sola decodificación
+    renditions: list = field(default_factory=list)
+    filter_plan: Optional[FilterPlan] = None
+
+    def argv(self) -> list:
+        argv = [self.ffmpeg]
+        if self.overwrite:
+            argv.append("-y")
+        argv += [*self.input_options, "-i", self.input_path]
+        if self.renditions:
+            return [*argv, *self._rendition_args(), *self.extra_outputs]
+        argv += self.output_options
+        if self.filters:
+            argv += ["-vf", ",".join(self.filters)]
+        return [*argv, self.output_path, *self.extra_outputs]
+
+    def _rendition_args(self) -> list:
+        """
+        The input is decoded (and the common filters run) once; split
+        feeds one scale branch per rendition, each with its own output.
+        """
+        count = len(self.renditions)
+        common = "".join(f"{f}," for f in self.filters)
+        graph = f"[0:v]{common}split={count}"
+        graph += "".join(f"[s{n}]" for n in range(count))
+        for n, (rendition, _) in enumerate(self.renditions):
+            graph += f";[s{n}]scale={rendition.width}:{rendition.height}[v{n}]"
+        args = ["-filter_complex", graph]
+        for n, (_, path) in enumerate(self.renditions):
+            args += ["-map", f"[v{n}]"]
+            if "-an" not in self.output_options:
+                args += ["-map", "0:a?"]
+            args += [*self.output_options, str(path)]
+        return args
+
+    def outputs(self) -> list:
+        """Paths of every file the command writes."""
+        paths = [str(path) for _, path in self.renditions] or [
+            self.output_path
+        ]
+        if self.extra_outputs:
+            paths.append(self.extra_outputs[-1])
+        return paths
+
+    def output_sizes(self) -> list:
+        """(label, bytes written so far) of every rendition."""
+        sizes = []
+        for rendition, path in self.renditions:
+            try:
+                sizes.append((rendition.label, Path(path).stat().st_size))
+            except OSError:
+                sizes.append((rendition.label, 0))
+        return sizes
+
+    def __str__(self) -> str:
+        if sys.platform.startswith("win"):
+            return subprocess.list2cmdline(self.argv())
+        return shlex.join(self.argv())
+
+
+# Campos de ConversionParams de los que depende cada parte del comando
+INPUT_FIELDS = {"input_path", "start_time", "duration", "keyframe_snap"}
+OUTPUT_FIELDS = {
+    "input_path",
+    "output_folder",
+    "container",
+    "extract_audio",
+    "renditions",
+}
+ENCODE_FIELDS = {f.name for f in fields(ConversionParams)} - {
+    "input_path",
+    "output_folder",
+    "extract_audio",
+    "keyframe_snap",
+}
+
+
+def input_options(params: ConversionParams, keyframes=None) -> list:
+    """Input-side seek (-ss/-t before -i), optionally snapped to a keyframe."""
+    if params.start_time is None:
+        return []
+    start, length = params.start_time, params.duration
+    if params.keyframe_snap and keyframes is not None:
+        try:
+            begin = parse_timestamp(start)
+            end = begin + parse_timestamp(length) if length else None
+        except ValueError:
+            pass
+        else:
+            begin = keyframe_before(keyframes(params.input_path), begin)
+            start = f"{begin:.3f}"
+            # Sin duración se copia hasta el final: solo se mueve -ss
+            if end is not None:
+                length = f"{end - begin:.3f}"
+    options = ["-ss", start]
+    if length:
+        options += ["-t", length]
+    return options
+
+
+def stream_copy_possible(params: ConversionParams, info: dict) -> bool:
+    """
+    True when only the container changes (or the audio is dropped).
+    Choosing an encoder, preset or tune asks for a re-encode.
+    """
+    if params.bitrate or params.crf or params.crop or params.renditions:
+        return False
+    if params.preset or params.tune:
+        return False
+    if params.encoder and params.encoder != "copy":
+        return False
+    size = None
+    if params.width and params.height:
+        size = (params.width, params.height)
+    return can_remux(
+        info,
+        params.container or "mp4",
+        encoder=params.encoder,
+        size=size,
+        frame_rate=params.frame_rate,
+        keep_audio=not params.remove_audio,
+    )
+
+
+def video_filters(params: ConversionParams, info: dict) -> list:
+    """The -vf chain, ordered by core.filter_plan."""
+    return plan_filters(params, info).filters
+
+
+def encode_options(params: ConversionParams, info: dict, capabilities=None):
+    """
+    Returns (output options, filter plan, stream copy, notes). Encoders
+    missing from ``capabilities`` are replaced by a CPU equivalent.
+    """
+    options = []
+    notes = []
+    if params.bitrate:
+        options += ["-b:v", params.bitrate]
+    if params.crf:
+        options += ["-crf", params.crf]
+    if params.container:
+        options += ["-f", params.container]
+
+    stream_copy = stream_copy_possible(params, info)
+    plan = FilterPlan()
+    if stream_copy:
+        # Mismo códec, tamaño y fps: basta con copiar los streams
+        options += ["-c", "copy"]
+        if params.start_time is not None:
+            options += ["-avoid_negative_ts", "make_zero"]
+    else:
+        if params.encoder:
+            from core.capabilities import resolve_encoder
+
+            encoder, preset, tune, note = resolve_encoder(
+                capabilities, params.encoder, params.preset, params.tune
+            )
+            if note:
+                notes.append(note)
+            options += ["-c:v", encoder]
+            if preset:
+                options += ["-preset", preset]
+            if tune:
+                options += ["-tune", tune]
+        plan = plan_filters(params, info)
+
+    if params.remove_audio:
+        options.append("-an")
+    return options, plan, stream_copy, notes
+
+
+def planned_outputs(params: ConversionParams) -> list:
+    """(directory, base name, extension) of every output of the command."""
+    original_path = Path(params.input_path)
+    output_path = (
+        Path(params.output_folder)
+        if params.output_folder
+        else original_path.parent
+    )
+    extension = params.container or "mp4"
+    if params.renditions:
+        outputs = [
+            (output_path, f"{original_path.stem}_{r.label}", extension)
+            for r in parse_renditions(params.renditions)
+        ]
+    else:
+        outputs = [(output_path, f"{original_path.stem}_converted", extension)]
+    if params.extract_audio:
+        outputs.append((output_path, f"{original_path.stem}_audio", "aac"))
+    return outputs
+
+
+def output_paths(
+    params: ConversionParams, planner=None, reserve=False, resume=False
+):
+    """
+    Returns (video output path, extra output arguments, renditions). With
+    ``reserve`` the names are claimed in ``planner`` so no other job can
+    take them; with ``resume`` an interrupted resumable output is reused.
+    """
+    planner = planner or get_output_planner()
+    if reserve:
+        paths = []
+        try:
+            for planned in planned_outputs(params):
+                paths.append(planner.reserve(*planned, resume=resume))
+        except OSError:
+            # Sin comando no hay quien libere los nombres ya tomados
+            for path in paths:
+                planner.release(path)
+            raise
+    else:
+        paths = [
+            planner.candidate(*planned) for planned in planned_outputs(params)
+        ]
+    renditions = []
+    if params.renditions:
+        renditions = list(zip(parse_renditions(params.renditions), paths))
+        paths = [paths[0], *paths[len(renditions) :]]
+    output, *extra = paths
+    extra_outputs = []
+    if extra:
+        extra_outputs = ["-map", "0:a", "-c:a", "copy", str(extra[0])]
+    return str(output), extra_outputs, renditions
+
+
+class CommandBuilder:
+    """
+    Builds FFmpeg commands as argv lists.
+
+    ``update`` keeps the last command and only recomputes the parts that
+    depend on the parameters that changed: the output path (and its
+    filesystem checks) is not recomputed while only encoding options
+    are being edited.
+    """
+
+    def __init__(self, ffmpeg=None, capabilities=None, planner=None):
+        self.ffmpeg = str(ffmpeg or get_ffmpeg_path())
+        self.capabilities = capabilities
+        self.planner = planner or get_output_planner()
+        self.params = None
+        self.info = None
+        self._keyframes = {}
+        self._input = None
+        self._encode = None
+        self._output = None
+
+    def keyframes(self, input_path: str) -> list:
+        if input_path not in self._keyframes:
+            # sqlite3 solo se carga cuando hace falta un recorte rápido
+            from core.keyframe_index import get_keyframe_index
+
+            self._keyframes[input_path] = get_keyframe_index(
+                input_path
+            ).keyframes
+        return self._keyframes[input_path]
+
+    def set_capabilities(self, capabilities) -> None:
+        self.capabilities = capabilities
+        self._encode = None
+
+    def update(self, params: ConversionParams, info: dict) -> FFmpegCommand:
+        if self.params is None:
+            changed = {f.name for f in fields(ConversionParams)}
+        else:
+            changed = {
+                f.name
+                for f in fields(ConversionParams)
+                if getattr(params, f.name) != getattr(self.params, f.name)
+            }
+        if info != self.info:
+            changed.add("info")
+        self.params, self.info = params, info
+
+        if self._input is None or changed & INPUT_FIELDS:
+            self._input = input_options(params, self.keyframes)
+        if self._encode is None or changed & (ENCODE_FIELDS | {"info"}):
+            self._encode = encode_options(params, info, self.capabilities)
+        if self._output is None or changed & OUTPUT_FIELDS:
+            self._output = output_paths(params, self.planner)
+        return self._assemble(params)
+
+    def build(
+        self,
+        params: ConversionParams,
+        info: dict,
+        reserve: bool = False,
+        resume: bool = False,
+    ) -> FFmpegCommand:
+        """
+        Builds a command from scratch, without touching the cache. With
+        ``reserve`` the output names are claimed for this command (see
+        output_paths for ``resume``).
+        """
+        builder = CommandBuilder(self.ffmpeg, self.capabilities, self.planner)
+        builder._keyframes = self._keyframes
+        command = builder.update(params, info)
+        if reserve:
+            (
+                command.output_path,
+                command.extra_outputs,
+                command.renditions,
+            ) = output_paths(params, self.planner, reserve=True, resume=resume)
+            command.overwrite = True
+        return command
+
+    def reserve(
+        self, params: ConversionParams, info: dict, resume: bool = False
+    ) -> FFmpegCommand:
+        """
+        The command to run now: its outputs are reserved, and the next
+        ``update`` looks for free names again.
+        """
+        self._output = None
+        return self.build(params, info, reserve=True, resume=resume)
+
+    def plan_outputs(self, params_list) -> list:
+        """Reserves the outputs of many jobs in one pass (batches)."""
+        return self.planner.plan_batch(
+            [
+                planned
+                for params in params_list
+                for planned in planned_outputs(params)
+            ]
+        )
+
+    def _assemble(self, params: ConversionParams) -> FFmpegCommand:
+        output_options, plan, stream_copy, notes = self._encode
+        output_path, extra_outputs, renditions = self._output
+        return FFmpegCommand(
+            ffmpeg=self.ffmpeg,
+            input_options=list(self._input),
+            input_path=params.input_path,
+            output_options=list(output_options),
+            filters=list(plan.filters),
+            filter_plan=plan,
+            output_path=output_path,
+            extra_outputs=list(extra_outputs),
+            stream_copy=stream_copy,
+            notes=list(notes),
+            renditions=list(renditions),
+        )
+
+    def for_input(
+        self, params: ConversionParams, input_path, info: dict, resume=False
+    ):
+        """
+        Same options applied to another input file (batch jobs), with
+        its outputs reserved.
+        """
+        return self.build(
+            replace(params, input_path=str(input_path)),
+            info,
+            reserve=True,
+            resume=resume,
+        )
@@ -1,69 +1,646 @@
-import subprocess
+import json
+import math
+import os
 import re
+import shutil
+import subprocess
+import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from core.progress import PROGRESS_ARGS, FFmpegProgress, ProgressParser
+from core.remux import audio_fits
+from core.resources import ResourceGovernor
+from core.video_utils import get_video_info
+
+
+def with_progress_args(cmd):
+    """
+    Inserts the machine-readable progress options right after the
+    FFmpeg executable, so they apply globally.
+    """
+    if isinstance(cmd, (list, tuple)):
+        return [cmd[0], *PROGRESS_ARGS, *cmd[1:]]
+    executable, sep, rest = cmd.partition(" -i ")
+    return f"{executable} {' '.join(PROGRESS_ARGS)}{sep}{rest}"
+
+
+# Informe de -benchmark al terminar (maxrss en kB en FFmpeg < 6)
+BENCH_TIMES = re.compile(r"utime=([\d.]+)s stime=([\d.]+)s")
+BENCH_MAXRSS = re.compile(r"maxrss=(\d+)(?:KiB|kB)")
+
+
+@dataclass
+class RunStats:
+    """
+    What a conversion cost. CPU times and peak memory are those of the
+    FFmpeg processes only, as their -benchmark report gives them (None
+    if they did not write it, e.g. when cancelled).
+    """
 
-from ui.components import video_duration_value, progress_bar, status_text
+    wall_time: float = 0.0
+    user_time: Optional[float] = None
+    sys_time: Optional[float] = None
+    max_rss: Optional[int] = None  # bytes
+    frames: int = 0
+    out_time: float = 0.0  # segundos de video procesados
+    min_speed: Optional[float] = None
 
-from core.video_utils import format_duration, seconds, list_seconds
+    # Ventana para medir la velocidad instantánea
+    SPEED_WINDOW = 2.0
+
+    def __post_init__(self):
+        self._window = None
+
+    @property
+    def avg_speed(self) -> Optional[float]:
+        if self.wall_time <= 0 or self.out_time <= 0:
+            return None
+        return self.out_time / self.wall_time
+
+    def observe(self, progress: FFmpegProgress) -> None:
+        """Tracks frames, media time and the slowest speed window."""
+        now = time.monotonic()
+        self.frames = max(self.frames, progress.frame)
+        self.out_time = max(self.out_time, progress.out_time)
+        if self._window is None:
+            self._window = (now, progress.out_time)
+            return
+        started, out_time = self._window
+        if now - started >= self.SPEED_WINDOW:
+            speed = (progress.out_time - out_time) / (now - started)
+            if self.min_speed is None or speed < self.min_speed:
+                self.min_speed = speed
+            self._window = (now, progress.out_time)
+
+    def add_benchmark(self, line: str) -> bool:
+        """
+        Reads one "bench:" line of FFmpeg's -benchmark report (CPU times
+        and peak memory of that process). False for any other line.
+        """
+        if not line.startswith("bench:"):
+            return False
+        times = BENCH_TIMES.search(line)
+        if times:
+            self.user_time = (self.user_time or 0) + float(times.group(1))
+            self.sys_time = (self.sys_time or 0) + float(times.group(2))
+        maxrss = BENCH_MAXRSS.search(line)
+        if maxrss:
+            rss = int(maxrss.group(1)) * 1024
+            self.max_rss = max(self.max_rss or 0, rss)
+        return True
+
+    def add_child(self, child: "RunStats") -> None:
+        if child.user_time is not None:
+            self.user_time = (self.user_time or 0) + child.user_time
+            self.sys_time = (self.sys_time or 0) + child.sys_time
+        if child.max_rss is not None:
+            self.max_rss = max(self.max_rss or 0, child.max_rss)
 
 
 class VideoConverter:
-    def __init__(self):
+    def __init__(self, resources=None, history=None):
+        # ResourcePlan: hilos, niceness, afinidad y prioridad de E/S
+        self.resources = resources
+        # JobHistory donde se registra cada conversión (core.history)
+        self.history = history
         self.ffmpeg_process = None
+        self.stderr_tail = deque(maxlen=20)
+        self.cancelled = False
+        self.worker = None
+        self.stats = RunStats()
 
-    def convert_video(self, cmd: str) -> None:
+    def convert_video(self, cmd: list, on_progress=None, info=None) -> int:
+        """
+        Runs FFmpeg until it exits and returns its exit code.
+        ``on_progress`` receives every FFmpegProgress update. What the
+        run cost is left in ``stats`` (and recorded in ``history``, with
+        the input's ``info`` if the caller already probed it).
+        """
+        self.stats = stats = RunStats()
+
+        def observe(progress):
+            stats.observe(progress)
+            if on_progress:
+                on_progress(progress)
+
+        started = time.perf_counter()
+        returncode = self._convert(cmd, observe)
+        stats.wall_time = time.perf_counter() - started
+        if self.history is not None:
+            self.history.record(cmd, stats, returncode, info)
+        return returncode
+
+    def _convert(self, cmd, on_progress=None) -> int:
+        self.cancelled = False
+        popen_kwargs = {}
+        if self.resources is not None:
+            cmd = self.resources.command(cmd)
+        argv = with_progress_args(cmd)
+        if self.resources is not None:
+            argv = [*self.resources.launcher(), *argv]
+            popen_kwargs = self.resources.popen_kwargs()
         self.ffmpeg_process = subprocess.Popen(
-            cmd,
+            argv,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
             bufsize=1,
+            **popen_kwargs,
         )
-        self.monitor_process()
+        if self.resources is not None:
+            self.resources.after_start(self.ffmpeg_process)
+        stderr_reader = threading.Thread(target=self.drain_stderr, daemon=True)
+        stderr_reader.start()
+        self.monitor_process(on_progress)
+        stderr_reader.join()  # stderr_tail completo al terminar
+        return self.ffmpeg_process.returncode
 
-    def monitor_process(self) -> None:
-        """Monitor the FFmpeg process and display progress."""
-        progress_pattern = re.compile(
-            r"frame=\s*(\d+).*?fps=\s*([\d\.]+).*?time=\s*(\d+:\d+:\d+\.\d+).*?speed=\s*([\d\.]+)x"
-        )
+    def start(
+        self, cmd: list, on_progress=None, on_finish=None, info=None
+    ) -> threading.Thread:
+        """
+        Runs the conversion in a worker thread so the caller (the UI
+        event loop) is never blocked. ``on_finish`` receives the exit code,
+        -1 if FFmpeg could not be run (the error is left in stderr_tail).
+        """
 
-        while True:
-            line = self.ffmpeg_process.stderr.readline()
-            if not line:
-                if self.ffmpeg_process.poll() is not None:
-                    break
-                time.sleep(0.1)
-                continue
-            line = line.strip()
+        def run():
+            returncode = -1
+            try:
+                returncode = self.convert_video(cmd, on_progress, info)
+            except Exception as e:
+                # Sin esto el hilo muere y la UI queda esperando
+                self.stderr_tail.append(str(e))
+            finally:
+                if on_finish:
+                    on_finish(returncode)
 
-            # Show errors
-            if "Error" in line or "Invalid" in line or "failed" in line.lower():
-                print(f"[bold red]Error:[/bold red] {line}")
+        self.worker = threading.Thread(target=run, daemon=True)
+        self.worker.start()
+        return self.worker
 
-            # Match progress line
-            match = progress_pattern.search(line)
-            if match:
-                frame, fps, timestamp, speed = match.groups()
+    def is_running(self) -> bool:
+        return self.worker is not None and self.worker.is_alive()
 
-                total_time = seconds(video_duration_value.value)
-                current_time = list_seconds(timestamp.replace(":", " ").split())
+    def drain_stderr(self) -> None:
+        """Keep the last stderr lines and show errors without blocking FFmpeg."""
+        self.stderr_tail.clear()
+        for line in self.ffmpeg_process.stderr:
+            line = line.strip()
+            if not line or self.stats.add_benchmark(line):
+                continue  # el informe de -benchmark no es un error
+            self.stderr_tail.append(line)
+            if (
+                "Error" in line
+                or "Invalid" in line
+                or "failed" in line.lower()
+            ):
+                print(f"[bold red]Error:[/bold red] {line}")
 
-                progress_bar.value = current_time / total_time if total_time > 0 else 0
-                progress_bar.update()
+    def monitor_process(self, on_progress=None) -> None:
+        """Monitor the FFmpeg process and report progress."""
+        parser = ProgressParser()
 
-                status_text.value = f"""
-                Converting...({current_time / total_time * 100:.2f} %)\n
-                {format_duration(current_time)} / {format_duration(total_time)}\n
-                Processed Frames: {frame}\n
-                Processing speed: {fps} FPS  ({speed}x)
-                """
-                status_text.update()
+        # Lectura bloqueante: cada línea llega tal como FFmpeg la emite
+        for line in self.ffmpeg_process.stdout:
+            progress = parser.feed(line)
+            if progress is not None and on_progress:
+                on_progress(progress)
+
+        self.ffmpeg_process.wait()
 
     def cancel_conversion(self) -> None:
         if self.ffmpeg_process and self.ffmpeg_process.poll() is None:
+            self.cancelled = True
             self.ffmpeg_process.terminate()
             return True
         return False
 
     def wait(self) -> None:
-        self.ffmpeg_process.wait()
+        if self.worker is not None:
+            self.worker.join()
+        elif self.ffmpeg_process is not None:
+            self.ffmpeg_process.wait()
+
+
+# Opciones de audio de salida (con su valor) que el mux final respeta
+AUDIO_OPTIONS = {"-c:a", "-acodec", "-b:a", "-ar", "-ac", "-q:a", "-af"}
+
+
+def concat_audio_args(output_args, info: dict, output_path) -> list:
+    """
+    Audio options of the final mux of a segmented conversion: the
+    command's own, a copy if the source audio fits the container, or
+    none, so FFmpeg uses the container's default encoder as a serial run
+    would (aac cannot be copied into webm).
+    """
+    own = []
+    for option, value in zip(output_args, output_args[1:]):
+        if option in AUDIO_OPTIONS:
+            own += [option, value]
+    if own or "-an" in output_args:
+        return own
+    container = Path(output_path).suffix.lstrip(".").lower()
+    if "-f" in output_args:
+        container = output_args[output_args.index("-f") + 1]
+    audio_codec = (info or {}).get("audio_codec")
+    if audio_codec and audio_fits(audio_codec, container):
+        return ["-c:a", "copy"]
+    return []
+
+
+def split_command(cmd):
+    """
+    Splits a single-input, single-output FFmpeg command into
+    (ffmpeg, input_args, input_path, output_args, output_path).
+    """
+    args = cmd.split() if isinstance(cmd, str) else list(cmd)
+    i = args.index("-i")
+    return args[0], args[1:i], args[i + 1], args[i + 2 : -1], args[-1]
+
+
+def segmentable(cmd) -> bool:
+    """
+    True if ParallelVideoConverter can run the command: one input with
+    no time trimming and a single output. minterpolate is left out: it
+    would leave a seam at every cut (see core.interpolation).
+    """
+    args = cmd.split() if isinstance(cmd, str) else list(cmd)
+    return (
+        args.count("-i") == 1
+        and "-map" not in args
+        and "-ss" not in args
+        and "-t" not in args
+        and not any("minterpolate" in str(arg) for arg in args)
+    )
+
+
+def plan_segments(
+    keyframes: list, total_duration: float, segments: int
+) -> list:
+    """
+    Chooses up to ``segments - 1`` cut points, each one the keyframe
+    closest to an even split of the total duration.
+    """
+    candidates = [k for k in keyframes if 0 < k < total_duration]
+    cuts = []
+    for n in range(1, segments):
+        if not candidates:
+            break
+        target = total_duration * n / segments
+        cut = min(candidates, key=lambda k: abs(k - target))
+        if cut not in cuts:
+            cuts.append(cut)
+    return sorted(cuts)
+
+
+class SegmentJournal:
+    """
+    Records the finished segments of a resumable conversion in
+    ``<output>.journal.json``; the segments live in ``<output>.parts``.
+
+    The journal is only reused when the input file (path, size, mtime)
+    and the FFmpeg options match the ones it was written for.
+    """
+
+    def __init__(self, output_path, identity: dict):
+        self.path = Path(f"{output_path}.journal.json")
+        self.work_dir = Path(f"{output_path}.parts")
+        self.identity = identity
+        self.cuts = []
+        self.split = False
+        self.done = {}  # índice del segmento -> frames codificados
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("identity") != self.identity:
+            return False
+        self.cuts = data.get("cuts", [])
+        self.split = data.get("split", False)
+        self.done = {int(n): frames for n, frames in data["done"].items()}
+        return True
+
+    def reset(self, cuts: list) -> None:
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.work_dir.mkdir(parents=True)
+        self.cuts, self.split, self.done = cuts, False, {}
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "identity": self.identity,
+                "cuts": self.cuts,
+                "split": self.split,
+                "done": self.done,
+            }
+            # Escritura atómica: un corte a mitad no deja un diario roto
+            temp = self.path.with_name(self.path.name + ".tmp")
+            temp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(temp, self.path)
+
+    def mark_done(self, segment: int, frames: int) -> None:
+        with self._lock:
+            self.done[segment] = frames
+        self.save()
+
+    def remove(self) -> None:
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.path.unlink(missing_ok=True)
+
+
+def input_identity(input_path, input_args, output_args) -> dict:
+    stat = os.stat(input_path)
+    return {
+        "input": str(Path(input_path).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "input_args": list(input_args),
+        "output_args": list(output_args),
+    }
+
+
+class ParallelVideoConverter(VideoConverter):
+    """
+    Encodes a video as keyframe-aligned segments in parallel FFmpeg
+    processes and joins them with the concat demuxer (no re-encoding).
+
+    The audio is not split: it is copied from the source when joining.
+    Each segment encode borrows a slot from ``governor``, so the
+    concurrent encodes run on separate cores.
+
+    With ``resumable`` the segments are kept next to the output with a
+    SegmentJournal (at least one every CHECKPOINT_SECONDS of video), and
+    a cancelled or interrupted conversion continues from the finished
+    segments the next time the same command runs.
+    """
+
+    CHECKPOINT_SECONDS = 60
+
+    def __init__(
+        self,
+        workers: int = None,
+        segments: int = None,
+        governor=None,
+        resumable: bool = False,
+        history=None,
+    ):
+        super().__init__(history=history)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.segments = max(1, segments or self.workers)
+        self.governor = governor or ResourceGovernor(self.workers)
+        self.resumable = resumable
+        self.resumed_segments = 0
+        self._children = []
+        self._lock = threading.Lock()
+
+    def _convert(self, cmd, on_progress=None) -> int:
+        self.cancelled = False
+        ffmpeg, input_args, input_path, output_args, output_path = (
+            split_command(cmd)
+        )
+        output_path = Path(output_path)
+
+        info = get_video_info(input_path)
+        if not isinstance(info, dict):
+            self.stderr_tail.append(info)
+            return 1
+        total_duration = info["duration_seconds"]
+
+        journal = None
+        if self.resumable:
+            journal = SegmentJournal(
+                output_path,
+                input_identity(input_path, input_args, output_args),
+            )
+        if journal is not None and journal.load():
+            cuts = journal.cuts
+        else:
+            segments = self.segments
+            if self.resumable:
+                segments = max(
+                    segments,
+                    math.ceil(total_duration / self.CHECKPOINT_SECONDS),
+                )
+            from core.keyframe_index import get_keyframe_index
+
+            cuts = plan_segments(
+                get_keyframe_index(input_path).keyframes,
+                total_duration,
+                segments,
+            )
+            if journal is not None:
+                journal.reset(cuts)
+
+        if journal is not None:
+            work_dir = journal.work_dir
+        else:
+            work_dir = Path(
+                tempfile.mkdtemp(prefix=".segments_", dir=output_path.parent)
+            )
+        returncode = 1
+        try:
+            # 1. Cortar el video en los keyframes elegidos (sin recodificar)
+            if journal is None or not journal.split:
+                split_cmd = [
+                    ffmpeg,
+                    *input_args,
+                    "-i",
+                    input_path,
+                    "-map",
+                    "0:v:0",
+                ]
+                split_cmd += [
+                    "-c",
+                    "copy",
+                    "-f",
+                    "segment",
+                    "-reset_timestamps",
+                    "1",
+                ]
+                if cuts:
+                    split_cmd += [
+                        "-segment_times",
+                        ",".join(f"{c:.6f}" for c in cuts),
+                    ]
+                split_cmd += ["-y", str(work_dir / "source_%04d.mkv")]
+                returncode = self._run_child(split_cmd)
+                if returncode != 0:
+                    return returncode
+                if journal is not None:
+                    journal.split = True
+                    journal.save()
+            sources = sorted(work_dir.glob("source_*.mkv"))
+
+            bounds = [0.0, *cuts, total_duration]
+            durations = [end - start for start, end in zip(bounds, bounds[1:])]
+
+            # 2. Codificar los segmentos en paralelo
+            encoded = [
+                work_dir / f"encoded_{n:04d}{output_path.suffix}"
+                for n in range(len(sources))
+            ]
+            latest = [FFmpegProgress() for _ in sources]
+            pending = list(range(len(sources)))
+            if journal is not None:
+                # Lo ya terminado cuenta como progreso desde el inicio
+                for n, frames in journal.done.items():
+                    if n < len(sources) and encoded[n].exists():
+                        latest[n] = FFmpegProgress(
+                            frame=frames,
+                            out_time_us=int(durations[n] * 1_000_000),
+                        )
+                        pending.remove(n)
+                self.resumed_segments = len(sources) - len(pending)
+                if on_progress and self.resumed_segments:
+                    on_progress(self._aggregate(latest))
+
+            def encode(n):
+                def on_segment_progress(progress):
+                    with self._lock:
+                        latest[n] = progress
+                        total = self._aggregate(latest)
+                    if on_progress:
+                        on_progress(total)
+
+                segment_cmd = [
+                    ffmpeg,
+                    "-i",
+                    str(sources[n]),
+                    *output_args,
+                    "-an",
+                    "-y",
+                    str(encoded[n]),
+                ]
+                with self.governor.slot() as resources:
+                    returncode = self._run_child(
+                        segment_cmd, on_segment_progress, resources
+                    )
+                if returncode == 0 and journal is not None:
+                    journal.mark_done(n, latest[n].frame)
+                return returncode
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(encode, pending))
+            returncode = next((r for r in results if r != 0), 0)
+            if returncode != 0 or self.cancelled:
+                return returncode
+
+            # 3. Unir los segmentos con el demuxer concat y añadir el audio
+            returncode = self._concat(
+                ffmpeg,
+                encoded,
+                work_dir,
+                input_args,
+                input_path,
+                output_args,
+                output_path,
+                info,
+            )
+            if returncode == 0 and on_progress:
+                done = self._aggregate(latest)
+                done.out_time_us = int(sum(durations) * 1_000_000)
+                done.finished = True
+                on_progress(done)
+            return returncode
+        finally:
+            if journal is None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            elif returncode == 0 and not self.cancelled:
+                journal.remove()
+
+    def _concat(
+        self,
+        ffmpeg,
+        encoded: list,
+        work_dir: Path,
+        input_args,
+        input_path,
+        output_args,
+        output_path,
+        info: dict,
+    ) -> int:
+        """
+        Joins the encoded parts (concat demuxer) and adds the source
+        audio (see concat_audio_args).
+        """
+        concat_list = work_dir / "segments.txt"
+        concat_list.write_text(
+            "".join(f"file '{path.as_posix()}'\n" for path in encoded),
+            encoding="utf-8",
+        )
+        concat_cmd = [
+            ffmpeg,
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(concat_list),
+        ]
+        concat_cmd += [*input_args, "-i", input_path, "-map", "0:v"]
+        if "-an" not in output_args:
+            concat_cmd += ["-map", "1:a?"]
+        if "-f" in output_args:
+            concat_cmd += output_args[
+                output_args.index("-f") : output_args.index("-f") + 2
+            ]
+        concat_cmd += [
+            "-c:v",
+            "copy",
+            *concat_audio_args(output_args, info, output_path),
+            "-y",
+            str(output_path),
+        ]
+        return self._run_child(concat_cmd)
+
+    def _run_child(self, cmd, on_progress=None, resources=None) -> int:
+        if self.cancelled:
+            return 1
+        child = VideoConverter(resources)
+        with self._lock:
+            self._children.append(child)
+        try:
+            returncode = child.convert_video(cmd, on_progress)
+        finally:
+            with self._lock:
+                self._children.remove(child)
+                self.stats.add_child(child.stats)
+        if returncode != 0:
+            self.stderr_tail.extend(child.stderr_tail)
+        return returncode
+
+    @staticmethod
+    def _aggregate(latest: list) -> FFmpegProgress:
+        """Sums the progress of every segment into a single record."""
+        speeds = [p.speed for p in latest if p.speed]
+        bitrates = [p.bitrate for p in latest if p.bitrate]
+        return FFmpegProgress(
+            frame=sum(p.frame for p in latest),
+            fps=sum(p.fps for p in latest),
+            bitrate=sum(bitrates) / len(bitrates) if bitrates else None,
+            total_size=sum(p.total_size for p in latest),
+            out_time_us=sum(p.out_time_us for p in latest),
+            speed=sum(speeds) if speeds else None,
+        )
+
+    def cancel_conversion(self) -> None:
+        with self._lock:
+            children = list(self._children)
+        if not children:
+            return False
+        self.cancelled = True
+        for child in children:
+            child.cancel_conversion()
+        return True
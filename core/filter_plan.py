@@ -0,0 +1,281 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import Optional
+
+from core.video_utils import parse_frame_rate
+
+# Coste relativo por píxel procesado de cada filtro
+WEIGHTS = {
+    "scale": 1.0,
+    "crop": 0.1,
+    "fps": 0.05,
+    "minterpolate": {"dup": 0.5, "blend": 2.0, "mci": 40.0},
+}
+
+
+@dataclass
+class FilterStep:
+    """One -vf filter of the chain, before ordering."""
+
+    kind: str  # "scale", "fps", "minterpolate" o "crop"
+    text: str
+    values: tuple = ()
+
+
+@dataclass
+class FilterPlan:
+    """
+    The -vf chain in the order chosen and its estimated cost, in pixels
+    processed per source frame (None when it cannot be estimated).
+    """
+
+    filters: list = field(default_factory=list)
+    cost: Optional[float] = None
+    naive_cost: Optional[float] = None
+
+    @property
+    def reordered(self) -> bool:
+        return self.cost is not None and self.cost < self.naive_cost
+
+    def describe(self) -> str:
+        chain = " → ".join(self.filters)
+        if self.cost is None:
+            return chain
+        text = f"{chain} ({self.cost / 1e6:.2f} Mpx/frame"
+        if self.reordered:
+            text += f", instead of {self.naive_cost / 1e6:.2f}"
+        return text + ")"
+
+
+def _int(text) -> Optional[int]:
+    try:
+        return int(float(text))
+    except (TypeError, ValueError):
+        return None
+
+
+def _fps(text) -> Optional[float]:
+    try:
+        return parse_frame_rate(str(text))
+    except ValueError:
+        return None
+
+
+def scale_size(width: int, height: int, target: tuple) -> Optional[tuple]:
+    """Output size of scale=W:H, with FFmpeg's -1/-2 rules."""
+    out_width, out_height = (_int(n) for n in target)
+    if out_width is None or out_height is None:
+        return None
+    if out_width < 0 and out_height < 0:
+        return width, height
+    if out_width < 0:
+        factor = -out_width
+        out_width = round(out_height * width / (height * factor)) * factor
+    elif out_height < 0:
+        factor = -out_height
+        out_height = round(out_width * height / (width * factor)) * factor
+    return out_width or width, out_height or height
+
+
+def crop_rect(width: int, height: int, crop: str) -> Optional[tuple]:
+    """(w, h, x, y) of crop=w:h[:x:y] on a width x height frame."""
+    parts = [_int(part) for part in crop.split(":")]
+    if len(parts) not in (2, 4) or None in parts:
+        return None
+    crop_width, crop_height = min(parts[0], width), min(parts[1], height)
+    if len(parts) == 4:
+        x, y = parts[2], parts[3]
+    else:
+        x, y = (width - crop_width) // 2, (height - crop_height) // 2
+    return crop_width, crop_height, x, y
+
+
+def _steps(params, info) -> list:
+    """Filters selected by the parameters, in the classic order."""
+    steps = []
+    if params.width and params.height and not params.renditions:
+        steps.append(
+            FilterStep(
+                "scale",
+                f"scale={params.width}:{params.height}",
+                (params.width, params.height),
+            )
+        )
+    if params.frame_rate:
+        try:
+            source_rate = parse_frame_rate(info.get("frame_rate", ""))
+        except ValueError:
+            source_rate = None  # sin probe: no se puede interpolar
+        if source_rate and float(params.frame_rate) > source_rate:
+            interpolation = [f"minterpolate=fps={params.frame_rate}"]
+            mode = "dup"
+            if params.mi_mode:
+                mode = params.mi_mode
+                interpolation.append(f"mi_mode={params.mi_mode}")
+                if params.mi_mode == "mci":
+                    if params.mc_mode:
+                        interpolation.append(f"mc_mode={params.mc_mode}")
+                    if params.me_mode:
+                        interpolation.append(f"me_mode={params.me_mode}")
+            steps.append(
+                FilterStep(
+                    "minterpolate",
+                    ":".join(interpolation),
+                    (float(params.frame_rate), mode),
+                )
+            )
+        else:
+            steps.append(
+                FilterStep(
+                    "fps",
+                    f"fps={params.frame_rate}",
+                    (_fps(params.frame_rate),),
+                )
+            )
+    if params.crop:
+        steps.append(FilterStep("crop", f"crop={params.crop}", (params.crop,)))
+    return steps
+
+
+def _chain(order: list, naive: list, source: tuple):
+    """
+    Concrete filters and cost for ``order``. A crop moved in front of a
+    scale is rewritten in source coordinates and the scale then targets
+    the crop size, so the output is the same picture. Returns None if
+    the order cannot keep the output identical.
+    """
+    width, height, rate = source
+    kinds = [step.kind for step in order]
+    rewrite = (
+        "crop" in kinds
+        and "scale" in kinds
+        and kinds.index("crop") < kinds.index("scale")
+    )
+    scaled_box = source_box = None
+    if rewrite:
+        # Recorte pedido sobre el cuadro ya escalado
+        scale_step = next(s for s in naive if s.kind == "scale")
+        crop_step = next(s for s in naive if s.kind == "crop")
+        scaled = scale_size(width, height, scale_step.values)
+        if scaled is None:
+            return None
+        scaled_box = crop_rect(*scaled, crop_step.values[0])
+        if scaled_box is None:
+            return None
+        # El mismo rectángulo en coordenadas del origen
+        sx, sy = width / scaled[0], height / scaled[1]
+        crop_width, crop_height, x, y = scaled_box
+        source_box = (
+            round(crop_width * sx),
+            round(crop_height * sy),
+            round(x * sx),
+            round(y * sy),
+        )
+
+    filters = []
+    cost = 0.0
+    frames = 1.0  # fotogramas procesados por fotograma de origen
+    for step in order:
+        pixels = width * height
+        if step.kind == "scale":
+            if scaled_box is not None:
+                size = scaled_box[:2]
+                filters.append(f"scale={size[0]}:{size[1]}")
+            else:
+                size = scale_size(width, height, step.values)
+                if size is None:
+                    return None
+                filters.append(step.text)
+            cost += frames * max(pixels, size[0] * size[1]) * WEIGHTS["scale"]
+            width, height = size
+        elif step.kind == "crop":
+            if source_box is not None:
+                box = source_box
+                filters.append("crop={}:{}:{}:{}".format(*box))
+            else:
+                box = crop_rect(width, height, step.values[0])
+                if box is None:
+                    return None
+                filters.append(step.text)
+            width, height = box[:2]
+            cost += frames * width * height * WEIGHTS["crop"]
+        elif step.kind == "fps":
+            target = step.values[0]
+            if target is None or not rate:
+                return None
+            cost += frames * pixels * WEIGHTS["fps"]
+            frames *= target / rate
+            rate = target
+            filters.append(step.text)
+        else:
+            target, mode = step.values
+            frames *= target / rate
+            rate = target
+            weight = WEIGHTS["minterpolate"].get(mode, 1.0)
+            cost += frames * pixels * weight
+            filters.append(step.text)
+    return filters, cost, (width, height)
+
+
+def _allowed(order: list, naive: list) -> bool:
+    """
+    False for orders that would change what minterpolate sees: it never
+    goes before the scale, and with mi_mode=mci neither the scale nor
+    the crop may cross it (the motion search and the scene detection
+    work on the whole picture). dup and blend work pixel by pixel.
+    """
+    kinds = [step.kind for step in order]
+    if "minterpolate" not in kinds:
+        return True
+    position = kinds.index("minterpolate")
+    if "scale" in kinds and position < kinds.index("scale"):
+        return False
+    if order[position].values[1] != "mci":
+        return True
+    naive_kinds = [step.kind for step in naive]
+    naive_position = naive_kinds.index("minterpolate")
+    return all(
+        (kinds.index(kind) < position)
+        == (naive_kinds.index(kind) < naive_position)
+        for kind in ("scale", "crop")
+        if kind in kinds
+    )
+
+
+def plan_filters(params, info: dict) -> FilterPlan:
+    """
+    Orders the -vf chain by estimated pixel cost.
+
+    fps only drops or repeats frames, so it can go anywhere: lowering
+    the rate first saves work in every later filter. A crop can go
+    before the scale (see _chain), so the scale only sees the kept
+    area. minterpolate stays after the scale, so the interpolation
+    keeps the resolution it had; in dup or blend mode it can go after
+    the crop, but mci keeps its place (see _allowed). Without a
+    known source size, or with expressions that cannot be evaluated,
+    the classic order scale → fps/minterpolate → crop is kept.
+    """
+    naive = _steps(params, info)
+    filters = [step.text for step in naive]
+    try:
+        width, height = (
+            int(n) for n in str(info.get("resolution", "")).split("x")
+        )
+        rate = parse_frame_rate(info.get("frame_rate", ""))
+    except ValueError:
+        return FilterPlan(filters)
+    source = (width, height, rate)
+    planned = _chain(naive, naive, source)
+    if planned is None:
+        return FilterPlan(filters)
+    best_filters, best_cost, size = planned
+    naive_cost = best_cost
+    for order in itertools.permutations(naive):
+        if not _allowed(list(order), naive):
+            continue
+        candidate = _chain(list(order), naive, source)
+        if candidate is None or candidate[2] != size:
+            continue
+        if candidate[1] < best_cost:
+            best_filters, best_cost = candidate[0], candidate[1]
+    return FilterPlan(best_filters, best_cost, naive_cost)
@@ -0,0 +1,308 @@
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Optional
+
+from core.probe_cache import CACHE_PATH, file_key
+from core.video_utils import get_video_info
+
+HISTORY_PATH = os.path.join(os.path.dirname(CACHE_PATH), "job_history.sqlite")
+# Columnas por las que se pueden agrupar los resúmenes
+GROUPS = ("encoder", "preset", "resolution", "codec")
+
+
+@dataclass
+class JobRecord:
+    """One finished conversion."""
+
+    finished_at: float
+    input_path: str
+    input_size: int
+    input_mtime_ns: int
+    codec: str
+    resolution: str
+    duration: float
+    info: dict
+    argv: list
+    encoder: str
+    preset: str
+    wall_time: float
+    user_time: Optional[float]
+    sys_time: Optional[float]
+    max_rss: Optional[int]
+    avg_speed: Optional[float]
+    min_speed: Optional[float]
+    frames: int
+    output_size: int
+    returncode: int
+    id: Optional[int] = None
+
+    @property
+    def fps(self) -> Optional[float]:
+        if not self.frames or self.wall_time <= 0:
+            return None
+        return self.frames / self.wall_time
+
+    @property
+    def cpu_time(self) -> Optional[float]:
+        if self.user_time is None:
+            return None
+        return self.user_time + (self.sys_time or 0)
+
+
+COLUMNS = [f.name for f in fields(JobRecord) if f.name != "id"]
+
+
+def option_value(argv: list, *names: str) -> str:
+    """Value of the last of ``names`` in argv ("" if absent)."""
+    value = ""
+    for n, arg in enumerate(argv[:-1]):
+        if arg in names:
+            value = str(argv[n + 1])
+    return value
+
+
+def output_size(argv: list) -> int:
+    """Total size of the files the command wrote."""
+    args = [str(arg) for arg in argv]
+    first_output = args.index("-i") + 2 if "-i" in args else len(args)
+    inputs = {args[n + 1] for n, arg in enumerate(args[:-1]) if arg == "-i"}
+    size = 0
+    for arg in set(args[first_output:]) - inputs:
+        if arg.startswith("-"):
+            continue
+        try:
+            if os.path.isfile(arg):
+                size += os.path.getsize(arg)
+        except (OSError, ValueError):
+            continue
+    return size
+
+
+def make_record(argv, stats, returncode: int, info=None) -> JobRecord:
+    """Builds the record of a run from its command and RunStats."""
+    argv = [str(arg) for arg in argv]
+    input_path = option_value(argv, "-i")
+    key = file_key(input_path) or (input_path, 0, 0)
+    if info is None:
+        info = get_video_info(input_path) if key[1] else None
+    if not isinstance(info, dict):
+        info = {}
+    encoder = option_value(argv, "-c:v", "-vcodec")
+    if not encoder and option_value(argv, "-c") == "copy":
+        encoder = "copy"
+    return JobRecord(
+        finished_at=time.time(),
+        input_path=key[0],
+        input_size=key[1],
+        input_mtime_ns=key[2],
+        codec=info.get("codec", ""),
+        resolution=info.get("resolution", ""),
+        duration=info.get("duration_seconds") or 0.0,
+        info=info,
+        argv=argv,
+        encoder=encoder or "default",
+        preset=option_value(argv, "-preset"),
+        wall_time=stats.wall_time,
+        user_time=stats.user_time,
+        sys_time=stats.sys_time,
+        max_rss=stats.max_rss,
+        avg_speed=stats.avg_speed,
+        min_speed=stats.min_speed,
+        frames=stats.frames,
+        output_size=output_size(argv),
+        returncode=returncode,
+    )
+
+
+class JobHistory:
+    """
+    Local record of every finished conversion (sqlite), for throughput
+    analysis: what each job cost in time, CPU and memory, and how fast
+    it ran. ``summary`` groups jobs (e.g. by encoder, preset and input
+    resolution) and ``trend`` compares recent jobs with older ones to
+    spot a machine that got slower.
+    """
+
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute(f"""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    {", ".join(COLUMNS)}
+                )
+                """)
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_group "
+                "ON jobs (encoder, preset, resolution)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_time ON jobs (finished_at)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def add(self, record: JobRecord) -> None:
+        values = [getattr(record, name) for name in COLUMNS]
+        values[COLUMNS.index("info")] = json.dumps(record.info)
+        values[COLUMNS.index("argv")] = json.dumps(record.argv)
+        try:
+            with self._lock, self._connect() as db:
+                db.execute(
+                    f"INSERT INTO jobs ({', '.join(COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                    values,
+                )
+        except sqlite3.Error:
+            pass  # el historial nunca debe romper una conversión
+
+    def record(self, argv, stats, returncode: int, info=None) -> None:
+        """Records a run of VideoConverter (see RunStats)."""
+        self.add(make_record(argv, stats, returncode, info))
+
+    def query(
+        self,
+        encoder: str = None,
+        preset: str = None,
+        resolution: str = None,
+        codec: str = None,
+        input_path=None,
+        since: float = None,
+        until: float = None,
+        successful: bool = True,
+        limit: int = None,
+    ) -> list:
+        """Records matching every given filter, oldest first."""
+        where, values = [], []
+        for column, value in (
+            ("encoder", encoder),
+            ("preset", preset),
+            ("resolution", resolution),
+            ("codec", codec),
+        ):
+            if value is not None:
+                where.append(f"{column} = ?")
+                values.append(value)
+        if input_path is not None:
+            where.append("input_path = ?")
+            values.append(str(Path(input_path).resolve()))
+        if since is not None:
+            where.append("finished_at >= ?")
+            values.append(since)
+        if until is not None:
+            where.append("finished_at < ?")
+            values.append(until)
+        if successful:
+            where.append("returncode = 0")
+        sql = f"SELECT id, {', '.join(COLUMNS)} FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY finished_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock, self._connect() as db:
+            rows = db.execute(sql, values).fetchall()
+        records = []
+        for row in reversed(rows):
+            data = dict(zip(COLUMNS, row[1:]))
+            data["info"] = json.loads(data["info"])
+            data["argv"] = json.loads(data["argv"])
+            records.append(JobRecord(id=row[0], **data))
+        return records
+
+    def summary(self, group_by=("encoder", "preset", "resolution"), **filters):
+        """
+        One row per group with the number of jobs and the median fps,
+        speed, CPU seconds per frame and peak memory.
+        """
+        unknown = set(group_by) - set(GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown groups: {', '.join(sorted(unknown))}")
+        groups = {}
+        for record in self.query(**filters):
+            key = tuple(getattr(record, name) for name in group_by)
+            groups.setdefault(key, []).append(record)
+        rows = []
+        for key, records in sorted(groups.items()):
+            rows.append(
+                {
+                    **dict(zip(group_by, key)),
+                    "jobs": len(records),
+                    "median_fps": _median(r.fps for r in records),
+                    "median_speed": _median(r.avg_speed for r in records),
+                    "cpu_per_frame": _median(
+                        r.cpu_time / r.frames
+                        for r in records
+                        if r.cpu_time is not None and r.frames
+                    ),
+                    "max_rss": max(
+                        (r.max_rss for r in records if r.max_rss), default=None
+                    ),
+                }
+            )
+        return rows
+
+    def trend(
+        self,
+        group_by=("encoder", "preset", "resolution"),
+        recent: int = 10,
+        **filters,
+    ) -> list:
+        """
+        Per group, the median fps of the last ``recent`` jobs relative to
+        the jobs before them (ratio < 1: throughput went down). Groups
+        without older jobs to compare with are left out.
+        """
+        groups = {}
+        for record in self.query(**filters):
+            key = tuple(getattr(record, name) for name in group_by)
+            groups.setdefault(key, []).append(record)
+        rows = []
+        for key, records in sorted(groups.items()):
+            before = _median(r.fps for r in records[:-recent])
+            after = _median(r.fps for r in records[-recent:])
+            if not before or not after:
+                continue
+            rows.append(
+                {
+                    **dict(zip(group_by, key)),
+                    "baseline_fps": before,
+                    "recent_fps": after,
+                    "ratio": after / before,
+                }
+            )
+        return rows
+
+
+def _median(values) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+_history = None
+
+
+def get_job_history():
+    """Returns the shared history, or None if the database is unavailable."""
+    global _history
+    if _history is None:
+        try:
+            _history = JobHistory()
+        except sqlite3.Error:
+            return None
+    return _history
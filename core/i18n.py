@@ -18,9 +18,12 @@ def load_config():
 
 
 def save_config(theme, language):
+    # Conservar el resto de opciones (p. ej. progress_rate_hz)
+    config = load_config()
+    config.update({"theme": theme, "language": language})
     try:
         with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-            json.dump({"theme": theme, "language": language}, f)
+            json.dump(config, f)
     except Exception:
         pass
 
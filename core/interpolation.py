@@ -0,0 +1,388 @@
+import math
+import re
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fractions import Fraction
+from pathlib import Path
+from typing import Optional
+
+from core.ffmpeg_wrapper import ParallelVideoConverter, split_command
+from core.progress import FFmpegProgress
+from core.video_utils import get_video_info
+
+MINTERPOLATE_FPS = re.compile(r"minterpolate=(?:fps=)?([^:,]+)")
+# minterpolate usa 2 fotogramas a cada lado, pero la búsqueda EPZS parte
+# de los vectores del fotograma anterior: con 4-8 de margen aún quedaban
+# fotogramas distintos en algunos cortes, con 16 ninguno
+OVERLAP = 16
+
+
+@dataclass
+class Chunk:
+    """
+    A run of serial output frames made by one process, which decodes
+    ``before`` and ``after`` extra source frames around them so the
+    interpolation at its edges sees the same neighbours as a serial run.
+    """
+
+    first: int  # primer fotograma de salida que aporta
+    count: Optional[int]  # None: hasta el final del video
+    before: int = 0
+    after: int = 0
+
+
+@dataclass
+class InterpolationCheck:
+    """Frame hashes of the serial run against the chunked one."""
+
+    serial_frames: int
+    parallel_frames: int
+    mismatches: list = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+        return (
+            not self.mismatches and self.serial_frames == self.parallel_frames
+        )
+
+    def describe(self) -> str:
+        if self.identical:
+            return f"{self.serial_frames} frames identical"
+        return (
+            f"{len(self.mismatches)} of {self.serial_frames} frames differ "
+            f"(first at {self.mismatches[0] if self.mismatches else '-'}), "
+            f"{self.parallel_frames} frames in the chunked run"
+        )
+
+
+def interpolation_rate(filters: str) -> Optional[Fraction]:
+    """Output rate of the minterpolate filter in a -vf chain, if any."""
+    match = MINTERPOLATE_FPS.search(filters or "")
+    if not match:
+        return None
+    try:
+        rate = Fraction(match.group(1))
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+def interpolates(cmd) -> bool:
+    """True if the command's -vf chain runs minterpolate."""
+    args = cmd.split() if isinstance(cmd, str) else list(cmd)
+    return any(
+        arg == "-vf" and "minterpolate" in str(value)
+        for arg, value in zip(args, args[1:])
+    )
+
+
+def chunk_grid(source_rate, target_rate, time_base=None) -> int:
+    """
+    Output frames between the frames a chunk can start on.
+
+    minterpolate rounds every output time to the input time base, so a
+    chunk matches the serial run only if its shift is a whole number of
+    ticks: its first frame must fall on a tick (1/12288 at 60 fps: every
+    5 frames). Without the time base, on a source frame (29.97 to 60
+    fps: every 1001 frames).
+    """
+    target_rate = Fraction(target_rate)
+    if time_base:
+        return (target_rate * Fraction(time_base)).numerator
+    return (target_rate / Fraction(source_rate)).numerator
+
+
+def plan_chunks(
+    total_frames: int,
+    source_rate,
+    target_rate,
+    chunks: int,
+    overlap: int = OVERLAP,
+    time_base=None,
+) -> list:
+    """
+    Splits the output of ``total_frames`` source frames into up to
+    ``chunks`` runs that start on the chunk_grid; a single chunk when
+    the grid is coarser than the video.
+    """
+    ratio = Fraction(target_rate) / Fraction(source_rate)
+    outputs = total_frames * ratio
+    grid = chunk_grid(source_rate, target_rate, time_base)
+    cuts = []
+    for n in range(1, chunks):
+        cut = round(outputs * n / chunks / grid) * grid
+        if 0 < cut < outputs and cut not in cuts:
+            cuts.append(cut)
+    bounds = [0, *cuts]
+    planned = []
+    for n, first in enumerate(bounds):
+        last = n == len(bounds) - 1
+        planned.append(
+            Chunk(
+                first=first,
+                count=None if last else bounds[n + 1] - first,
+                before=min(overlap, math.floor(first / ratio)),
+                after=0 if last else overlap,
+            )
+        )
+    return planned
+
+
+def _seconds(value: Fraction) -> str:
+    # Truncado al microsegundo: nunca después del fotograma buscado
+    micros = int(value * 1_000_000)
+    return f"{micros // 1_000_000}.{micros % 1_000_000:06d}"
+
+
+def chunk_args(
+    chunk: Chunk,
+    source_rate: Fraction,
+    target_rate: Fraction,
+    filters: str,
+) -> tuple:
+    """
+    (input options, -vf chain) that interpolate ``chunk``: seek to the
+    first overlap frame, interpolate, then trim the output frames that
+    belong to the overlap.
+
+    minterpolate lays its output frames on a 1/fps grid that starts at
+    the first input timestamp. The chunk's timestamps are shifted so its
+    first output frame falls at 0: the grid is then the serial one, the
+    overlap gets negative times and the trim keeps ``count`` frames
+    (output time base, 1/fps, so the comparison is exact).
+    """
+    source_rate, target_rate = Fraction(source_rate), Fraction(target_rate)
+    ratio = target_rate / source_rate
+    start = math.floor(chunk.first / ratio) - chunk.before
+    input_args = []
+    if start:
+        input_args += ["-ss", _seconds(start / source_rate)]
+    trim = "trim=start_pts=0"
+    if chunk.count is not None:
+        # Un fotograma de más por si el último llega redondeado
+        end = math.ceil((chunk.first + chunk.count) / ratio) + chunk.after
+        input_args += ["-t", _seconds((end - start + 1) / source_rate)]
+        trim += f":end_pts={chunk.count}"
+    # Redondeado a ticks enteros: setpts trunca el resultado
+    offset = chunk.first / target_rate - start / source_rate
+    shift = (
+        f"setpts=PTS-STARTPTS"
+        f"-round({offset.numerator}/{offset.denominator}/TB)"
+    )
+    return input_args, f"{shift},{filters},{trim}"
+
+
+def _filters(output_args: list) -> tuple:
+    """(-vf chain, output options without it)."""
+    n = output_args.index("-vf")
+    return output_args[n + 1], output_args[:n] + output_args[n + 2 :]
+
+
+def _rates(info) -> tuple:
+    if not isinstance(info, dict):
+        raise ValueError(info)
+    try:
+        source_rate = Fraction(info.get("frame_rate", ""))
+    except (ValueError, ZeroDivisionError):
+        raise ValueError("Unknown source frame rate") from None
+    if source_rate <= 0:
+        raise ValueError("Unknown source frame rate")
+    total_frames = round(info["duration_seconds"] * source_rate)
+    return source_rate, total_frames, info.get("time_base") or None
+
+
+class InterpolatingConverter(ParallelVideoConverter):
+    """
+    Runs a command whose -vf chain uses minterpolate as parallel chunks.
+
+    minterpolate is single-threaded, and cutting the video at keyframes
+    (ParallelVideoConverter) would leave a seam at every cut, because
+    the first and last interpolated frames of a segment lack a
+    neighbour. Here every chunk decodes ``overlap`` extra source frames
+    on each side, straight from the input with an accurate seek, and
+    trims the frames they produce, so the joined video has the same
+    frames as a serial run. The motion search seeds each frame with the
+    previous frame's vectors, so this holds once ``overlap`` is long
+    enough for that history to converge; compare_with_serial checks it.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        chunks: int = None,
+        governor=None,
+        overlap: int = OVERLAP,
+        history=None,
+    ):
+        super().__init__(
+            workers=workers,
+            segments=chunks,
+            governor=governor,
+            history=history,
+        )
+        self.overlap = overlap
+
+    def _convert(self, cmd, on_progress=None) -> int:
+        self.cancelled = False
+        ffmpeg, input_args, input_path, output_args, output_path = (
+            split_command(cmd)
+        )
+        output_path = Path(output_path)
+        if not interpolates(output_args):
+            self.stderr_tail.append("No minterpolate in the -vf filters")
+            return 1
+        filters, output_args = _filters(output_args)
+        target_rate = interpolation_rate(filters)
+        info = get_video_info(input_path)
+        try:
+            source_rate, total_frames, time_base = _rates(info)
+        except ValueError as e:
+            self.stderr_tail.append(str(e))
+            return 1
+        if target_rate is None:
+            self.stderr_tail.append("No minterpolate rate in the filters")
+            return 1
+        chunks = plan_chunks(
+            total_frames,
+            source_rate,
+            target_rate,
+            self.segments,
+            self.overlap,
+            time_base,
+        )
+        if len(chunks) < self.segments:
+            grid = chunk_grid(source_rate, target_rate, time_base)
+            self.stderr_tail.append(
+                f"{len(chunks)} of {self.segments} chunks: they can only "
+                f"start every {grid} output frames"
+            )
+
+        work_dir = Path(
+            tempfile.mkdtemp(prefix=".chunks_", dir=output_path.parent)
+        )
+        try:
+            # 1. Interpolar y codificar cada tramo en su propio proceso
+            encoded = [
+                work_dir / f"encoded_{n:04d}{output_path.suffix}"
+                for n in range(len(chunks))
+            ]
+            latest = [FFmpegProgress() for _ in chunks]
+
+            def encode(n):
+                def on_chunk_progress(progress):
+                    with self._lock:
+                        latest[n] = progress
+                        total = self._aggregate(latest)
+                    if on_progress:
+                        on_progress(total)
+
+                seek_args, chain = chunk_args(
+                    chunks[n], source_rate, target_rate, filters
+                )
+                chunk_cmd = [
+                    ffmpeg,
+                    *input_args,
+                    *seek_args,
+                    "-i",
+                    input_path,
+                    *output_args,
+                    "-vf",
+                    chain,
+                    "-an",
+                    "-y",
+                    str(encoded[n]),
+                ]
+                with self.governor.slot() as resources:
+                    return self._run_child(
+                        chunk_cmd, on_chunk_progress, resources
+                    )
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(encode, range(len(chunks))))
+            returncode = next((r for r in results if r != 0), 0)
+            if returncode != 0 or self.cancelled:
+                return returncode
+
+            # 2. Unir los tramos y añadir el audio del origen
+            returncode = self._concat(
+                ffmpeg,
+                encoded,
+                work_dir,
+                input_args,
+                input_path,
+                output_args,
+                output_path,
+                info,
+            )
+            if returncode == 0 and on_progress:
+                done = self._aggregate(latest)
+                done.out_time_us = int(total_frames / source_rate * 1_000_000)
+                done.finished = True
+                on_progress(done)
+            return returncode
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def frame_hashes(argv: list) -> list:
+    """MD5 of every video frame the command's filters produce."""
+    result = subprocess.run(
+        [*argv, "-map", "0:v:0", "-f", "framemd5", "-"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:]
+        raise RuntimeError(f"FFmpeg failed: {' '.join(tail)}")
+    return [
+        line.rsplit(",", 1)[-1].strip()
+        for line in result.stdout.splitlines()
+        if line and not line.startswith("#")
+    ]
+
+
+def compare_with_serial(
+    cmd, chunks: int, overlap: int = OVERLAP, info: dict = None
+) -> InterpolationCheck:
+    """
+    Frame-accurate check of the chunked interpolation: hashes the
+    decoded output of the -vf chain run serially and chunk by chunk (in
+    parallel), before any encoder, and compares them frame by frame.
+    """
+    ffmpeg, input_args, input_path, output_args, _ = split_command(cmd)
+    if not interpolates(output_args):
+        raise ValueError("No minterpolate in the -vf filters")
+    filters, _ = _filters(output_args)
+    target_rate = interpolation_rate(filters)
+    if target_rate is None:
+        raise ValueError("No minterpolate rate in the filters")
+    source_rate, total_frames, time_base = _rates(
+        info or get_video_info(input_path)
+    )
+    planned = plan_chunks(
+        total_frames, source_rate, target_rate, chunks, overlap, time_base
+    )
+
+    serial = [ffmpeg, *input_args, "-i", input_path, "-vf", filters]
+    runs = [serial]
+    for chunk in planned:
+        seek_args, chain = chunk_args(chunk, source_rate, target_rate, filters)
+        runs.append(
+            [ffmpeg, *input_args, *seek_args, "-i", input_path, "-vf", chain]
+        )
+    with ThreadPoolExecutor(max_workers=len(runs)) as pool:
+        serial_hashes, *chunk_hashes = pool.map(frame_hashes, runs)
+    parallel_hashes = [h for hashes in chunk_hashes for h in hashes]
+    mismatches = [
+        n
+        for n, (a, b) in enumerate(zip(serial_hashes, parallel_hashes))
+        if a != b
+    ]
+    return InterpolationCheck(
+        serial_frames=len(serial_hashes),
+        parallel_frames=len(parallel_hashes),
+        mismatches=mismatches,
+    )
@@ -0,0 +1,276 @@
+import bisect
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from core.probe_cache import CACHE_PATH, MAX_ENTRIES, file_key
+from core.video_utils import get_ffmpeg_path, get_keyframes
+
+SCENE_LINE = re.compile(r"pts_time:(\S+)\s+lavfi\.scene_score=(\S+)")
+
+
+class KeyframeIndex:
+    """
+    Keyframe timestamps of a video plus, optionally, the scene-change
+    score of every keyframe (how different it is from the previous one,
+    0 to 1). Timestamps are kept sorted in compact ``array('d')`` buffers.
+    """
+
+    def __init__(self, keyframes, scene_times=None, scene_scores=None):
+        self.keyframes = array("d", sorted(keyframes))
+        self.scene_times = array("d", scene_times or [])
+        self.scene_scores = array("f", scene_scores or [])
+
+    @property
+    def has_scenes(self) -> bool:
+        return len(self.scene_times) > 0
+
+    def before(self, timestamp: float) -> float:
+        """Last keyframe at or before ``timestamp`` (0 if there is none)."""
+        index = bisect.bisect_right(self.keyframes, timestamp + 1e-6)
+        return self.keyframes[index - 1] if index > 0 else 0.0
+
+    def after(self, timestamp: float):
+        """First keyframe at or after ``timestamp``, or None."""
+        index = bisect.bisect_left(self.keyframes, timestamp - 1e-6)
+        return self.keyframes[index] if index < len(self.keyframes) else None
+
+    def nearest(self, timestamp: float):
+        """Keyframe closest to ``timestamp``, or None without keyframes."""
+        index = bisect.bisect_left(self.keyframes, timestamp)
+        around = self.keyframes[max(index - 1, 0) : index + 1]
+        if not around:
+            return None
+        return min(around, key=lambda k: abs(k - timestamp))
+
+    def scenes(self, threshold: float = 0.3) -> list:
+        """Timestamps of the keyframes that start a new scene."""
+        return [
+            t
+            for t, score in zip(self.scene_times, self.scene_scores)
+            if score >= threshold
+        ]
+
+    def to_blobs(self) -> tuple:
+        return (
+            self.keyframes.tobytes(),
+            self.scene_times.tobytes(),
+            self.scene_scores.tobytes(),
+        )
+
+    @classmethod
+    def from_blobs(cls, keyframes, scene_times, scene_scores):
+        index = cls([])
+        index.keyframes.frombytes(keyframes)
+        index.scene_times.frombytes(scene_times)
+        index.scene_scores.frombytes(scene_scores)
+        return index
+
+
+def get_scene_scores(video_path) -> tuple:
+    """
+    Returns (timestamps, scores) of the scene-change score of every
+    keyframe. Only keyframes are decoded (-skip_frame nokey), so this is
+    far cheaper than a full decode.
+    """
+    cmd = [
+        str(get_ffmpeg_path()),
+        "-hide_banner",
+        "-nostats",
+        "-skip_frame",
+        "nokey",
+        "-i",
+        str(video_path),
+        "-map",
+        "0:v:0",
+        "-vf",
+        "select='gte(scene,0)',metadata=print:key=lavfi.scene_score:file=-",
+        "-fps_mode",
+        "passthrough",
+        "-f",
+        "null",
+        "-",
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return [], []
+    times, scores = [], []
+    # Cada fotograma ocupa dos líneas: "frame:.. pts_time:.." y el valor
+    for match in SCENE_LINE.finditer(result.stdout):
+        try:
+            times.append(float(match.group(1)))
+            scores.append(float(match.group(2)))
+        except ValueError:
+            continue
+    return times, scores
+
+
+def build_keyframe_index(video_path, scenes: bool = False) -> KeyframeIndex:
+    keyframes = get_keyframes(str(video_path))
+    scene_times, scene_scores = [], []
+    if scenes:
+        scene_times, scene_scores = get_scene_scores(video_path)
+        if not keyframes:
+            # Sin ffprobe: los fotogramas decodificados son los keyframes
+            keyframes = scene_times
+    return KeyframeIndex(keyframes, scene_times, scene_scores)
+
+
+class KeyframeCache:
+    """
+    Keyframe indexes stored next to the probe cache (same database and
+    same key: path, size and mtime), so they survive between sessions.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS keyframes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    keyframes BLOB NOT NULL,
+                    scene_times BLOB NOT NULL,
+                    scene_scores BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, video_path):
+        key = file_key(video_path)
+        if key is None:
+            return None
+        path, size, mtime_ns = key
+        try:
+            with self._lock, self._connect() as db:
+                row = db.execute(
+                    "SELECT size, mtime_ns, keyframes, scene_times, "
+                    "scene_scores FROM keyframes WHERE path = ?",
+                    (path,),
+                ).fetchone()
+                if row is None or row[0] != size or row[1] != mtime_ns:
+                    return None
+                db.execute(
+                    "UPDATE keyframes SET last_access = ? WHERE path = ?",
+                    (time.time(), path),
+                )
+        except sqlite3.Error:
+            return None
+        return KeyframeIndex.from_blobs(*row[2:])
+
+    def put(self, video_path, index: KeyframeIndex) -> None:
+        key = file_key(video_path)
+        if key is None:
+            return
+        try:
+            with self._lock, self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO keyframes "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, *index.to_blobs(), time.time()),
+                )
+                db.execute(
+                    "DELETE FROM keyframes WHERE rowid IN ("
+                    "SELECT rowid FROM keyframes ORDER BY last_access DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error:
+            pass
+
+
+_cache = None
+# Índices en memoria (clave del archivo -> índice), los más recientes
+_memory = OrderedDict()
+# (ruta, scenes) -> lock, para no construir dos veces el mismo índice
+_building = OrderedDict()
+_building_lock = threading.Lock()
+
+
+def get_keyframe_cache():
+    """Returns the shared cache, or None if the database is unavailable."""
+    global _cache
+    if _cache is None:
+        try:
+            _cache = KeyframeCache()
+        except sqlite3.Error:
+            return None
+    return _cache
+
+
+def _usable(index, scenes: bool) -> bool:
+    return index is not None and (index.has_scenes or not scenes)
+
+
+def _remember(key, index: KeyframeIndex) -> KeyframeIndex:
+    """Keeps ``index`` in memory unless a fuller one is already there."""
+    with _building_lock:
+        current = _memory.get(key)
+        if _usable(current, index.has_scenes):
+            index = current
+        _memory[key] = index
+        _memory.move_to_end(key)
+        while len(_memory) > MAX_ENTRIES:
+            _memory.popitem(last=False)
+    return index
+
+
+def _build_lock(path: str, scenes: bool) -> threading.Lock:
+    with _building_lock:
+        lock = _building.setdefault((path, scenes), threading.Lock())
+        _building.move_to_end((path, scenes))
+        # Se descartan los locks más antiguos que nadie está usando
+        for old in list(_building)[: max(0, len(_building) - MAX_ENTRIES)]:
+            if not _building[old].locked():
+                del _building[old]
+        return lock
+
+
+def get_keyframe_index(video_path, scenes: bool = False) -> KeyframeIndex:
+    """
+    Returns the index of a video, from memory, from the cache database or
+    built now. With ``scenes`` an index without scene scores is rebuilt.
+
+    Indexes with and without scenes are built under separate locks, so
+    a caller that only needs keyframes never waits for a scene scan of
+    the same file.
+    """
+    key = file_key(video_path)
+    if key is None:
+        return KeyframeIndex([])
+    with _building_lock:
+        index = _memory.get(key)
+    if _usable(index, scenes):
+        return _remember(key, index)
+    with _build_lock(key[0], scenes):
+        with _building_lock:
+            index = _memory.get(key)
+        if _usable(index, scenes):
+            return _remember(key, index)
+        cache = get_keyframe_cache()
+        if cache is not None:
+            index = cache.get(video_path)
+        if not _usable(index, scenes):
+            index = build_keyframe_index(video_path, scenes)
+            with _building_lock:
+                fuller = _usable(_memory.get(key), True)
+            if cache is not None and not (fuller and not scenes):
+                cache.put(video_path, index)
+        return _remember(key, index)
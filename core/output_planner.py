@@ -0,0 +1,169 @@
+import os
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+
+
+def output_name(base: str, extension: str, n: int) -> str:
+    """video_converted.mp4, video_converted_2.mp4, ..."""
+    return f"{base}.{extension}" if n == 1 else f"{base}_{n}.{extension}"
+
+
+class OutputPlanner:
+    """
+    Chooses free output file names.
+
+    Each directory is listed once and kept as an in-memory index that is
+    only refreshed when the directory's mtime changes, so looking for a
+    free name costs one stat instead of one per candidate.
+
+    ``candidate`` only looks; ``reserve`` claims the name by creating the
+    file with O_EXCL, so concurrent jobs (even in other processes) never
+    get the same name. ``plan_batch`` reserves the names of many outputs
+    in one pass; later ``reserve`` calls for the same base claim them.
+
+    With ``resume`` a name whose resumable conversion was interrupted
+    (it has a ``.journal.json``, see core.ffmpeg_wrapper.SegmentJournal)
+    is given back so the conversion can continue.
+    """
+
+    def __init__(self):
+        self._index = {}  # directorio -> (mtime_ns, nombres)
+        self._reserved = set()
+        # (directorio, base, extensión) -> rutas reservadas por plan_batch
+        self._planned = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def _names(self, directory: Path) -> set:
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            return set()  # aún no existe: todos los nombres están libres
+        cached = self._index.get(directory)
+        if cached is None or cached[0] != mtime:
+            with os.scandir(directory) as entries:
+                names = {os.path.normcase(entry.name) for entry in entries}
+            cached = (mtime, names)
+            self._index[directory] = cached
+        return cached[1]
+
+    def _taken(self, directory: Path, name: str) -> bool:
+        path = directory / name
+        return (
+            os.path.normcase(name) in self._names(directory)
+            or path in self._reserved
+        )
+
+    def _free(self, directory: Path, base: str, extension: str) -> Path:
+        n = 1
+        while self._taken(directory, output_name(base, extension, n)):
+            n += 1
+        return directory / output_name(base, extension, n)
+
+    def candidate(self, directory, base: str, extension: str) -> Path:
+        """The name ``reserve`` would give now, without claiming it."""
+        directory = Path(directory)
+        with self._lock:
+            planned = self._planned.get((directory, base, extension))
+            if planned:
+                return planned[0]
+            return self._free(directory, base, extension)
+
+    def reserve(
+        self, directory, base: str, extension: str, resume: bool = False
+    ) -> Path:
+        """Claims a free name by creating an empty file with it."""
+        directory = Path(directory)
+        with self._lock:
+            unfinished = resume and self._unfinished(
+                directory, base, extension
+            )
+            if unfinished:
+                self._reserved.add(unfinished)
+                return unfinished
+            planned = self._planned.get((directory, base, extension))
+            if planned:
+                return planned.popleft()
+            return self._claim(directory, base, extension)
+
+    def _unfinished(self, directory: Path, base: str, extension: str):
+        names = self._names(directory)
+        n = 1
+        while self._taken(directory, output_name(base, extension, n)):
+            name = output_name(base, extension, n)
+            path = directory / name
+            journal = os.path.normcase(f"{name}.journal.json")
+            if journal in names and path not in self._reserved:
+                return path
+            n += 1
+        return None
+
+    def _claim(self, directory: Path, base: str, extension: str) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        while True:
+            path = self._free(directory, base, extension)
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                # Otro proceso lo creó después de listar el directorio
+                self._index_add(directory, path.name)
+                continue
+            self._reserved.add(path)
+            self._index_add(directory, path.name)
+            return path
+
+    def _index_add(self, directory: Path, name: str) -> None:
+        """Adds a name to the index instead of listing the directory again."""
+        cached = self._index.get(directory)
+        if cached is None:
+            return
+        cached[1].add(os.path.normcase(name))
+        try:
+            self._index[directory] = (directory.stat().st_mtime_ns, cached[1])
+        except OSError:
+            del self._index[directory]
+
+    def plan_batch(self, outputs) -> list:
+        """
+        Reserves a name for every (directory, base, extension) in one
+        pass, listing each directory only once.
+        """
+        paths = []
+        with self._lock:
+            for directory, base, extension in outputs:
+                directory = Path(directory)
+                path = self._claim(directory, base, extension)
+                self._planned[(directory, base, extension)].append(path)
+                paths.append(path)
+        return paths
+
+    def release_planned(self) -> None:
+        """Deletes the planned names that no job claimed (e.g. on cancel)."""
+        with self._lock:
+            for paths in self._planned.values():
+                for path in paths:
+                    self._release(path)
+            self._planned.clear()
+
+    def release(self, path) -> None:
+        """Frees a reserved name, deleting its file if nothing was written."""
+        with self._lock:
+            self._release(Path(path))
+
+    def _release(self, path: Path) -> None:
+        self._reserved.discard(path)
+        try:
+            if path.stat().st_size == 0:
+                path.unlink()
+        except OSError:
+            pass
+
+
+_planner = None
+
+
+def get_output_planner() -> OutputPlanner:
+    global _planner
+    if _planner is None:
+        _planner = OutputPlanner()
+    return _planner
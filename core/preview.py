@@ -0,0 +1,196 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from core.probe_cache import CACHE_PATH, file_key
+from core.video_utils import get_ffmpeg_path, keyframe_before
+
+PREVIEW_DIR = os.path.join(os.path.dirname(CACHE_PATH), "preview_cache")
+MAX_VIDEOS = 50  # videos con fotogramas guardados
+
+
+def preview_times(keyframes, duration: float, count: int = 8) -> list:
+    """
+    ``count`` evenly spaced timestamps. With ``keyframes`` each one is
+    moved to the keyframe before it; without them extract_frames shows
+    that same keyframe, only the timestamp is not moved.
+    """
+    times = []
+    for n in range(count):
+        target = duration * (n + 0.5) / count
+        if len(keyframes):
+            target = keyframe_before(keyframes, target)
+        target = round(target, 3)
+        if target not in times:
+            times.append(target)
+    return times
+
+
+def extract_frames(
+    video_path, times: list, paths: list, height: int = 180, ffmpeg=None
+) -> int:
+    """
+    Writes one downscaled JPEG per timestamp in a single FFmpeg process.
+    Every timestamp is an input of its own, opened with a fast seek and
+    decoding only keyframes, so nothing between them is decoded: the
+    frame is the keyframe at or before the timestamp.
+    Returns the FFmpeg exit code.
+    """
+    cmd = [str(ffmpeg or get_ffmpeg_path()), "-v", "error", "-y"]
+    for timestamp in times:
+        # Con la búsqueda exacta FFmpeg descarta ese keyframe y devuelve
+        # el siguiente, o nada tras el último
+        cmd += [
+            "-skip_frame",
+            "nokey",
+            "-noaccurate_seek",
+            "-ss",
+            f"{timestamp:.3f}",
+            "-i",
+            str(video_path),
+        ]
+    graph = ";".join(
+        # El keyframe queda antes del -ss (tiempo negativo): sin setpts
+        # la salida lo descartaría
+        f"[{n}:v:0]select='eq(n,0)',setpts=PTS-STARTPTS,"
+        f"scale=-2:{height}[v{n}]"
+        for n in range(len(times))
+    )
+    cmd += ["-filter_complex", graph]
+    for n, path in enumerate(paths):
+        cmd += [
+            "-map",
+            f"[v{n}]",
+            "-frames:v",
+            "1",
+            "-q:v",
+            "4",
+            "-update",
+            "1",
+            str(path),
+        ]
+    return subprocess.run(cmd, capture_output=True).returncode
+
+
+class PreviewCache:
+    """
+    Preview frames on disk, one folder per file version (path, size and
+    mtime) and one JPEG per timestamp and height. Folders of the least
+    recently used videos are removed above ``max_videos``.
+    """
+
+    def __init__(self, root: str = PREVIEW_DIR, max_videos: int = MAX_VIDEOS):
+        self.root = Path(root)
+        self.max_videos = max_videos
+        self._lock = threading.Lock()
+
+    def folder(self, video_path) -> Optional[Path]:
+        key = file_key(video_path)
+        if key is None:
+            return None
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return self.root / digest
+
+    def frame_path(self, folder: Path, timestamp: float, height: int):
+        return folder / f"{round(timestamp * 1000)}_{height}.jpg"
+
+    def touch(self, folder: Path) -> None:
+        with self._lock:
+            folder.mkdir(parents=True, exist_ok=True)
+            os.utime(folder)
+            folders = sorted(
+                (f for f in self.root.iterdir() if f.is_dir()),
+                key=lambda f: f.stat().st_mtime,
+                reverse=True,
+            )
+            for old in folders[self.max_videos :]:
+                shutil.rmtree(old, ignore_errors=True)
+
+
+@dataclass
+class PreviewFrame:
+    timestamp: float
+    path: Path
+
+
+def get_preview_strip(
+    video_path,
+    duration: float,
+    keyframes=(),
+    count: int = 8,
+    height: int = 180,
+    cache: PreviewCache = None,
+) -> list:
+    """
+    Returns the PreviewFrame list of a video. Only the frames missing
+    from the cache are extracted, all of them in one FFmpeg run.
+    """
+    cache = cache or PreviewCache()
+    folder = cache.folder(video_path)
+    if folder is None or duration <= 0:
+        return []
+    cache.touch(folder)
+    frames = [
+        PreviewFrame(t, cache.frame_path(folder, t, height))
+        for t in preview_times(keyframes, duration, count)
+    ]
+    missing = [frame for frame in frames if not frame.path.exists()]
+    if missing:
+        extract_frames(
+            video_path,
+            [frame.timestamp for frame in missing],
+            [frame.path for frame in missing],
+            height,
+        )
+    return [frame for frame in frames if frame.path.exists()]
+
+
+def _number(text, default=None):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return default
+
+
+def preview_geometry(params, source_size: tuple) -> Optional[dict]:
+    """
+    Size of the frame after ``scale`` and the ``crop`` rectangle inside
+    it, following the order of the -vf chain. Returns None if the
+    parameters are not plain numbers (e.g. crop expressions).
+    """
+    source_width, source_height = source_size
+    if source_width <= 0 or source_height <= 0:
+        return None
+    width, height = source_width, source_height
+    if params.width and params.height:
+        width = _number(params.width)
+        height = _number(params.height)
+        if width is None or height is None:
+            return None
+        # -1 / -2: ese lado se calcula manteniendo la proporción
+        if width <= 0 and height <= 0:
+            width, height = source_width, source_height
+        elif width <= 0:
+            width = source_width * height / source_height
+        elif height <= 0:
+            height = source_height * width / source_width
+    crop = (0.0, 0.0, width, height)
+    if params.crop:
+        parts = [_number(part) for part in params.crop.split(":")]
+        if len(parts) not in (2, 4) or None in parts:
+            return None
+        crop_width, crop_height = min(parts[0], width), min(parts[1], height)
+        if len(parts) == 4:
+            x, y = parts[2], parts[3]
+        else:
+            # Sin x:y, crop centra el recorte
+            x, y = (width - crop_width) / 2, (height - crop_height) / 2
+        x = max(0.0, min(x, width - crop_width))
+        y = max(0.0, min(y, height - crop_height))
+        crop = (x, y, crop_width, crop_height)
+    return {"frame": (width, height), "crop": crop}
@@ -0,0 +1,132 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from core.i18n import CONFIG_PATH
+
+CACHE_PATH = os.path.join(os.path.dirname(CONFIG_PATH), "probe_cache.sqlite")
+MAX_ENTRIES = 5000
+
+
+def file_key(path):
+    """
+    Returns (resolved path, size, mtime in ns) identifying one version
+    of a file, or None if it cannot be read.
+    """
+    try:
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    return str(resolved), stat.st_size, stat.st_mtime_ns
+
+
+class ProbeCache:
+    """
+    On-disk cache of raw ffprobe output, keyed on path, size and mtime.
+
+    A changed file no longer matches its key and is probed again. The
+    least recently used entries are evicted above ``max_entries``.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS probes (
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    query TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (path, query)
+                )
+                """)
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS probes_lru ON probes (last_access)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, video_path, query: str):
+        """Returns the cached ffprobe JSON for the current file, or None."""
+        key = file_key(video_path)
+        if key is None:
+            return None
+        path, size, mtime_ns = key
+        try:
+            with self._lock, self._connect() as db:
+                row = db.execute(
+                    "SELECT size, mtime_ns, data FROM probes "
+                    "WHERE path = ? AND query = ?",
+                    (path, query),
+                ).fetchone()
+                if row is None or row[0] != size or row[1] != mtime_ns:
+                    return None
+                db.execute(
+                    "UPDATE probes SET last_access = ? "
+                    "WHERE path = ? AND query = ?",
+                    (time.time(), path, query),
+                )
+        except sqlite3.Error:
+            return None
+        return json.loads(row[2])
+
+    def put(self, video_path, query: str, data: dict) -> None:
+        key = file_key(video_path)
+        if key is None:
+            return
+        path, size, mtime_ns = key
+        try:
+            with self._lock, self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        path,
+                        size,
+                        mtime_ns,
+                        query,
+                        json.dumps(data),
+                        time.time(),
+                    ),
+                )
+                db.execute(
+                    "DELETE FROM probes WHERE rowid IN ("
+                    "SELECT rowid FROM probes ORDER BY last_access DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM probes")
+
+
+_cache = None
+
+
+def get_probe_cache():
+    """Returns the shared cache, or None if the database is unavailable."""
+    global _cache
+    if _cache is None:
+        try:
+            _cache = ProbeCache()
+        except sqlite3.Error:
+            return None
+    return _cache
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# Argumentos que hacen que FFmpeg escriba su progreso en stdout como
+# bloques key=value en lugar de la línea de estadísticas en stderr, y
+# al terminar su tiempo de CPU y memoria máxima (líneas "bench:").
+PROGRESS_ARGS = ["-progress", "pipe:1", "-nostats", "-benchmark"]
+
+
+@dataclass
+class FFmpegProgress:
+    """
+    One progress update reported by FFmpeg's ``-progress`` output.
+    """
+
+    frame: int = 0
+    fps: float = 0.0
+    bitrate: Optional[float] = None  # kbit/s
+    total_size: int = 0  # bytes
+    out_time_us: int = 0
+    speed: Optional[float] = None
+    finished: bool = False
+
+    @property
+    def out_time(self) -> float:
+        """Processed media time in seconds."""
+        return self.out_time_us / 1_000_000
+
+
+def _to_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _to_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class ProgressParser:
+    """
+    Incremental parser for FFmpeg ``-progress`` key=value blocks.
+
+    Each block ends with a ``progress=continue`` or ``progress=end`` line,
+    at which point ``feed`` returns the complete record.
+    """
+
+    def __init__(self):
+        self._fields = {}
+
+    def feed(self, line: str) -> Optional[FFmpegProgress]:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+        if key != "progress":
+            self._fields[key] = value
+            return None
+
+        fields, self._fields = self._fields, {}
+        return FFmpegProgress(
+            frame=_to_int(fields.get("frame", "0")),
+            fps=_to_float(fields.get("fps", "0")) or 0.0,
+            bitrate=_to_float(
+                fields.get("bitrate", "N/A").removesuffix("kbits/s")
+            ),
+            total_size=_to_int(fields.get("total_size", "0")),
+            out_time_us=max(_to_int(fields.get("out_time_us", "0")), 0),
+            speed=_to_float(
+                fields.get("speed", "N/A").strip().removesuffix("x")
+            ),
+            finished=value == "end",
+        )
@@ -0,0 +1,77 @@
+from core.video_utils import parse_frame_rate
+
+# Códec que produce cada encoder ofrecido en la interfaz
+ENCODER_CODECS = {
+    "libx264": "h264",
+    "h264_nvenc": "h264",
+    "libx265": "hevc",
+    "hevc_nvenc": "hevc",
+    "mpeg4": "mpeg4",
+}
+
+# Códecs que cada contenedor acepta sin recodificar (video, audio)
+CONTAINER_CODECS = {
+    "mp4": (
+        {"h264", "hevc", "mpeg4", "av1", "vp9", "mjpeg"},
+        {"aac", "mp3", "ac3", "eac3", "alac", "opus", "flac"},
+    ),
+    "mov": (
+        {"h264", "hevc", "mpeg4", "prores", "mjpeg"},
+        {"aac", "mp3", "ac3", "alac", "pcm_s16le", "pcm_s24le"},
+    ),
+    "webm": ({"vp8", "vp9", "av1"}, {"opus", "vorbis"}),
+    "avi": (
+        {"h264", "mpeg4", "mjpeg", "msmpeg4v3"},
+        {"mp3", "ac3", "aac", "pcm_s16le"},
+    ),
+}
+
+
+def audio_fits(audio_codec: str, container: str) -> bool:
+    """True if an audio stream can be copied into the container."""
+    if container not in CONTAINER_CODECS:
+        return True  # mkv y desconocidos: se deja decidir a FFmpeg
+    return audio_codec in CONTAINER_CODECS[container][1]
+
+
+def fits_container(info: dict, container: str, keep_audio=True) -> bool:
+    """True if the source streams can be copied into the container."""
+    if container not in CONTAINER_CODECS:
+        return True  # mkv y desconocidos: se deja decidir a FFmpeg
+    video_codecs, audio_codecs = CONTAINER_CODECS[container]
+    if info.get("codec") not in video_codecs:
+        return False
+    audio_codec = info.get("audio_codec")
+    return not (
+        keep_audio and audio_codec and not audio_fits(audio_codec, container)
+    )
+
+
+def can_remux(
+    info: dict,
+    container: str,
+    encoder: str = None,
+    size: tuple = None,
+    frame_rate: str = None,
+    keep_audio: bool = True,
+) -> bool:
+    """
+    True when the requested output matches the probed source, so the
+    streams can be copied (``-c copy``) instead of decoded and encoded.
+
+    ``encoder``, ``size`` (width, height) and ``frame_rate`` are the
+    requested values, or None when the option is not used.
+    """
+    if encoder and encoder != "copy":
+        if ENCODER_CODECS.get(encoder) != info.get("codec"):
+            return False
+    if size and f"{size[0]}x{size[1]}" != info.get("resolution"):
+        return False
+    if frame_rate:
+        try:
+            source_rate = parse_frame_rate(info.get("frame_rate", ""))
+            if abs(parse_frame_rate(frame_rate) - source_rate) > 0.01:
+                return False
+        except ValueError:
+            return False
+    return fits_container(info, container, keep_audio)
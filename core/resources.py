@@ -0,0 +1,271 @@
+import os
+import queue
+import shutil
+import subprocess
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Clases de ionice (Linux) para cada prioridad de E/S
+IO_PRIORITIES = {
+    "idle": ["-c", "3"],
+    "low": ["-c", "2", "-n", "7"],
+    "normal": ["-c", "2", "-n", "4"],
+}
+
+
+def _ionice(io_priority) -> Optional[str]:
+    if not io_priority or io_priority not in IO_PRIORITIES:
+        return None
+    if not sys.platform.startswith("linux"):
+        return None
+    return shutil.which("ionice")
+
+
+def _set_windows_affinity(pid: int, cores: list) -> None:
+    """SetProcessAffinityMask through a handle opened by process id."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        # Instancia propia: los argtypes no afectan a ctypes.windll
+        kernel32 = ctypes.WinDLL("kernel32")
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.OpenProcess.argtypes = (
+            wintypes.DWORD,
+            wintypes.BOOL,
+            wintypes.DWORD,
+        )
+        kernel32.SetProcessAffinityMask.argtypes = (
+            wintypes.HANDLE,
+            ctypes.c_size_t,
+        )
+        kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+        # PROCESS_SET_INFORMATION | PROCESS_QUERY_INFORMATION
+        handle = kernel32.OpenProcess(0x0200 | 0x0400, False, pid)
+        if not handle:
+            return  # el proceso ya terminó
+        try:
+            mask = sum(1 << core for core in cores)
+            kernel32.SetProcessAffinityMask(handle, mask)
+        finally:
+            kernel32.CloseHandle(handle)
+    except (AttributeError, OSError):
+        pass
+
+
+def available_cores() -> list:
+    """CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cores(cores: list, jobs: int) -> list:
+    """
+    Splits the cores into ``jobs`` contiguous sets (neighbouring cores
+    usually share caches). Sizes differ by at most one core; if there are
+    more jobs than cores, jobs share them round-robin.
+    """
+    jobs = max(1, jobs)
+    if jobs > len(cores):
+        return [[cores[n % len(cores)]] for n in range(jobs)]
+    size, extra = divmod(len(cores), jobs)
+    sets, start = [], 0
+    for n in range(jobs):
+        end = start + size + (1 if n < extra else 0)
+        sets.append(cores[start:end])
+        start = end
+    return sets
+
+
+def format_cores(cores: list) -> str:
+    """[0, 1, 2, 3, 6] -> '0-3,6'"""
+    ranges = []
+    for core in cores:
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+@dataclass
+class ResourcePlan:
+    """
+    Resources given to one FFmpeg process. None means "let FFmpeg and the
+    OS decide".
+    """
+
+    threads: Optional[int] = None  # hilos del encoder (-threads)
+    filter_threads: Optional[int] = None
+    nice: Optional[int] = None
+    affinity: Optional[list] = None
+    io_priority: Optional[str] = None  # idle, low, normal
+    notes: list = field(default_factory=list)
+
+    def command(self, cmd: list) -> list:
+        """Adds the thread options to an FFmpeg argv."""
+        cmd = list(cmd)
+        if self.threads and "-i" in cmd:
+            # Tras la última entrada: opción de la (primera) salida
+            last_input = len(cmd) - 1 - cmd[::-1].index("-i")
+            cmd[last_input + 2 : last_input + 2] = [
+                "-threads",
+                str(self.threads),
+            ]
+        if self.filter_threads:
+            cmd[1:1] = ["-filter_threads", str(self.filter_threads)]
+        return cmd
+
+    def _tools(self) -> dict:
+        """Launcher tools that apply this plan, by what they set."""
+        if not sys.platform.startswith("linux"):
+            return {}
+        tools = {}
+        nice = shutil.which("nice")
+        if self.nice and nice:
+            tools["nice"] = [nice, "-n", str(self.nice)]
+        taskset = shutil.which("taskset")
+        if self.affinity and taskset:
+            tools["affinity"] = [taskset, "-c", format_cores(self.affinity)]
+        ionice = _ionice(self.io_priority)
+        if ionice:
+            tools["io_priority"] = [ionice, *IO_PRIORITIES[self.io_priority]]
+        return tools
+
+    def launcher(self) -> list:
+        """
+        Prefix that runs the process with the niceness, cores and I/O
+        priority (Linux: nice, taskset and ionice, when installed). Each
+        tool execs the next, so FFmpeg starts with them already applied.
+        """
+        return [arg for tool in self._tools().values() for arg in tool]
+
+    def popen_kwargs(self) -> dict:
+        """Arguments for subprocess.Popen (Windows priority class)."""
+        if sys.platform.startswith("win") and self.nice and self.nice > 0:
+            priority = (
+                subprocess.IDLE_PRIORITY_CLASS
+                if self.nice >= 15
+                else subprocess.BELOW_NORMAL_PRIORITY_CLASS
+            )
+            return {"creationflags": priority}
+        return {}
+
+    def after_start(self, process) -> None:
+        """
+        Applies the niceness and affinity the launcher could not (no
+        launcher tools, macOS, Windows) from the parent once the process
+        exists. Nothing runs in the child between fork and exec, which
+        is not safe with the worker threads that start the processes.
+        """
+        if sys.platform.startswith("win"):
+            # La prioridad va en creationflags (popen_kwargs)
+            if self.affinity:
+                _set_windows_affinity(process.pid, self.affinity)
+            return
+        # Lo que ya aplicó el lanzador no se repite: nice es relativo
+        applied = self._tools()
+        try:
+            if self.nice and "nice" not in applied:
+                # Relativa a la del programa, como os.nice
+                niceness = os.getpriority(os.PRIO_PROCESS, 0) + self.nice
+                os.setpriority(os.PRIO_PROCESS, process.pid, min(niceness, 19))
+            if (
+                self.affinity
+                and "affinity" not in applied
+                and hasattr(os, "sched_setaffinity")
+            ):
+                os.sched_setaffinity(process.pid, self.affinity)
+        except OSError:
+            pass  # el proceso ya terminó o el sistema no lo permite
+
+    def describe(self) -> str:
+        parts = []
+        if self.threads:
+            parts.append(f"{self.threads} threads")
+        if self.filter_threads:
+            parts.append(f"{self.filter_threads} filter threads")
+        if self.affinity:
+            parts.append(f"cores {format_cores(self.affinity)}")
+        if self.nice:
+            parts.append(f"nice {self.nice}")
+        if self.io_priority:
+            parts.append(f"I/O {self.io_priority}")
+        return ", ".join(parts + self.notes) or "FFmpeg defaults"
+
+
+class ResourceGovernor:
+    """
+    Shares the machine between ``jobs`` concurrent FFmpeg processes: each
+    slot gets its own set of cores and a thread count that matches it,
+    so the processes do not compete for the same cores.
+
+    ``threads`` and ``filter_threads`` override the automatic counts;
+    ``nice`` and ``io_priority`` apply to every job. ``plans`` replaces
+    the partition with given plans (e.g. the slot of a batch job).
+    """
+
+    def __init__(
+        self,
+        jobs: int = 1,
+        cores: list = None,
+        threads: int = None,
+        filter_threads: int = None,
+        nice: int = None,
+        io_priority: str = None,
+        pin_cores: bool = True,
+        plans: list = None,
+    ):
+        self.jobs = len(plans) if plans else max(1, int(jobs))
+        self.cores = list(cores) if cores else available_cores()
+        self.plans = list(plans or [])
+        core_sets = [] if plans else partition_cores(self.cores, self.jobs)
+        for core_set in core_sets:
+            # Un solo trabajo: FFmpeg ya usa todos los núcleos
+            shared = self.jobs > 1
+            plan = ResourcePlan(
+                threads=threads or (len(core_set) if shared else None),
+                filter_threads=filter_threads
+                or (len(core_set) if shared else None),
+                nice=nice,
+                affinity=core_set if shared and pin_cores else None,
+                io_priority=io_priority,
+            )
+            if io_priority and not _ionice(io_priority):
+                plan.notes.append("I/O priority not supported")
+            self.plans.append(plan)
+        self._free = queue.Queue()
+        for plan in self.plans:
+            self._free.put(plan)
+
+    @classmethod
+    def from_config(cls, config: dict, jobs: int = 1):
+        """Governor configured by the "resources" section of config.json."""
+        settings = config.get("resources", {})
+        return cls(
+            jobs,
+            threads=settings.get("threads"),
+            filter_threads=settings.get("filter_threads"),
+            nice=settings.get("nice"),
+            io_priority=settings.get("io_priority"),
+            pin_cores=settings.get("pin_cores", True),
+        )
+
+    @contextmanager
+    def slot(self):
+        """Borrows a free plan for the duration of one FFmpeg process."""
+        plan = self._free.get()
+        try:
+            yield plan
+        finally:
+            self._free.put(plan)
+
+    def describe(self) -> str:
+        if self.jobs == 1:
+            return self.plans[0].describe()
+        return f"{self.jobs} jobs on {len(self.cores)} cores: " + "; ".join(
+            plan.describe() for plan in self.plans
+        )
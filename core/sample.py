@@ -0,0 +1,185 @@
+import re
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Optional
+
+from core.resources import available_cores
+from core.video_utils import (
+    format_bandwidth,
+    format_duration,
+    format_size,
+    parse_timestamp,
+)
+
+BENCH_LINE = re.compile(r"utime=([\d.]+)s stime=([\d.]+)s rtime=([\d.]+)s")
+# Por encima de esta fracción de los núcleos, la muestra saturó la CPU
+SATURATED = 0.85
+
+
+@dataclass
+class Excerpt:
+    start: float
+    length: float
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    size: int = 0
+    returncode: Optional[int] = None
+    error: str = ""
+
+
+@dataclass
+class SampleEstimate:
+    """Full-job prediction extrapolated from the sample excerpts."""
+
+    duration: float  # segundos de video de la conversión completa
+    speed: float  # x tiempo real
+    encode_time: float
+    size: int
+    bitrate: float
+    excerpts: list = field(default_factory=list)
+    sample_time: float = 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.speed:.2f}x → ~{format_duration(self.encode_time)}, "
+            f"~{format_size(self.size)}, {format_bandwidth(self.bitrate)}"
+            f" (sample {self.sample_time:.1f} s)"
+        )
+
+
+def sample_range(params, total_duration: float) -> tuple:
+    """(start, length) of the part of the input the full job encodes."""
+    start, length = 0.0, total_duration
+    if params.start_time is not None:
+        try:
+            start = parse_timestamp(params.start_time)
+            if params.duration:
+                length = parse_timestamp(params.duration)
+            else:
+                length = total_duration - start
+        except ValueError:
+            start, length = 0.0, total_duration
+    return start, max(0.0, min(length, total_duration - start))
+
+
+def plan_excerpts(
+    start: float, length: float, count: int = 4, excerpt: float = 4.0
+) -> list:
+    """``count`` excerpts centred on evenly spaced points of the range."""
+    excerpt = min(excerpt, length / count) if count else 0
+    if excerpt <= 0:
+        return []
+    return [
+        Excerpt(
+            start=start + length * (n + 0.5) / count - excerpt / 2,
+            length=excerpt,
+        )
+        for n in range(count)
+    ]
+
+
+def _run_excerpt(builder, params, info, excerpt: Excerpt, path: Path):
+    # Mismos parámetros; solo cambia el tramo (-ss/-t antes de -i)
+    command = builder.build(
+        replace(
+            params,
+            start_time=f"{excerpt.start:.3f}",
+            duration=f"{excerpt.length:.3f}",
+            keyframe_snap=False,
+        ),
+        info,
+    )
+    command = replace(
+        command,
+        output_path=str(path),
+        extra_outputs=[],
+        overwrite=True,
+        renditions=[
+            (rendition, path.with_name(f"{rendition.label}_{path.name}"))
+            for rendition, _ in command.renditions
+        ],
+    )
+    outputs = [Path(p) for _, p in command.renditions] or [path]
+    argv = command.argv()
+    argv[1:1] = ["-nostdin", "-benchmark"]
+    started = time.perf_counter()
+    result = subprocess.run(argv, capture_output=True, text=True)
+    excerpt.wall_time = time.perf_counter() - started
+    excerpt.returncode = result.returncode
+    match = BENCH_LINE.search(result.stderr)
+    if match:
+        excerpt.cpu_time = float(match.group(1)) + float(match.group(2))
+    if result.returncode == 0 and all(p.exists() for p in outputs):
+        excerpt.size = sum(p.stat().st_size for p in outputs)
+    else:
+        excerpt.error = "\n".join(result.stderr.strip().splitlines()[-1:])
+    return excerpt
+
+
+def sample_encode(
+    builder,
+    params,
+    info: dict,
+    count: int = 4,
+    excerpt: float = 4.0,
+    cores: int = None,
+) -> Optional[SampleEstimate]:
+    """
+    Encodes ``count`` short excerpts with the exact current parameters,
+    all in parallel, and extrapolates the time, size and bitrate of the
+    full conversion. Returns None if no excerpt could be encoded.
+
+    The excerpts compete for the CPU. If together they kept it busy, the
+    full job is assumed to be limited by the machine's throughput (all
+    excerpts' media time over the sample's wall time). If not, e.g. with
+    single-threaded filters such as minterpolate, every excerpt ran at
+    the speed the full job will run at, and their median is used.
+    """
+    total_duration = info.get("duration_seconds") or 0
+    start, length = sample_range(params, total_duration)
+    excerpts = plan_excerpts(start, length, count, excerpt)
+    if not excerpts:
+        return None
+    extension = params.container or "mp4"
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix=".sample_") as folder:
+        with ThreadPoolExecutor(max_workers=len(excerpts)) as pool:
+            list(
+                pool.map(
+                    lambda n: _run_excerpt(
+                        builder,
+                        params,
+                        info,
+                        excerpts[n],
+                        Path(folder) / f"{n}.{extension}",
+                    ),
+                    range(len(excerpts)),
+                )
+            )
+    sample_time = time.perf_counter() - started
+    done = [e for e in excerpts if e.returncode == 0 and e.size]
+    if not done:
+        return None
+
+    media = sum(e.length for e in done)
+    cpu = sum(e.cpu_time for e in done)
+    cores = cores or len(available_cores())
+    if cpu / sample_time >= SATURATED * cores:
+        speed = media / sample_time
+    else:
+        speeds = sorted(e.length / e.wall_time for e in done)
+        speed = speeds[len(speeds) // 2]
+    size = int(sum(e.size for e in done) / media * length)
+    return SampleEstimate(
+        duration=length,
+        speed=speed,
+        encode_time=length / speed,
+        size=size,
+        bitrate=size * 8 / length if length else 0,
+        excerpts=excerpts,
+        sample_time=sample_time,
+    )
@@ -0,0 +1,89 @@
+import heapq
+import statistics
+import threading
+from collections import deque
+
+# Orden en que se lanzan los trabajos de la cola
+POLICIES = ("fifo", "shortest", "longest")
+
+REFERENCE_PIXELS = 1920 * 1080
+DEFAULT_SPEED = 1.0  # x tiempo real a 1080p, sin mediciones previas
+
+
+def frame_pixels(info: dict) -> int:
+    try:
+        width, height = str(info.get("resolution", "")).split("x")
+        return int(width) * int(height)
+    except ValueError:
+        return REFERENCE_PIXELS
+
+
+class SpeedModel:
+    """
+    Predicts how long a conversion takes from the measured speed of
+    recent jobs. Speeds are normalised to 1080p by pixel count, so a
+    720p job is expected to run about 2.25 times faster than a 1080p one.
+    """
+
+    def __init__(self, history: int = 20, default_speed=DEFAULT_SPEED):
+        self.default_speed = default_speed
+        self._samples = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def observe(self, info: dict, speed: float) -> None:
+        """Records the speed (media seconds per second) of a finished job."""
+        if speed and speed > 0:
+            with self._lock:
+                self._samples.append(
+                    speed * frame_pixels(info) / REFERENCE_PIXELS
+                )
+
+    def speed(self, info: dict) -> float:
+        with self._lock:
+            reference = (
+                statistics.median(self._samples)
+                if self._samples
+                else self.default_speed
+            )
+        return reference * REFERENCE_PIXELS / frame_pixels(info)
+
+    def estimate(self, info: dict, duration: float = None) -> float:
+        """Expected wall time in seconds."""
+        if duration is None:
+            duration = info.get("duration_seconds") or 0
+        return duration / self.speed(info)
+
+
+def order_jobs(jobs: list, policy: str = "fifo") -> list:
+    """
+    Orders jobs by their ``estimate``: shortest-job-first lowers the
+    average wait, longest-first lowers the total time (makespan) when
+    several workers run in parallel. Jobs without an estimate go last.
+    """
+    if policy == "fifo":
+        return list(jobs)
+    known = [job for job in jobs if job.estimate is not None]
+    unknown = [job for job in jobs if job.estimate is None]
+    known.sort(key=lambda job: job.estimate, reverse=policy == "longest")
+    return known + unknown
+
+
+def makespan(running: list, pending: list, workers: int) -> float:
+    """
+    Time until the last job ends if ``pending`` jobs (in order) start on
+    whichever of the ``workers`` frees up first.
+    """
+    workers = max(1, workers)
+    finish = sorted(running)[:workers]
+    finish += [0.0] * (workers - len(finish))
+    heapq.heapify(finish)
+    for remaining in pending:
+        heapq.heappush(finish, heapq.heappop(finish) + remaining)
+    return max(finish)
+
+
+def remaining_time(duration: float, position: float, speed: float):
+    """Wall time left for a conversion running at ``speed``, or None."""
+    if not duration or not speed or speed <= 0:
+        return None
+    return max(duration - position, 0) / speed
@@ -1,6 +1,10 @@
 import sys
 import json
+import bisect
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fractions import Fraction
 from pathlib import Path
 
 
@@ -28,14 +32,33 @@ def get_ffprobe_path():
     return ffprobe_bin_path
 
 
-def get_video_info(video_path):
+PROBE_ENTRIES = (
+    "format=duration,size,bit_rate"
+    ":stream=codec_type,width,height,codec_name,avg_frame_rate,nb_frames,time_base"
+)
+
+
+def probe_video(video_path, use_cache=True):
+    """
+    Returns the raw ffprobe JSON for a video, or an error message.
+    Results are cached on disk and reused while the file is unchanged.
+    """
+    # sqlite3 solo se carga al analizar el primer video
+    from core.probe_cache import get_probe_cache
+
+    cache = get_probe_cache() if use_cache else None
+    if cache is not None:
+        video_info = cache.get(video_path, PROBE_ENTRIES)
+        if video_info is not None:
+            return video_info
+
     ffprobe_path = get_ffprobe_path()
     cmd = [
         ffprobe_path,
         "-v",
         "error",
         "-show_entries",
-        "format=duration,size,bit_rate:stream=width,height,codec_name,avg_frame_rate,nb_frames",
+        PROBE_ENTRIES,
         "-of",
         "json",
         video_path,
@@ -44,21 +67,107 @@ def get_video_info(video_path):
     if result.returncode != 0:
         return f"Error al analizar el video: {result.stderr}"
     video_info = json.loads(result.stdout)
+    if cache is not None:
+        cache.put(video_path, PROBE_ENTRIES, video_info)
+    return video_info
+
+
+def get_video_info(video_path, use_cache=True):
+    video_info = probe_video(video_path, use_cache)
+    if not isinstance(video_info, dict):
+        return video_info
     video_data = video_info.get("format", {})
-    stream_data = video_info.get("streams", [])[0]
+    streams = video_info.get("streams", [])
+    stream_data = next(
+        (s for s in streams if s.get("codec_type") == "video"), streams[0]
+    )
+    audio_data = next(
+        (s for s in streams if s.get("codec_type") == "audio"), {}
+    )
     info = {
         "filename": Path(video_path).stem,
         "duration": format_duration(float(video_data.get("duration", 0))),
+        "duration_seconds": float(video_data.get("duration", 0)),
         "size": format_size(int(video_data.get("size", 0))),
         "bitrate": format_bandwidth(float(video_data.get("bit_rate", "-"))),
         "resolution": f"{stream_data.get('width', '-')}x{stream_data.get('height', '-')}",
         "codec": stream_data.get("codec_name", ""),
+        "audio_codec": audio_data.get("codec_name", ""),
         "frame_rate": stream_data.get("avg_frame_rate", ""),
         "total_frames": stream_data.get("nb_frames", "-"),
+        "time_base": stream_data.get("time_base", ""),
     }
     return info
 
 
+def probe_many(video_paths, workers=8, on_result=None):
+    """
+    Probes many videos concurrently with a bounded pool of ffprobe
+    processes. ``on_result(path, info)`` is called as each probe finishes,
+    where ``info`` is the get_video_info dict or an error message.
+
+    Returns a report with the results, the failures, the wall time and
+    the number of files probed per second.
+    """
+    results = {}
+    failed = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(get_video_info, str(path)): path
+            for path in video_paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                info = future.result()
+            except (OSError, ValueError, IndexError) as e:
+                info = f"Error al analizar el video: {e}"
+            if isinstance(info, dict):
+                results[path] = info
+            else:
+                failed[path] = info
+            if on_result:
+                on_result(path, info)
+    wall_time = time.perf_counter() - start
+    total = len(results) + len(failed)
+    return {
+        "results": results,
+        "failed": failed,
+        "wall_time": wall_time,
+        "files_per_second": total / wall_time if wall_time > 0 else 0,
+    }
+
+
+def get_keyframes(video_path) -> list:
+    """
+    Returns the timestamps (in seconds) of the keyframes of the first
+    video stream. Only packet flags are read, so nothing is decoded.
+    """
+    ffprobe_path = get_ffprobe_path()
+    cmd = [
+        ffprobe_path,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        video_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return []
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.append(float(pts_time))
+    return sorted(keyframes)
+
+
 def format_duration(total_seconds: float) -> str:
     hours = int(total_seconds // 3600)
     minutes = int((total_seconds % 3600) // 60)
@@ -120,3 +229,40 @@ def list_seconds(string_list: list) -> float:
     minutes = float(string_list[1])
     seconds = float(string_list[2])
     return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_frame_rate(text: str) -> float:
+    """
+    Converts an ffprobe frame rate such as "30000/1001" or "25" into a
+    number. Raises ValueError if the text is not a valid rate.
+    """
+    try:
+        rate = float(Fraction(text.strip()))
+    except ZeroDivisionError:
+        raise ValueError(f"Invalid frame rate: {text}") from None
+    if rate <= 0:
+        raise ValueError(f"Invalid frame rate: {text}")
+    return rate
+
+
+def parse_timestamp(text: str) -> float:
+    """
+    Converts "[[hh:]mm:]ss[.ms]" into seconds. Raises ValueError if the
+    text is not a valid timestamp.
+    """
+    parts = text.strip().split(":")
+    if not 1 <= len(parts) <= 3:
+        raise ValueError(f"Invalid timestamp: {text}")
+    total = 0.0
+    for part in parts:
+        total = total * 60 + float(part)
+    return total
+
+
+def keyframe_before(keyframes: list, timestamp: float) -> float:
+    """
+    Returns the last keyframe at or before ``timestamp`` (the point where a
+    stream copy can start without losing the requested frames).
+    """
+    index = bisect.bisect_right(keyframes, timestamp + 1e-6)
+    return keyframes[index - 1] if index > 0 else 0.0
@@ -0,0 +1,52 @@
+from core.batch import BatchJob, BatchQueue
+from core.output_planner import OutputPlanner
+
+INFO = {
+    "codec": "h264",
+    "resolution": "320x240",
+    "frame_rate": "30",
+    "duration_seconds": 1.0,
+}
+
+
+def test_unexpected_errors_fail_the_job(tmp_path):
+    def build_command(job, info):
+        raise KeyError("encoder")
+
+    updates = []
+    job = BatchJob(tmp_path / "clip.mp4", info=INFO, duration=1.0)
+    queue = BatchQueue(
+        [job],
+        workers=1,
+        build_command=build_command,
+        on_update=lambda job: updates.append(job.status),
+    )
+    queue.run()
+    assert job.status == "failed"
+    assert job.error == "'encoder'"
+    assert updates == ["failed"]
+
+
+def test_failed_build_releases_the_reserved_outputs(tmp_path):
+    planner = OutputPlanner()
+    reserved = planner.reserve(tmp_path, "clip_converted", "mp4")
+
+    class Command:
+        def outputs(self):
+            return [str(reserved)]
+
+        def argv(self):
+            raise OSError("No space left on device")
+
+    updates = []
+    job = BatchJob(tmp_path / "clip.mp4", info=INFO, duration=1.0)
+    queue = BatchQueue(
+        [job],
+        workers=1,
+        build_command=lambda job, info: Command(),
+        on_update=lambda job: updates.append((job.status, reserved.exists())),
+        planner=planner,
+    )
+    queue.run()
+    assert job.error == "No space left on device"
+    assert updates == [("failed", False)]
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import cli
+from cli import job_params, parse_flag
+
+
+def test_parse_flag():
+    assert parse_flag("remove_audio", True) is True
+    assert parse_flag("remove_audio", "false") is False
+    assert parse_flag("remove_audio", "True") is True
+    assert parse_flag("remove_audio", 0) is False
+    assert parse_flag("remove_audio", "1") is True
+    with pytest.raises(ValueError):
+        parse_flag("remove_audio", "no thanks")
+
+
+def run_manifest(tmp_path, monkeypatch, manifest):
+    """Runs cli.main up to the queue; returns the options it got."""
+    seen = {}
+
+    def queue(jobs, **options):
+        seen.update(options)
+        raise SystemExit(0)
+
+    monkeypatch.setattr(cli, "BatchQueue", queue)
+    monkeypatch.setattr(cli, "get_job_history", lambda: None)
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({"jobs": [], **manifest}), encoding="utf-8")
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([str(path)])
+    return exit_info.value.code, seen
+
+
+def test_manifest_resumable_is_parsed(tmp_path, monkeypatch):
+    code, seen = run_manifest(tmp_path, monkeypatch, {"resumable": "false"})
+    assert code == 0 and seen["resumable"] is False
+    code, seen = run_manifest(tmp_path, monkeypatch, {"resumable": "1"})
+    assert code == 0 and seen["resumable"] is True
+
+
+def test_invalid_manifest_resumable_is_an_error(tmp_path, monkeypatch, capsys):
+    code, _ = run_manifest(tmp_path, monkeypatch, {"resumable": "sometimes"})
+    assert code == 2
+    assert "resumable must be true or false" in capsys.readouterr().err
+
+
+def test_job_params_reads_text_flags():
+    input_path, params = job_params(
+        {"input": "clip.mp4", "remove_audio": "false", "crf": 23},
+        {"output_folder": "out"},
+        Path("videos"),
+    )
+    assert input_path == Path("videos/clip.mp4")
+    assert params.remove_audio is False
+    assert params.crf == "23"
+    assert params.output_folder == str(Path("videos/out"))
+
+
+def test_job_params_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="Unknown job fields: colour"):
+        job_params({"input": "clip.mp4", "colour": "red"}, {}, Path("."))
+    with pytest.raises(ValueError, match="remove_audio"):
+        job_params(
+            {"input": "clip.mp4", "remove_audio": "maybe"}, {}, Path(".")
+        )
@@ -0,0 +1,72 @@
+from core.command_builder import (
+    ConversionParams,
+    encode_options,
+    input_options,
+    stream_copy_possible,
+)
+
+H264 = {
+    "codec": "h264",
+    "audio_codec": "aac",
+    "resolution": "1920x1080",
+    "frame_rate": "30",
+}
+
+
+def params(**kwargs):
+    return ConversionParams(input_path="in.mp4", **kwargs)
+
+
+def test_container_change_is_a_stream_copy():
+    assert stream_copy_possible(params(container="mov"), H264)
+    assert stream_copy_possible(params(encoder="copy"), H264)
+    options, _, stream_copy, _ = encode_options(params(), H264)
+    assert stream_copy
+    assert options == ["-c", "copy"]
+
+
+def test_stream_copy_needs_a_fitting_container():
+    opus = {**H264, "audio_codec": "opus"}
+    assert not stream_copy_possible(params(container="webm"), H264)
+    assert not stream_copy_possible(params(container="mov"), opus)
+    assert stream_copy_possible(
+        params(container="mov", remove_audio=True), opus
+    )
+
+
+def test_encoder_preset_or_tune_ask_for_a_re_encode():
+    assert not stream_copy_possible(params(encoder="libx264"), H264)
+    assert not stream_copy_possible(params(preset="veryslow"), H264)
+    assert not stream_copy_possible(params(tune="film"), H264)
+    options, _, stream_copy, _ = encode_options(
+        params(encoder="libx264", preset="veryslow"), H264
+    )
+    assert not stream_copy
+    assert options == ["-c:v", "libx264", "-preset", "veryslow"]
+
+
+def keyframes(path):
+    return [0.0, 2.0, 4.0, 6.0]
+
+
+def test_keyframe_snap_moves_the_start_and_keeps_the_end():
+    snapped = params(start_time="4.5", duration="1", keyframe_snap=True)
+    assert input_options(snapped, keyframes) == [
+        "-ss",
+        "4.000",
+        "-t",
+        "1.500",
+    ]
+
+
+def test_keyframe_snap_without_duration():
+    for duration in (None, ""):
+        snapped = params(
+            start_time="00:03.5", duration=duration, keyframe_snap=True
+        )
+        assert input_options(snapped, keyframes) == ["-ss", "2.000"]
+
+
+def test_unparsable_start_is_not_snapped():
+    snapped = params(start_time="later", keyframe_snap=True)
+    assert input_options(snapped, keyframes) == ["-ss", "later"]
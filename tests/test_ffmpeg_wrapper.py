@@ -0,0 +1,127 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from core.ffmpeg_wrapper import (
+    ParallelVideoConverter,
+    VideoConverter,
+    concat_audio_args,
+)
+from core.video_utils import get_ffmpeg_path
+
+FFMPEG = get_ffmpeg_path()
+AAC = {"codec": "h264", "audio_codec": "aac"}
+
+
+def test_start_reports_a_failed_launch(tmp_path):
+    finished = []
+    converter = VideoConverter()
+    converter.start(
+        [str(tmp_path / "missing-ffmpeg"), "-i", "in.mp4", "out.mp4"],
+        on_finish=finished.append,
+    )
+    converter.wait()
+    assert finished == [-1]
+    assert "missing-ffmpeg" in converter.stderr_tail[-1]
+
+
+def test_start_finishes_when_the_conversion_raises():
+    finished = []
+    converter = VideoConverter()
+    converter.convert_video = lambda *args: 1 / 0
+    converter.start(["ffmpeg"], on_finish=finished.append)
+    converter.wait()
+    assert finished == [-1]
+    assert converter.stderr_tail[-1] == "division by zero"
+
+
+def test_benchmark_report_fills_the_stats():
+    converter = VideoConverter()
+    converter.ffmpeg_process = SimpleNamespace(
+        stderr=[
+            "Conversion failed!\n",
+            "bench: utime=1.500s stime=0.250s rtime=2.000s\n",
+            "bench: maxrss=20480KiB\n",
+        ]
+    )
+    converter.drain_stderr()
+    assert list(converter.stderr_tail) == ["Conversion failed!"]
+    assert converter.stats.user_time == 1.5
+    assert converter.stats.sys_time == 0.25
+    assert converter.stats.max_rss == 20480 * 1024
+
+
+@pytest.mark.skipif(not FFMPEG.exists(), reason="needs the bundled FFmpeg")
+def test_conversion_records_its_cost(tmp_path):
+    converter = VideoConverter()
+    returncode = converter.convert_video(
+        [
+            str(FFMPEG),
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=160x120:rate=24:duration=1",
+            "-f",
+            "null",
+            "-",
+        ]
+    )
+    assert returncode == 0
+    assert converter.stats.user_time is not None
+    assert converter.stats.max_rss > 0
+    assert converter.stats.frames == 24
+
+
+def test_history_gets_the_probed_info(tmp_path):
+    class History:
+        def record(self, argv, stats, returncode, info=None):
+            self.info = info
+
+    info = {"codec": "h264", "duration_seconds": 1.0}
+    history = History()
+    converter = VideoConverter(history=history)
+    converter.convert_video(
+        [sys.executable, "-i", "in.mp4", "out.mp4"], info=info
+    )
+    assert history.info is info
+
+
+def test_concat_copies_audio_only_into_a_fitting_container():
+    assert concat_audio_args([], AAC, "out.mp4") == ["-c:a", "copy"]
+    assert concat_audio_args([], AAC, "out.mkv") == ["-c:a", "copy"]
+    assert concat_audio_args([], AAC, "out.webm") == []
+    assert concat_audio_args(["-f", "webm"], AAC, "out.mp4") == []
+    assert concat_audio_args(["-an"], AAC, "out.mp4") == []
+    assert concat_audio_args(
+        ["-c:v", "libvpx", "-c:a", "libopus", "-b:a", "96k"], AAC, "out.webm"
+    ) == ["-c:a", "libopus", "-b:a", "96k"]
+
+
+def test_parallel_mux_into_webm_reencodes_the_audio(tmp_path):
+    converter = ParallelVideoConverter(workers=1)
+    run = []
+    converter._run_child = lambda cmd, *args: run.append(cmd) or 0
+    converter._concat(
+        "ffmpeg",
+        [tmp_path / "encoded_0000.webm"],
+        tmp_path,
+        [],
+        "in.mp4",
+        ["-c:v", "libvpx-vp9", "-f", "webm"],
+        tmp_path / "out.webm",
+        AAC,
+    )
+    [cmd] = run
+    assert cmd[cmd.index("-map", cmd.index("in.mp4")) :] == [
+        "-map",
+        "0:v",
+        "-map",
+        "1:a?",
+        "-f",
+        "webm",
+        "-c:v",
+        "copy",
+        "-y",
+        str(tmp_path / "out.webm"),
+    ]
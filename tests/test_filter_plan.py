@@ -0,0 +1,84 @@
+from core.command_builder import ConversionParams
+from core.filter_plan import crop_rect, plan_filters, scale_size
+
+INFO = {"resolution": "1920x1080", "frame_rate": "30"}
+
+
+def params(**kwargs):
+    return ConversionParams(input_path="in.mp4", **kwargs)
+
+
+def test_scale_size_keeps_aspect_ratio():
+    assert scale_size(1920, 1080, ("1280", "-2")) == (1280, 720)
+    assert scale_size(1920, 1080, ("-1", "720")) == (1280, 720)
+    assert scale_size(1920, 1080, ("-1", "-1")) == (1920, 1080)
+    assert scale_size(1920, 1080, ("w", "720")) is None
+
+
+def test_crop_rect_centres_without_offsets():
+    assert crop_rect(1920, 1080, "640:360") == (640, 360, 640, 360)
+    assert crop_rect(1920, 1080, "640:360:10:20") == (640, 360, 10, 20)
+    assert crop_rect(1920, 1080, "640") is None
+
+
+def test_classic_order_without_probe():
+    plan = plan_filters(params(width="1280", height="720", crop="640:360"), {})
+    assert plan.filters == ["scale=1280:720", "crop=640:360"]
+    assert plan.cost is None
+
+
+def test_crop_moves_before_scale_in_source_coordinates():
+    plan = plan_filters(
+        params(width="1280", height="720", crop="640:360:100:50"), INFO
+    )
+    assert plan.filters == ["crop=960:540:150:75", "scale=640:360"]
+    assert plan.reordered
+
+
+def test_fps_goes_first():
+    plan = plan_filters(
+        params(width="1280", height="720", frame_rate="15"), INFO
+    )
+    assert plan.filters == ["fps=15", "scale=1280:720"]
+
+
+def test_mci_keeps_scale_and_crop_on_their_side():
+    plan = plan_filters(
+        params(
+            width="1280",
+            height="720",
+            frame_rate="60",
+            mi_mode="mci",
+            crop="640:360:100:50",
+        ),
+        INFO,
+    )
+    assert plan.filters == [
+        "scale=1280:720",
+        "minterpolate=fps=60:mi_mode=mci",
+        "crop=640:360:100:50",
+    ]
+    assert not plan.reordered
+
+
+def test_blend_lets_the_crop_go_first():
+    plan = plan_filters(
+        params(
+            width="1280",
+            height="720",
+            frame_rate="60",
+            mi_mode="blend",
+            crop="640:360:100:50",
+        ),
+        INFO,
+    )
+    assert plan.filters[-1] == "minterpolate=fps=60:mi_mode=blend"
+    assert plan.reordered
+
+
+def test_minterpolate_never_goes_before_scale():
+    plan = plan_filters(
+        params(width="640", height="360", frame_rate="60", mi_mode="dup"),
+        INFO,
+    )
+    assert plan.filters == ["scale=640:360", "minterpolate=fps=60:mi_mode=dup"]
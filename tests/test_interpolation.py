@@ -0,0 +1,66 @@
+from fractions import Fraction
+
+from core.interpolation import (
+    OVERLAP,
+    Chunk,
+    chunk_args,
+    chunk_grid,
+    interpolation_rate,
+    plan_chunks,
+)
+
+NTSC = Fraction(30000, 1001)
+
+
+def test_interpolation_rate():
+    assert interpolation_rate("scale=640:360,minterpolate=fps=60") == 60
+    assert interpolation_rate("minterpolate=60000/1001:mi_mode=mci") == (
+        Fraction(60000, 1001)
+    )
+    assert interpolation_rate("scale=640:360") is None
+
+
+def test_chunk_grid_follows_the_time_base():
+    assert chunk_grid(NTSC, 60, "1/30000") == 1
+    assert chunk_grid(24, 60, "1/12288") == 5
+    assert chunk_grid(NTSC, 60) == 1001
+    assert chunk_grid(30, 60) == 2
+
+
+def test_ntsc_chunks_keep_a_short_overlap():
+    chunks = plan_chunks(480, NTSC, 60, 4, time_base="1/30000")
+    assert [c.first for c in chunks] == [0, 240, 480, 721]
+    assert [c.before for c in chunks] == [0, OVERLAP, OVERLAP, OVERLAP]
+    assert [c.after for c in chunks] == [OVERLAP, OVERLAP, OVERLAP, 0]
+    assert chunks[-1].count is None
+    assert all(
+        c.first + c.count == n.first for c, n in zip(chunks, chunks[1:])
+    )
+
+
+def test_cuts_snap_to_the_grid():
+    chunks = plan_chunks(168, 24, 60, 4, time_base="1/12288")
+    assert all(c.first % 5 == 0 for c in chunks)
+
+
+def test_serial_when_the_grid_is_coarser_than_the_video():
+    assert plan_chunks(240, NTSC, 60, 4) == [Chunk(0, None, 0, 0)]
+
+
+def test_chunk_args_shift_the_first_output_frame_to_zero():
+    chunk = Chunk(first=241, count=240, before=16, after=16)
+    input_args, chain = chunk_args(chunk, NTSC, 60, "minterpolate=fps=60")
+    # La salida 241 cae tras el fotograma de origen 120: seek al 104
+    assert input_args == ["-ss", "3.470133", "-t", "5.138466"]
+    assert chain == (
+        "setpts=PTS-STARTPTS-round(4099/7500/TB),"
+        "minterpolate=fps=60,trim=start_pts=0:end_pts=240"
+    )
+
+
+def test_first_chunk_is_not_seeked():
+    input_args, chain = chunk_args(
+        Chunk(first=0, count=None), 30, 60, "minterpolate=fps=60"
+    )
+    assert input_args == []
+    assert chain.endswith("trim=start_pts=0")
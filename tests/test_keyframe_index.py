@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from core import keyframe_index
+from core.keyframe_index import KeyframeIndex, get_keyframe_index
+
+
+@pytest.fixture
+def index_module(monkeypatch):
+    monkeypatch.setattr(keyframe_index, "get_keyframe_cache", lambda: None)
+    monkeypatch.setattr(
+        keyframe_index, "_memory", keyframe_index.OrderedDict()
+    )
+    monkeypatch.setattr(
+        keyframe_index, "_building", keyframe_index.OrderedDict()
+    )
+    return keyframe_index
+
+
+def test_lookups():
+    index = KeyframeIndex([4.0, 0.0, 2.0], [2.0, 4.0], [0.1, 0.9])
+    assert list(index.keyframes) == [0.0, 2.0, 4.0]
+    assert index.before(3.0) == 2.0
+    assert index.after(3.0) == 4.0
+    assert index.nearest(3.2) == 4.0
+    restored = KeyframeIndex.from_blobs(*index.to_blobs())
+    assert list(restored.keyframes) == list(index.keyframes)
+
+
+def test_keyframes_do_not_wait_for_a_scene_scan(
+    tmp_path, index_module, monkeypatch
+):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"x")
+    release = threading.Event()
+
+    def build(path, scenes=False):
+        if scenes:
+            release.wait(5)
+            return KeyframeIndex([0.0, 2.0], [2.0], [0.5])
+        return KeyframeIndex([0.0, 2.0])
+
+    monkeypatch.setattr(index_module, "build_keyframe_index", build)
+    scan = threading.Thread(target=get_keyframe_index, args=(video, True))
+    scan.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    assert list(get_keyframe_index(video).keyframes) == [0.0, 2.0]
+    assert time.perf_counter() - started < 1
+    release.set()
+    scan.join()
+    # El índice con escenas sustituye al de solo keyframes
+    assert get_keyframe_index(video).has_scenes
+
+
+def test_memory_is_bounded(tmp_path, index_module, monkeypatch):
+    monkeypatch.setattr(index_module, "MAX_ENTRIES", 3)
+    monkeypatch.setattr(
+        index_module,
+        "build_keyframe_index",
+        lambda path, scenes=False: KeyframeIndex([0.0]),
+    )
+    for n in range(10):
+        video = tmp_path / f"{n}.mp4"
+        video.write_bytes(b"x")
+        get_keyframe_index(video)
+    assert len(index_module._memory) == 3
+    assert len(index_module._building) <= 3
@@ -0,0 +1,97 @@
+import pytest
+
+from core.batch import BatchJob, BatchQueue
+from core.command_builder import (
+    CommandBuilder,
+    ConversionParams,
+    output_paths,
+)
+from core.output_planner import OutputPlanner
+
+
+def test_reserve_claims_distinct_names(tmp_path):
+    planner = OutputPlanner()
+    first = planner.reserve(tmp_path, "video_converted", "mp4")
+    second = planner.reserve(tmp_path, "video_converted", "mp4")
+    assert first.name == "video_converted.mp4"
+    assert second.name == "video_converted_2.mp4"
+    assert first.exists() and second.exists()
+
+
+def test_candidate_skips_existing_files(tmp_path):
+    (tmp_path / "video_converted.mp4").write_bytes(b"data")
+    planner = OutputPlanner()
+    candidate = planner.candidate(tmp_path, "video_converted", "mp4")
+    assert candidate.name == "video_converted_2.mp4"
+    assert not candidate.exists()
+
+
+def test_release_deletes_only_empty_files(tmp_path):
+    planner = OutputPlanner()
+    empty = planner.reserve(tmp_path, "a", "mp4")
+    written = planner.reserve(tmp_path, "b", "mp4")
+    written.write_bytes(b"data")
+    planner.release(empty)
+    planner.release(written)
+    assert not empty.exists()
+    assert written.exists()
+    assert planner.reserve(tmp_path, "a", "mp4") == empty
+
+
+def test_planned_names_are_claimed_in_order(tmp_path):
+    planner = OutputPlanner()
+    planned = planner.plan_batch(
+        [(tmp_path, "video", "mp4"), (tmp_path, "video", "mp4")]
+    )
+    assert [p.name for p in planned] == ["video.mp4", "video_2.mp4"]
+    assert planner.reserve(tmp_path, "video", "mp4") == planned[0]
+    planner.release_planned()
+    assert planned[0].exists()
+    assert not planned[1].exists()
+
+
+def test_failed_batch_job_releases_its_outputs(tmp_path):
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"not a video")
+    planner = OutputPlanner()
+    builder = CommandBuilder(str(tmp_path / "missing-ffmpeg"), planner=planner)
+    params = ConversionParams(
+        output_folder=str(tmp_path / "out"), crf="23", extract_audio=True
+    )
+    info = {
+        "codec": "h264",
+        "resolution": "320x240",
+        "frame_rate": "30",
+        "duration_seconds": 1.0,
+    }
+    job = BatchJob(source, info=info, duration=1.0)
+    queue = BatchQueue(
+        [job],
+        workers=1,
+        build_command=lambda job, info: builder.for_input(
+            params, job.input_path, info
+        ),
+        planner=planner,
+    )
+    queue.run()
+    assert job.status == "failed"
+    assert len(job.outputs) == 2
+    assert list((tmp_path / "out").iterdir()) == []
+
+
+def test_failed_reservation_gives_back_the_names_taken(tmp_path, monkeypatch):
+    planner = OutputPlanner()
+    reserve = planner.reserve
+
+    def reserve_video_only(directory, base, extension, resume=False):
+        if extension == "aac":
+            raise OSError("Permission denied")
+        return reserve(directory, base, extension, resume)
+
+    monkeypatch.setattr(planner, "reserve", reserve_video_only)
+    params = ConversionParams(
+        input_path=str(tmp_path / "clip.mp4"), extract_audio=True
+    )
+    with pytest.raises(OSError):
+        output_paths(params, planner, reserve=True)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,43 @@
+import subprocess
+
+import pytest
+
+from core.preview import extract_frames, preview_times
+from core.video_utils import get_ffmpeg_path
+
+FFMPEG = get_ffmpeg_path()
+
+
+def test_preview_times_move_to_keyframes():
+    assert preview_times([], 8.0, 4) == [1.0, 3.0, 5.0, 7.0]
+    assert preview_times([0.0, 2.0, 4.0, 6.0], 8.0, 4) == [0.0, 2.0, 4.0, 6.0]
+    assert preview_times([0.0, 4.0], 8.0, 4) == [0.0, 4.0]
+
+
+@pytest.mark.skipif(not FFMPEG.exists(), reason="needs the bundled FFmpeg")
+def test_frames_are_the_keyframe_before_each_time(tmp_path):
+    clip = tmp_path / "gop.mp4"
+    subprocess.run(
+        [
+            str(FFMPEG),
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=160x120:rate=24:duration=6",
+            "-c:v",
+            "mpeg4",
+            "-g",
+            "24",
+            str(clip),
+        ],
+        check=True,
+    )
+    times = [2.0, 2.625, 5.625, 5.0]
+    paths = [tmp_path / f"{n}.jpg" for n in range(len(times))]
+    assert extract_frames(clip, times, paths, height=60) == 0
+    # Un keyframe por segundo: 2.625 muestra el de 2 y 5.625 el de 5
+    assert paths[1].read_bytes() == paths[0].read_bytes()
+    assert paths[2].read_bytes() == paths[3].read_bytes()
+    assert paths[0].read_bytes() != paths[3].read_bytes()
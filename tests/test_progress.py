@@ -0,0 +1,45 @@
+from core.progress import ProgressParser
+
+BLOCK = """frame=120
+fps=59.94
+bitrate=1534.2kbits/s
+total_size=786432
+out_time_us=4004000
+speed=1.98x
+"""
+
+
+def feed(parser, text):
+    return [parser.feed(line) for line in text.splitlines()]
+
+
+def test_block_is_returned_on_progress_line():
+    parser = ProgressParser()
+    assert feed(parser, BLOCK) == [None] * 6
+    progress = parser.feed("progress=continue")
+    assert progress.frame == 120
+    assert progress.fps == 59.94
+    assert progress.bitrate == 1534.2
+    assert progress.total_size == 786432
+    assert progress.out_time == 4.004
+    assert progress.speed == 1.98
+    assert not progress.finished
+
+
+def test_unknown_values_and_end():
+    parser = ProgressParser()
+    feed(parser, "bitrate=N/A\nspeed=N/A\nout_time_us=-9223372036854775807")
+    progress = parser.feed("progress=end")
+    assert progress.bitrate is None
+    assert progress.speed is None
+    assert progress.out_time_us == 0
+    assert progress.finished
+
+
+def test_blocks_do_not_leak_into_each_other():
+    parser = ProgressParser()
+    feed(parser, BLOCK + "progress=continue\n")
+    assert parser.feed("noise without separator") is None
+    progress = parser.feed("progress=continue")
+    assert progress.frame == 0
+    assert progress.speed is None
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+import ui.progress_publisher
+from ui.progress_publisher import ProgressPublisher
+
+
+class FakeTimer:
+    """threading.Timer that only fires when the test says so."""
+
+    started = []
+
+    def __init__(self, delay, function):
+        self.delay = delay
+        self.function = function
+        self.cancelled = False
+
+    def start(self):
+        FakeTimer.started.append(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=0.0)
+    FakeTimer.started = []
+    monkeypatch.setattr(
+        ui.progress_publisher.time, "monotonic", lambda: now.value
+    )
+    monkeypatch.setattr(ui.progress_publisher.threading, "Timer", FakeTimer)
+    return now
+
+
+def publisher():
+    control = SimpleNamespace(value=None)
+    updates = []
+    page = SimpleNamespace(
+        update=lambda *controls: updates.append(control.value)
+    )
+    return (
+        ProgressPublisher(
+            page, lambda state: [(control, "value", state)], rate_hz=10
+        ),
+        updates,
+    )
+
+
+def test_last_state_of_a_burst_is_published(clock):
+    progress, updates = publisher()
+    progress.submit(0.5)
+    clock.value = 0.04
+    progress.submit(0.98)
+    clock.value = 0.06
+    progress.submit(0.99)
+    assert updates == [0.5]
+    [timer] = FakeTimer.started
+    assert timer.delay == pytest.approx(0.06)
+    clock.value = 0.1
+    timer.function()
+    assert updates == [0.5, 0.99]
+
+
+def test_flush_cancels_the_trailing_frame(clock):
+    progress, updates = publisher()
+    progress.submit(0.5)
+    clock.value = 0.05
+    progress.submit(1.0)
+    progress.flush()
+    assert updates == [0.5, 1.0]
+    assert FakeTimer.started[0].cancelled
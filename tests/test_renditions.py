@@ -0,0 +1,26 @@
+import pytest
+
+from core.command_builder import Rendition, parse_renditions
+
+
+def test_heights_keep_the_aspect_ratio():
+    assert parse_renditions("1080, 720,,480") == [
+        Rendition("1080p", "-2", "1080"),
+        Rendition("720p", "-2", "720"),
+        Rendition("480p", "-2", "480"),
+    ]
+
+
+def test_explicit_sizes():
+    assert parse_renditions("1280x720,854x480") == [
+        Rendition("1280x720", "1280", "720"),
+        Rendition("854x480", "854", "480"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text", ["", " , ", "720p", "axb", "1280x", "720,720"]
+)
+def test_invalid_renditions(text):
+    with pytest.raises(ValueError):
+        parse_renditions(text)
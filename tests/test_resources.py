@@ -0,0 +1,70 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import core.resources
+from core.resources import ResourcePlan, format_cores, partition_cores
+
+PLAN = ResourcePlan(nice=5, affinity=[0, 1])
+
+
+@pytest.fixture
+def linux(monkeypatch):
+    """Linux with recorded setpriority/sched_setaffinity calls."""
+    calls = []
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.setattr(os, "getpriority", lambda *args: 0, raising=False)
+    monkeypatch.setattr(
+        os,
+        "setpriority",
+        lambda which, pid, value: calls.append(("nice", value)),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        os,
+        "sched_setaffinity",
+        lambda pid, cores: calls.append(("affinity", cores)),
+        raising=False,
+    )
+    return calls
+
+
+def tools(monkeypatch, *names):
+    monkeypatch.setattr(
+        core.resources.shutil,
+        "which",
+        lambda name: f"/usr/bin/{name}" if name in names else None,
+    )
+
+
+def test_partition_cores():
+    assert partition_cores([0, 1, 2, 3, 4], 2) == [[0, 1, 2], [3, 4]]
+    assert partition_cores([0, 1], 3) == [[0], [1], [0]]
+    assert format_cores([0, 1, 2, 3, 6]) == "0-3,6"
+
+
+def test_launcher_settings_are_not_applied_twice(linux, monkeypatch):
+    tools(monkeypatch, "nice", "taskset")
+    assert PLAN.launcher() == [
+        "/usr/bin/nice",
+        "-n",
+        "5",
+        "/usr/bin/taskset",
+        "-c",
+        "0-1",
+    ]
+    PLAN.after_start(SimpleNamespace(pid=1234))
+    assert linux == []
+
+
+def test_parent_applies_what_the_launcher_cannot(linux, monkeypatch):
+    tools(monkeypatch, "taskset")
+    assert PLAN.launcher() == ["/usr/bin/taskset", "-c", "0-1"]
+    PLAN.after_start(SimpleNamespace(pid=1234))
+    assert linux == [("nice", 5)]
+    tools(monkeypatch)
+    linux.clear()
+    PLAN.after_start(SimpleNamespace(pid=1234))
+    assert linux == [("nice", 5), ("affinity", [0, 1])]
@@ -38,12 +38,31 @@ video_frame_rate_value = ft.Text()
 video_total_frames_text = ft.Text()
 video_total_frames_value = ft.Text()
 
+# Folder Info Card Components
+folder_info_title = ft.Text(style="titleMedium")
+folder_summary_text = ft.Text()
+folder_file_column = ft.Text()
+folder_duration_column = ft.Text()
+folder_codec_column = ft.Text()
+folder_resolution_column = ft.Text()
+folder_table = ft.DataTable(
+    columns=[
+        ft.DataColumn(folder_file_column),
+        ft.DataColumn(folder_duration_column),
+        ft.DataColumn(folder_codec_column),
+        ft.DataColumn(folder_resolution_column),
+    ],
+    rows=[],
+)
+
 # Conversion Parameters Card Components
 conversion_card_title = ft.Text(style="titleMedium")
 scale_filter = ft.Checkbox(value=False)
 width_field = ft.TextField(width=120)
 height_field = ft.TextField(width=120)
 keep_aspect = ft.Checkbox(value=True)
+renditions_filter = ft.Checkbox(value=False)
+renditions_field = ft.TextField(width=250)
 bitrate_filter = ft.Checkbox(value=False)
 video_bitrate = ft.TextField(width=200)
 crf_filter = ft.Checkbox(value=False)
@@ -138,22 +157,42 @@ extract_audio = ft.Checkbox(value=False)
 time_crop_edition = ft.Checkbox(value=False)
 start_time = ft.TextField(width=200)
 duration = ft.TextField(width=200)
+keyframe_snap = ft.Checkbox(value=False)
 area_crop_edition = ft.Checkbox(value=False)
 crop = ft.TextField(width=200)
 
+# Preview Card Components
+preview_title = ft.Text(style="titleMedium")
+preview_text = ft.Text()
+preview_strip = ft.Row(scroll=ft.ScrollMode.AUTO, spacing=5)
+
 
 # Progress Card Components
 progress_card_title = ft.Text(style="titleMedium")
 command_text = ft.Text()
+fast_path_text = ft.Text(color=ft.Colors.GREEN_400)
 start_button = ft.ElevatedButton(
     bgcolor=ft.Colors.GREEN_400,
     color=ft.Colors.WHITE,
 )
+sample_button = ft.OutlinedButton()
 cancel_button = ft.ElevatedButton(
     bgcolor=ft.Colors.RED_400,
     color=ft.Colors.WHITE,
     disabled=True,
 )
+workers_field = ft.TextField(width=200)
+parallel_encoding = ft.Checkbox(value=False)
+resumable_encoding = ft.Checkbox(value=False)
+scheduling_policy = ft.Dropdown(
+    options=[
+        ft.dropdown.Option("fifo"),
+        ft.dropdown.Option("shortest"),
+        ft.dropdown.Option("longest"),
+    ],
+    value="fifo",
+    width=200,
+)
 progress_bar = ft.ProgressBar(value=0, expand=True, color=ft.Colors.GREEN_400)
 status_text = ft.Text()
 
@@ -178,11 +217,20 @@ def set_components_language(t):
     video_frame_rate_text.value = t("video_frame_rate_text")
     video_total_frames_text.value = t("video_total_frames_text")
 
+    folder_info_title.value = t("folder_info")
+    folder_file_column.value = t("video_filename_text")
+    folder_duration_column.value = t("video_duration_text")
+    folder_codec_column.value = t("video_codec_text")
+    folder_resolution_column.value = t("video_resolution_text")
+
     conversion_card_title.value = t("conversion_params")
     scale_filter.label = t("scale_filter")
     width_field.label = t("width")
     height_field.label = t("height")
     keep_aspect.label = t("keep_aspect")
+    renditions_filter.label = t("renditions")
+    renditions_field.label = t("renditions_heights")
+    renditions_field.hint_text = t("renditions_hint")
     bitrate_filter.label = t("bitrate_filter")
     video_bitrate.label = t("video_bitrate")
     crf_filter.label = t("crf_filter")
@@ -206,10 +254,21 @@ def set_components_language(t):
     time_crop_edition.label = t("time_crop_edition")
     start_time.label = t("start_time")
     duration.label = t("duration")
+    keyframe_snap.label = t("keyframe_snap")
     area_crop_edition.label = t("area_crop_edition")
     crop.label = t("crop")
     crop.hint_text = t("crop_hint")
 
+    preview_title.value = t("preview_title")
+
     progress_card_title.value = t("progress_title")
     start_button.text = t("start_conversion")
     cancel_button.text = t("cancel_conversion")
+    sample_button.text = t("sample_encode")
+    sample_button.tooltip = t("sample_encode_tooltip")
+    workers_field.label = t("batch_workers")
+    parallel_encoding.label = t("parallel_encoding")
+    resumable_encoding.label = t("resumable_encoding")
+    scheduling_policy.label = t("scheduling_policy")
+    for option in scheduling_policy.options:
+        option.text = t(f"policy_{option.key}")
@@ -6,6 +6,8 @@ from ui.components import (
     width_field,
     height_field,
     keep_aspect,
+    renditions_filter,
+    renditions_field,
     bitrate_filter,
     video_bitrate,
     crf_filter,
@@ -27,6 +29,7 @@ from ui.components import (
     time_crop_edition,
     start_time,
     duration,
+    keyframe_snap,
     area_crop_edition,
     crop
 )
@@ -71,6 +74,12 @@ def ConversionParamsCard() -> ft.Card:
                         vertical_alignment=ft.CrossAxisAlignment.CENTER,
                         spacing=15,
                     ),
+                    ft.Row(
+                        [renditions_filter, renditions_field],
+                        alignment=ft.MainAxisAlignment.START,
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        spacing=15,
+                    ),
                     ft.Row(
                         [frame_rate_filter, frame_rate],
                         alignment=ft.MainAxisAlignment.START,
@@ -88,6 +97,7 @@ def ConversionParamsCard() -> ft.Card:
                             time_crop_edition,
                             start_time,
                             duration,
+                            keyframe_snap,
                         ],
                         alignment=ft.MainAxisAlignment.START,
                         vertical_alignment=ft.CrossAxisAlignment.CENTER,
@@ -0,0 +1,28 @@
+import threading
+
+
+class Debouncer:
+    """
+    Delays a call until ``delay`` seconds have passed without a new
+    request, so bursts of events (e.g. typing) trigger a single call.
+    """
+
+    def __init__(self, delay: float, function):
+        self.delay = delay
+        self.function = function
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def __call__(self, *args) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.function, args)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
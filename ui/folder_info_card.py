@@ -0,0 +1,30 @@
+import flet as ft
+
+from ui.components import (folder_info_title,
+                           folder_summary_text,
+                           folder_table,
+                           )
+
+
+def FolderInfoCard() -> ft.Card:
+    return ft.Card(
+        ft.Container(
+            content=ft.Column(
+                [
+                    folder_info_title,
+                    folder_summary_text,
+                    ft.Column(
+                        [folder_table],
+                        scroll=ft.ScrollMode.AUTO,
+                        expand=True,
+                    ),
+                ],
+                spacing=10,
+                expand=True,
+            ),
+            padding=15,
+            expand=True,
+        ),
+        elevation=2,
+        expand=True,
+    )
@@ -0,0 +1,17 @@
+import flet as ft
+
+
+class LazyCard(ft.Container):
+    """
+    Placeholder for a card that is only built once the rest of the page
+    has been painted. ``factory`` returns the card.
+    """
+
+    def __init__(self, factory, **kwargs):
+        super().__init__(**kwargs)
+        self.factory = factory
+
+    def did_mount(self):
+        # El primer pintado ya se envió al cliente: ahora se crea la tarjeta
+        self.content = self.factory()
+        self.update()
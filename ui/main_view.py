@@ -1,15 +1,40 @@
 import flet as ft
+import base64
+import time
+from dataclasses import replace
 from pathlib import Path
 
 from ui.title_card import TitleCard
 from ui.file_select_card import FileSelectCard
 from ui.conversion_params_card import ConversionParamsCard
 from ui.video_info_card import VideoInfoCard
+from ui.folder_info_card import FolderInfoCard
 from ui.progress_card import ProgressCard
-
-from core.ffmpeg_wrapper import VideoConverter
-from core.i18n import get_current_language, save_config, set_language, t
-from core.video_utils import get_video_info, get_ffmpeg_path
+from ui.progress_publisher import ProgressPublisher
+from ui.debounce import Debouncer
+from ui.lazy_card import LazyCard
+from ui.preview_card import PreviewCard
+
+from core.batch import BatchJob, BatchQueue, default_workers, list_videos
+from core.ffmpeg_wrapper import ParallelVideoConverter, VideoConverter
+from core.interpolation import InterpolatingConverter, interpolates
+from core.i18n import (
+    get_current_language,
+    load_config,
+    save_config,
+    set_language,
+    t,
+)
+from core.progress import FFmpegProgress
+from core.resources import ResourceGovernor
+from core.scheduler import SpeedModel, remaining_time
+from core.command_builder import CommandBuilder, ConversionParams
+from core.video_utils import (
+    get_video_info,
+    probe_many,
+    format_duration,
+    format_size,
+)
 
 from ui.components import (
     set_components_language,
@@ -25,6 +50,8 @@ from ui.components import (
     video_codec_value,
     video_frame_rate_value,
     video_total_frames_value,
+    folder_summary_text,
+    folder_table,
     bitrate_filter,
     video_bitrate,
     crf_filter,
@@ -41,6 +68,8 @@ from ui.components import (
     width_field,
     height_field,
     keep_aspect,
+    renditions_filter,
+    renditions_field,
     frame_rate_filter,
     frame_rate,
     mi_mode_dropdown,
@@ -51,17 +80,31 @@ from ui.components import (
     time_crop_edition,
     start_time,
     duration,
+    keyframe_snap,
     area_crop_edition,
     crop,
     command_text,
+    fast_path_text,
     start_button,
+    sample_button,
     cancel_button,
+    workers_field,
+    parallel_encoding,
+    resumable_encoding,
+    scheduling_policy,
     progress_bar,
     status_text,
+    preview_text,
+    preview_strip,
 )
 
 
 def main_view(page: ft.Page):
+    video_info = {}
+    video_duration = 0.0
+    # Fotogramas de la vista previa: (segundo, JPEG en base64)
+    preview_frames = []
+
     # Estado de tema
     theme_icon.icon = (
         ft.Icons.DARK_MODE
@@ -98,29 +141,159 @@ def main_view(page: ft.Page):
 
     lang_dropdown.on_change = on_lang_change
 
+    def show_video_info(info: dict) -> None:
+        nonlocal video_info, video_duration
+        video_info = info
+        # Duración numérica del probe; la etiqueta solo es para mostrar
+        video_duration = info["duration_seconds"]
+        video_filename_value.value = info["filename"]
+        video_duration_value.value = info["duration"]
+        video_size_value.value = info["size"]
+        video_bitrate_value.value = info["bitrate"]
+        video_resolution_value.value = info["resolution"]
+        video_codec_value.value = info["codec"]
+        video_frame_rate_value.value = info["frame_rate"]
+        video_total_frames_value.value = info["total_frames"]
+
+    def probe_folder(videos: list) -> None:
+        """Probes every video of the folder and fills the folder table."""
+        last_update = time.monotonic()
+
+        def on_result(path: Path, info) -> None:
+            nonlocal last_update
+            if isinstance(info, dict):
+                if path == videos[0]:
+                    show_video_info(info)
+                cells = [
+                    path.name,
+                    info["duration"],
+                    info["codec"],
+                    info["resolution"],
+                ]
+            else:
+                cells = [path.name, "❌", "-", "-"]
+            folder_table.rows.append(
+                ft.DataRow(cells=[ft.DataCell(ft.Text(c)) for c in cells])
+            )
+            # Refrescar la tabla en bloques para no saturar la página
+            if time.monotonic() - last_update > 0.25:
+                last_update = time.monotonic()
+                page.update()
+
+        report = probe_many(videos, on_result=on_result)
+        folder_table.rows.sort(key=lambda row: row.cells[0].content.value)
+        lines = [
+            f"{len(videos)} videos - {report['wall_time']:.2f} s"
+            f" ({report['files_per_second']:.1f} videos/s)"
+        ]
+        for path, error in report["failed"].items():
+            lines.append(f"❌ {path.name}: {error.strip()}")
+        folder_summary_text.value = "\n".join(lines)
+        page.update()
+
     # FilePicker para archivo o carpeta de origen
     def pick_files_result(e: ft.FilePickerResultEvent) -> None:
         path = None
         if e.files and len(e.files) > 0:
             path = e.files[0].path
+        elif hasattr(e, "path") and e.path:
+            path = e.path
         elif hasattr(e, "paths") and e.paths and len(e.paths) > 0:
             path = e.paths[0]
         if path:
             selected_path.value = path
             progress_bar.value = 0  # Reiniciar barra
-            if Path(path).is_file():
+            status_text.value = ""
+            folder_table.rows.clear()
+            folder_summary_text.value = ""
+            preview_frames.clear()
+            preview_strip.controls.clear()
+            preview_text.value = ""
+            video_path = Path(path)
+            if video_path.is_dir():
+                # Carpeta: se analizan todos los videos en segundo plano
+                videos = list_videos(video_path)
+                status_text.value = f"{len(videos)} videos"
+                if videos:
+                    page.run_thread(probe_folder, videos)
+            elif video_path.is_file():
                 info = get_video_info(path)
-                video_filename_value.value = info["filename"]
-                video_duration_value.value = info["duration"]
-                video_size_value.value = info["size"]
-                video_bitrate_value.value = info["bitrate"]
-                video_resolution_value.value = info["resolution"]
-                video_codec_value.value = info["codec"]
-                video_frame_rate_value.value = info["frame_rate"]
-                video_total_frames_value.value = info["total_frames"]
+                if isinstance(info, dict):
+                    show_video_info(info)
+                    # Vista previa y, después, keyframes y cortes de escena
+                    # listos para recortes y segmentos
+                    page.run_thread(index_keyframes, path)
             codec_filter.value = False
 
         page.update()
+        update_command(None)
+
+    def index_keyframes(path: str) -> None:
+        from core.keyframe_index import get_keyframe_index
+        from core.preview import get_preview_strip
+
+        # Primero la tira: la extracción salta de keyframe en keyframe y
+        # no necesita el índice, que en un archivo largo tarda minutos
+        frames = get_preview_strip(path, video_duration)
+        if selected_path.value != path:
+            return  # se eligió otro archivo mientras tanto
+        preview_frames[:] = [
+            (frame.timestamp, base64.b64encode(frame.path.read_bytes()))
+            for frame in frames
+        ]
+        rebuild_command()
+        get_keyframe_index(path, scenes=True)
+
+    def draw_preview(params: ConversionParams) -> None:
+        """Draws the preview strip with the current scale and crop."""
+        from core.preview import preview_geometry
+
+        try:
+            source = tuple(
+                int(n) for n in video_info.get("resolution", "").split("x")
+            )
+        except ValueError:
+            return
+        geometry = preview_geometry(params, source)
+        if geometry is None:
+            preview_text.value = f"{source[0]}x{source[1]}"
+            frame_width, frame_height = source
+            crop_box = None
+        else:
+            frame_width, frame_height = geometry["frame"]
+            crop_box = geometry["crop"]
+            x, y, w, h = (round(n) for n in crop_box)
+            preview_text.value = (
+                f"{source[0]}x{source[1]} → {round(frame_width)}x"
+                f"{round(frame_height)} → {w}x{h} (+{x}+{y})"
+            )
+        height = 90
+        width = height * frame_width / frame_height
+        scale = height / frame_height
+        controls = []
+        for timestamp, data in preview_frames:
+            layers = [
+                ft.Image(
+                    src_base64=data.decode(),
+                    width=width,
+                    height=height,
+                    fit=ft.ImageFit.FILL,
+                    tooltip=format_duration(timestamp),
+                )
+            ]
+            if crop_box and crop_box != (0.0, 0.0, frame_width, frame_height):
+                x, y, w, h = crop_box
+                layers.append(
+                    ft.Container(
+                        left=x * scale,
+                        top=y * scale,
+                        width=w * scale,
+                        height=h * scale,
+                        border=ft.border.all(2, ft.Colors.RED_400),
+                    )
+                )
+            controls.append(ft.Stack(layers, width=width, height=height))
+        preview_strip.controls = controls
 
     file_picker = ft.FilePicker(on_result=pick_files_result)
     page.overlay.append(file_picker)
@@ -135,6 +308,7 @@ def main_view(page: ft.Page):
         if path:
             output_folder_path.value = path
             page.update()
+            update_command(None)
 
     output_folder_picker = ft.FilePicker(on_result=pick_output_folder_result)
     page.overlay.append(output_folder_picker)
@@ -162,7 +336,6 @@ def main_view(page: ft.Page):
                     round(target_height * float(width) / float(height))
                 )
                 width_field.value = str(w_calc)
-                page.update()
         update_command(None)
 
     def update_height(e: ft.ControlEvent) -> None:
@@ -173,7 +346,6 @@ def main_view(page: ft.Page):
             if target_width and width and height:
                 h_calc = int(round(target_width * float(height) / float(width)))
                 height_field.value = str(h_calc)
-                page.update()
         update_command(None)
 
     width_field.on_change = update_height
@@ -191,104 +363,122 @@ def main_view(page: ft.Page):
 
     mi_mode_dropdown.on_change = on_mi_mode_change
 
-    def update_command(e: ft.ControlEvent):
-        command = f"{get_ffmpeg_path()} -i {selected_path.value}"
-        if bitrate_filter.value:
-            command += f" -b:v {video_bitrate.value}"
-        if crf_filter.value:
-            command += f" -crf {crf.value}"
-        if output_format.value and output_dropdown.value:
-            command += f" -f {output_dropdown.value}"
-        else:
+    command_builder = CommandBuilder()
+    current_command = None
+
+    def read_params(input_path: str) -> ConversionParams:
+        """Snapshot of the enabled conversion options."""
+        if not output_format.value:
             output_dropdown.key = " "
             output_dropdown.value = ""
-
-        if codec_filter.value:
-            command += f" -c:v {video_codec.value}"
-            if preset.value:
-                command += f" -preset {preset.value}"
-            if tune_dropdown.value:
-                command += f" -tune {tune_dropdown.value}"
-        else:
+        if not codec_filter.value:
             video_codec.key = " "
             video_codec.value = ""
             preset.key = " "
             preset.value = ""
             tune_dropdown.key = " "
             tune_dropdown.value = ""
+        scale = scale_filter.value and width_field.value and height_field.value
+        return ConversionParams(
+            input_path=input_path,
+            output_folder=output_folder_path.value or "",
+            container=output_dropdown.value or "",
+            bitrate=video_bitrate.value if bitrate_filter.value else None,
+            crf=crf.value if crf_filter.value else None,
+            encoder=video_codec.value or None,
+            preset=preset.value or None,
+            tune=tune_dropdown.value or None,
+            width=width_field.value if scale else None,
+            height=height_field.value if scale else None,
+            frame_rate=(
+                frame_rate.value
+                if frame_rate_filter.value and frame_rate.value
+                else None
+            ),
+            mi_mode=mi_mode_dropdown.value or None,
+            mc_mode=mc_mode_dropdown.value or None,
+            me_mode=me_mode_dropdown.value or None,
+            crop=crop.value if area_crop_edition.value else None,
+            remove_audio=bool(remove_audio.value),
+            extract_audio=bool(extract_audio.value),
+            start_time=(
+                start_time.value
+                if time_crop_edition.value and start_time.value
+                else None
+            ),
+            duration=duration.value if time_crop_edition.value else None,
+            keyframe_snap=bool(keyframe_snap.value),
+            renditions=(
+                renditions_field.value
+                if renditions_filter.value and renditions_field.value
+                else None
+            ),
+        )
 
-        if (
-            scale_filter.value
-            or frame_rate_filter.value
-            or area_crop_edition.value
-            or time_crop_edition.value
-        ):
-            command += " -vf "
-        video_filter_command = []
-        if scale_filter.value and width_field.value and height_field.value:
-            video_filter_command.append(
-                f"scale={width_field.value}:{height_field.value}"
+    def rebuild_command() -> None:
+        nonlocal current_command
+        input_path = selected_path.value
+        if not input_path:
+            return
+        if Path(input_path).is_dir():
+            # Carpeta: se muestra el comando del primer video como ejemplo
+            videos = list_videos(input_path)
+            if not videos:
+                current_command = None
+                command_text.value = ""
+                page.update()
+                return
+            input_path = str(videos[0])
+        try:
+            current_command = command_builder.update(
+                read_params(input_path), video_info
             )
-        interpolation_command = []
-        if frame_rate_filter.value and frame_rate.value:
-            original_frame_rate = eval(video_frame_rate_value.value)
-            if float(frame_rate.value) > original_frame_rate:
-                interpolation_command.append(
-                    f"minterpolate=fps={frame_rate.value}"
-                )
-                if mi_mode_dropdown.value:
-                    interpolation_command.append(
-                        f"mi_mode={mi_mode_dropdown.value}"
-                    )
-                    if mi_mode_dropdown.value == "mci":
-                        if mc_mode_dropdown.value:
-                            interpolation_command.append(
-                                f"mc_mode={mc_mode_dropdown.value}"
-                            )
-                        if me_mode_dropdown.value:
-                            interpolation_command.append(
-                                f"me_mode={me_mode_dropdown.value}"
-                            )
-                video_filter_command.append(":".join(interpolation_command))
-            else:
-                video_filter_command.append(f"fps={frame_rate.value}")
-        if area_crop_edition.value:
-            video_filter_command.append(f"crop={crop.value}")
-        if video_filter_command:
-            command += ",".join(video_filter_command)
-
-        if remove_audio.value:
-            command += " -an"
-
-        original_path = Path(selected_path.value)
-        output_path = (
-            Path(output_folder_path.value)
-            if output_folder_path.value
-            else Path(selected_path.value).parent
-        )
-        output_extension = (
-            output_dropdown.value if output_dropdown.value else "mp4"
-        )
-        output_filename = f"{original_path.stem}_converted.{output_extension}"
-        output = output_path / output_filename
-        n = 1
-        while output.exists():
-            n += 1
-            output_filename = (
-                f"{original_path.stem}_converted_{n}.{output_extension}"
+        except ValueError as e:
+            current_command = None
+            command_text.value = f"⚠ {e}"
+        else:
+            command_text.value = str(current_command)
+            if preview_frames and input_path == selected_path.value:
+                draw_preview(command_builder.params)
+        notes = []
+        if current_command and current_command.stream_copy:
+            notes.append(t("fast_path_remux"))
+        if current_command:
+            notes += [
+                f"{t('encoder_fallback')}: {note}"
+                for note in current_command.notes
+            ]
+        if current_command and current_command.filters:
+            # Cadena -vf elegida y su coste estimado por fotograma
+            notes.append(
+                f"{t('filter_plan')}: {current_command.filter_plan.describe()}"
             )
-            output = output_path / output_filename
-        command += f" {output}"
+        fast_path_text.value = "\n".join(notes)
+        page.update()
 
-        output_audio_base = f"{original_path.stem}_audio.aac"
-        if extract_audio.value:
-            command += f" -map 0:a -c:a copy {output_audio_base}"
+    def load_capabilities() -> None:
+        """Offers only the encoders the FFmpeg binary can actually use."""
+        from core.capabilities import get_capabilities
+
+        capabilities = get_capabilities()
+        if capabilities is None:
+            return
+        command_builder.set_capabilities(capabilities)
+        video_codec.options = [
+            option
+            for option in video_codec.options
+            if option.key == "copy" or capabilities.has_encoder(option.key)
+        ]
+        page.update()
+        update_command(None)
 
-        if time_crop_edition.value:
-            command += f" -ss {start_time.value} -t {duration.value}"
+    page.run_thread(load_capabilities)
 
-        command_text.value = command
-        page.update()
+    # Escribir en un campo solo reconstruye el comando al dejar de teclear
+    debounced_rebuild = Debouncer(0.3, rebuild_command)
+
+    def update_command(e: ft.ControlEvent):
+        debounced_rebuild()
 
     # Call the update_command function whenever a checkbox is toggled
     bitrate_filter.on_change = update_command
@@ -302,6 +492,8 @@ def main_view(page: ft.Page):
     tune_dropdown.on_change = update_command
 
     scale_filter.on_change = update_command
+    renditions_filter.on_change = update_command
+    renditions_field.on_change = update_command
     frame_rate_filter.on_change = update_command
     frame_rate.on_change = update_command
     mc_mode_dropdown.on_change = update_command
@@ -314,31 +506,265 @@ def main_view(page: ft.Page):
     time_crop_edition.on_change = update_command
     start_time.on_change = update_command
     duration.on_change = update_command
+    keyframe_snap.on_change = update_command
 
     video_converter = VideoConverter()
+    batch = None
+    workers_field.value = str(default_workers())
+
+    def render_progress(progress: FFmpegProgress) -> list:
+        total_time = video_duration
+        current_time = progress.out_time
+        ratio = current_time / total_time if total_time > 0 else 0
+
+        speed = f"{progress.speed:.2f}x" if progress.speed else "-"
+        remaining = remaining_time(total_time, current_time, progress.speed)
+        eta = format_duration(remaining) if remaining is not None else "-"
+        status = f"""
+        Converting...({ratio * 100:.2f} %)\n
+        {format_duration(current_time)} / {format_duration(total_time)}\n
+        Remaining: {eta}\n
+        Processed Frames: {progress.frame}\n
+        Processing speed: {progress.fps} FPS  ({speed})\n
+        Resources: {resources_summary}
+        """
+        if conversion_command and conversion_command.renditions:
+            # Una sola decodificación: todas las ramas avanzan juntas
+            status += "\n".join(
+                f"        {label}: {format_size(size)}"
+                for label, size in conversion_command.output_sizes()
+            )
+        return [
+            (progress_bar, "value", round(min(ratio, 1), 3)),
+            (status_text, "value", status),
+        ]
+
+    def render_batch(queue: BatchQueue) -> list:
+        running = [
+            f"{j.input_path.name} ({j.progress * 100:.1f} %) [{j.resources}]"
+            for j in queue.jobs
+            if j.status == "running"
+        ]
+        eta = queue.eta()
+        if eta is not None:
+            running.insert(0, f"Queue ETA: {format_duration(eta)}")
+        return [
+            (progress_bar, "value", round(queue.overall_progress(), 3)),
+            (status_text, "value", "\n".join([queue.summary(), *running])),
+        ]
+
+    progress_rate = load_config().get("progress_rate_hz", 8)
+    progress_publisher = ProgressPublisher(
+        page, render_progress, progress_rate
+    )
+    batch_publisher = ProgressPublisher(page, render_batch, progress_rate)
+
+    resources_summary = ""
+    speed_model = SpeedModel()  # velocidades medidas en esta sesión
+    conversion_started = 0.0
+    conversion_remux = False
+    conversion_outputs = []
+    conversion_command = None
+    last_encode_speed = 1.0
+
+    def on_conversion_progress(progress: FFmpegProgress) -> None:
+        nonlocal last_encode_speed
+        if not conversion_remux and progress.speed:
+            last_encode_speed = progress.speed
+        progress_publisher.submit(progress)
+
+    def on_conversion_finish(returncode: int) -> None:
+        progress_publisher.flush()
+        progress_publisher.reset()
+        start_button.disabled = False
+        cancel_button.disabled = True
+        if video_converter.cancelled:
+            progress_bar.value = 0
+            status_text.value = "Processing video cancelled: ❌"
+            if getattr(video_converter, "resumable", False):
+                status_text.value += (
+                    "\nFinished segments were kept: start again to resume"
+                )
+            else:
+                # No dejar un archivo de salida a medio escribir
+                for output in conversion_outputs:
+                    Path(output).unlink(missing_ok=True)
+                    command_builder.planner.release(output)
+        elif returncode == 0:
+            status_text.value = "Video processed successfully! ✅"
+            if not conversion_remux and video_info:
+                speed_model.observe(video_info, last_encode_speed)
+            if conversion_remux:
+                elapsed = time.perf_counter() - conversion_started
+                saved = max(video_duration / last_encode_speed - elapsed, 0)
+                status_text.value += (
+                    f"\nStream copy in {elapsed:.1f} s, about "
+                    f"{format_duration(saved)} saved "
+                    f"(re-encoding at {last_encode_speed:.2f}x)"
+                )
+        else:
+            status_text.value = "Error processing video: ❌"
+            if not getattr(video_converter, "resumable", False):
+                # Los nombres reservados que quedaron vacíos se liberan
+                for output in conversion_outputs:
+                    command_builder.planner.release(output)
+        page.update()
+
+    def on_batch_update(job: BatchJob) -> None:
+        batch_publisher.submit(batch)
+
+    def on_batch_finish(queue: BatchQueue) -> None:
+        batch_publisher.flush()
+        batch_publisher.reset()
+        start_button.disabled = False
+        cancel_button.disabled = True
+        status_text.value = queue.summary()
+        # Nombres planificados para trabajos que no llegaron a correr
+        command_builder.planner.release_planned()
+        page.update()
+
+    def get_job_history():
+        # sqlite3 solo se carga al lanzar la primera conversión
+        from core.history import get_job_history
+
+        return get_job_history()
+
+    def get_workers() -> int:
+        try:
+            return max(1, int(workers_field.value))
+        except (TypeError, ValueError):
+            return default_workers()
+
+    def start_batch(folder: str) -> None:
+        nonlocal batch
+        params = read_params(folder)
+        workers = get_workers()
+        videos = list_videos(folder)
+        resume = bool(resumable_encoding.value)
+        if not resume:
+            # Todos los nombres de salida en una sola pasada
+            command_builder.plan_outputs(
+                [replace(params, input_path=str(path)) for path in videos]
+            )
+        batch = BatchQueue(
+            [BatchJob(path) for path in videos],
+            workers=workers,
+            governor=ResourceGovernor.from_config(load_config(), workers),
+            policy=scheduling_policy.value or "fifo",
+            speed_model=speed_model,
+            resumable=resume,
+            history=get_job_history(),
+            build_command=lambda job, info: command_builder.for_input(
+                params, job.input_path, info, resume=resume
+            ),
+            planner=command_builder.planner,
+            on_update=on_batch_update,
+            on_finish=on_batch_finish,
+        )
+        batch.start()
 
     def on_start_conversion(e: ft.ControlEvent) -> None:
+        nonlocal video_converter, conversion_started, conversion_remux
+        nonlocal resources_summary, conversion_outputs, conversion_command
+        if video_converter.is_running() or (batch and batch.is_running()):
+            return
+        # Aplicar cualquier cambio que aún esté esperando al debounce
+        debounced_rebuild.cancel()
+        rebuild_command()
+        if current_command is None:
+            return
         progress_bar.value = 0
+        start_button.disabled = True
         cancel_button.disabled = False
         page.update()
-        video_converter.convert_video(command_text.value)
-        video_converter.wait()
-
-        status_text.value = (
-            "Video processed successfully! ✅"
-            if video_converter.ffmpeg_process.returncode == 0
-            else "Error processing video: ❌"
+        if Path(selected_path.value).is_dir():
+            start_batch(selected_path.value)
+            return
+        # Los segmentos no admiten salidas adicionales ni recorte de tiempo
+        segmented = parallel_encoding.value or resumable_encoding.value
+        if segmented and not (
+            extract_audio.value
+            or time_crop_edition.value
+            or renditions_filter.value
+        ):
+            workers = get_workers() if parallel_encoding.value else 1
+            governor = ResourceGovernor.from_config(load_config(), workers)
+            if interpolates(current_command.argv()):
+                # Tramos solapados: sin costuras, pero no se reanudan
+                video_converter = InterpolatingConverter(
+                    workers=workers,
+                    governor=governor,
+                    history=get_job_history(),
+                )
+            else:
+                video_converter = ParallelVideoConverter(
+                    workers=workers,
+                    governor=governor,
+                    resumable=resumable_encoding.value,
+                    history=get_job_history(),
+                )
+        else:
+            governor = ResourceGovernor.from_config(load_config())
+            video_converter = VideoConverter(
+                governor.plans[0], history=get_job_history()
+            )
+        resources_summary = governor.describe()
+        conversion_remux = current_command.stream_copy
+        # Reservar los nombres de salida justo antes de empezar
+        command = command_builder.reserve(
+            read_params(selected_path.value),
+            video_info,
+            resume=getattr(video_converter, "resumable", False),
+        )
+        command_text.value = str(command)
+        conversion_outputs = command.outputs()
+        conversion_command = command
+        conversion_started = time.perf_counter()
+        # La conversión corre en un hilo aparte; la UI sigue respondiendo
+        video_converter.start(
+            command.argv(),
+            on_progress=on_conversion_progress,
+            on_finish=on_conversion_finish,
+            info=video_info or None,
         )
-        status_text.update()
 
     start_button.on_click = on_start_conversion
 
+    def run_sample(params: ConversionParams, info: dict) -> None:
+        from core.sample import sample_encode
+
+        estimate = sample_encode(command_builder, params, info)
+        if estimate is None:
+            status_text.value = "Sample encode failed ❌"
+        else:
+            status_text.value = f"Sample: {estimate.describe()} ⏱"
+        sample_button.disabled = False
+        start_button.disabled = False
+        page.update()
+
+    def on_sample_conversion(e: ft.ControlEvent) -> None:
+        if video_converter.is_running() or (batch and batch.is_running()):
+            return
+        debounced_rebuild.cancel()
+        rebuild_command()
+        input_path = selected_path.value
+        if current_command is None or not Path(input_path).is_file():
+            return
+        sample_button.disabled = True
+        start_button.disabled = True
+        status_text.value = "Encoding sample excerpts... ⏳"
+        page.update()
+        # Unos segundos de cada parte del video, en paralelo
+        page.run_thread(run_sample, read_params(input_path), video_info)
+
+    sample_button.on_click = on_sample_conversion
+
     def on_cancel_conversion(e: ft.ControlEvent) -> None:
-        progress_bar.value = 0
         cancel_button.disabled = True
         page.update()
+        if batch and batch.is_running():
+            batch.cancel()
         video_converter.cancel_conversion()
-        status_text.value = "Processing video cancelled: ❌"
 
     cancel_button.on_click = on_cancel_conversion
 
@@ -356,6 +782,7 @@ def main_view(page: ft.Page):
                                         output_folder_picker=output_folder_picker,
                                     ),
                                     VideoInfoCard(),
+                                    LazyCard(FolderInfoCard, expand=True),
                                 ],
                             ),
                             expand=1,
@@ -363,7 +790,8 @@ def main_view(page: ft.Page):
                         ft.Container(
                             content=ft.Column(
                                 [
-                                    ConversionParamsCard(),
+                                    LazyCard(ConversionParamsCard),
+                                    LazyCard(PreviewCard),
                                 ]
                             ),
                             expand=2,
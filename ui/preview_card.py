@@ -0,0 +1,23 @@
+import flet as ft
+
+from ui.components import (preview_title,
+                           preview_text,
+                           preview_strip,
+                           )
+
+
+def PreviewCard() -> ft.Card:
+    return ft.Card(
+        ft.Container(
+            content=ft.Column(
+                [
+                    preview_title,
+                    preview_text,
+                    preview_strip,
+                ],
+                spacing=10,
+            ),
+            padding=15,
+        ),
+        elevation=2,
+    )
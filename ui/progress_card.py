@@ -3,8 +3,14 @@ import flet as ft
 from ui.components import (
     progress_card_title,
     command_text,
+    fast_path_text,
     start_button,
+    sample_button,
     cancel_button,
+    workers_field,
+    parallel_encoding,
+    resumable_encoding,
+    scheduling_policy,
     progress_bar,
     status_text
 )
@@ -16,12 +22,20 @@ def ProgressCard() -> ft.Card:
                 [
                     progress_card_title,
                     command_text,
+                    fast_path_text,
                     ft.Row(
-                        [start_button, cancel_button],
+                        [sample_button, start_button, cancel_button],
                         alignment=ft.MainAxisAlignment.END,
                         vertical_alignment=ft.CrossAxisAlignment.CENTER,
                         spacing=15,
                     ),
+                    ft.Row(
+                        [workers_field, scheduling_policy, parallel_encoding],
+                        alignment=ft.MainAxisAlignment.START,
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        spacing=15,
+                    ),
+                    resumable_encoding,
                     progress_bar,
                     status_text
                 ],
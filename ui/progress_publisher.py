@@ -0,0 +1,72 @@
+import threading
+import time
+
+
+class ProgressPublisher:
+    """
+    Coalesces progress updates coming from worker threads and pushes them
+    to the page at most ``rate_hz`` times per second.
+
+    ``render(state)`` turns the latest state into ``(control, attribute,
+    value)`` tuples; it only runs when a frame is due, and only the
+    controls whose values changed are sent to the client. An update that
+    arrives before its frame is published when the frame is due, even if
+    no other update follows.
+    """
+
+    def __init__(self, page, render, rate_hz: float = 8):
+        self.page = page
+        self.render = render
+        self.interval = 1 / rate_hz if rate_hz > 0 else 0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._next_frame = 0.0
+        self._sent = {}
+        self._timer = None
+
+    def submit(self, state) -> None:
+        with self._lock:
+            self._pending = state
+            delay = self._next_frame - time.monotonic()
+            if delay > 0:
+                # Sin esto el último estado de una ráfaga (p. ej. 99 %
+                # antes de una pausa) esperaría al siguiente evento
+                if self._timer is None:
+                    self._timer = threading.Timer(delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self) -> None:
+        """Renders the pending state now, if there is one."""
+        with self._lock:
+            self._cancel_timer()
+            state, self._pending = self._pending, None
+            if state is None:
+                return
+            self._next_frame = time.monotonic() + self.interval
+            changed = []
+            for control, attribute, value in self.render(state):
+                key = (id(control), attribute)
+                if self._sent.get(key) == value:
+                    continue
+                self._sent[key] = value
+                setattr(control, attribute, value)
+                if control not in changed:
+                    changed.append(control)
+        if changed:
+            self.page.update(*changed)
+
+    def reset(self) -> None:
+        """Forgets what was sent, e.g. after the controls were set directly."""
+        with self._lock:
+            self._cancel_timer()
+            self._pending = None
+            self._next_frame = 0.0
+            self._sent.clear()